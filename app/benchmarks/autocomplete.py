@@ -0,0 +1,62 @@
+"""Time AutocompleteIndex builds and per-keystroke lookups.
+
+    python -m benchmarks.autocomplete --sizes 10000 100000
+
+Every prefix of a sample of titles and names is looked up, as a user
+typing them would, and the median and p99 lookup times are reported.
+"""
+
+import argparse
+import random
+import time
+
+from .search import create_corpus
+from .utils import benchmark_database, format_ms, median_time, setup_django
+
+
+def run(sizes, samples, seed=0):
+    from movies.autocomplete import build_autocomplete_index
+
+    rng = random.Random(seed)
+    print(f"{'size':<10}{'build':>12}{'lookups':>9}{'median':>12}{'p99':>12}")
+    for size in sizes:
+        with benchmark_database():
+            create_corpus(size, seed=seed)
+            index = None
+
+            def build():
+                nonlocal index
+                index = build_autocomplete_index()
+
+            build_time = median_time(build, repeat=1)
+
+        labels = [
+            suggestion["label"] for suggestion in rng.sample(index.suggestions, samples)
+        ]
+        timings = []
+        for label in labels:
+            for end in range(1, len(label) + 1):
+                start = time.perf_counter()
+                index.suggest(label[:end], 8)
+                timings.append(time.perf_counter() - start)
+        timings.sort()
+        median = timings[len(timings) // 2]
+        p99 = timings[int(len(timings) * 0.99)]
+        print(
+            f"{size:<10}{format_ms(build_time)}{len(timings):>9}"
+            f"{format_ms(median)}{format_ms(p99)}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare facet counts from the grouped query with the filter index.
+
+    python -m benchmarks.facets --sizes 10000 100000
+"""
+
+import argparse
+
+from .utils import (
+    benchmark_database,
+    create_synthetic_movies,
+    format_ms,
+    median_time,
+    setup_django,
+)
+
+
+def run(sizes, repeat):
+    from django.http import QueryDict
+    from django.test import override_settings
+
+    from movies.catalogue import bump_catalogue_version
+    from movies.facets import facet_counts
+    from movies.filters import MovieFilterParams
+    from movies.index import get_movie_filter_index
+
+    for size in sizes:
+        with benchmark_database():
+            genre_ids = create_synthetic_movies(size)
+            queries = {
+                "all": "",
+                "genre": f"g={genre_ids[0]}",
+                "decade + runtime": "dmin=1990&dmax=1990&rmin=90&rmax=120",
+            }
+            with override_settings(MOVIE_FILTER_INDEX=1):
+                bump_catalogue_version()
+                get_movie_filter_index()
+
+            print(f"\n{size} movies")
+            print(f"{'query':<24}{'query':>12}{'index':>12}")
+            for name, query in queries.items():
+                params = MovieFilterParams.from_query(QueryDict(query))
+                orm_time = median_time(lambda: facet_counts(params), repeat)
+                with override_settings(MOVIE_FILTER_INDEX=1):
+                    index_time = median_time(lambda: facet_counts(params), repeat)
+                print(f"{name:<24}{format_ms(orm_time)}{format_ms(index_time)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare MovieList served by the ORM with the in-memory filter index.
+
+    python -m benchmarks.filter_index --sizes 10000 100000 1000000
+"""
+
+import argparse
+
+from .utils import (
+    benchmark_database,
+    create_synthetic_movies,
+    format_ms,
+    median_time,
+    setup_django,
+)
+
+
+def run(sizes, repeat):
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory
+
+    from movies.catalogue import bump_catalogue_version
+    from movies.index import get_movie_filter_index
+    from movies.views import MovieList
+
+    view = MovieList.as_view(throttle_classes=[])
+    factory = APIRequestFactory()
+
+    for size in sizes:
+        with benchmark_database():
+            genre_ids = create_synthetic_movies(size)
+            queries = {
+                "all": "",
+                "genre": f"g={genre_ids[0]}",
+                "two genres, deep page": f"g={genre_ids[0]},{genre_ids[1]}&page=20",
+                "decade + runtime": "dmin=1990&dmax=1990&rmin=90&rmax=120",
+                "everything": (
+                    f"g={genre_ids[2]},{genre_ids[3]}&dmin=1980&dmax=2000"
+                    "&rmin=<75&rmax=150"
+                ),
+            }
+
+            with override_settings(MOVIE_FILTER_INDEX=1):
+                bump_catalogue_version()
+                build_time = median_time(get_movie_filter_index, repeat=1)
+
+            print(f"\n{size} movies (index build {format_ms(build_time)})")
+            print(f"{'query':<24}{'orm':>12}{'index':>12}{'speedup':>10}")
+            for name, query in queries.items():
+
+                def get():
+                    response = view(factory.get(f"/api/movies/?{query}"))
+                    assert response.status_code == 200
+
+                # A zero timeout skips the response and count caches, so every
+                # call filters; the index setting isn't part of their keys.
+                with override_settings(CATALOGUE_CACHE_TIMEOUT=0):
+                    orm_time = median_time(get, repeat)
+                with override_settings(CATALOGUE_CACHE_TIMEOUT=0, MOVIE_FILTER_INDEX=1):
+                    index_time = median_time(get, repeat)
+                print(
+                    f"{name:<24}{format_ms(orm_time)}{format_ms(index_time)}"
+                    f"{orm_time / index_time:>9.1f}x"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Time rank_for_group for a group of users with long lists.
+
+    python -m benchmarks.group --sizes 10000 100000
+
+Each user gets a list of --items random movies, a quarter of them
+watched. The first call builds and caches every member's entry; later
+calls are served from the cache, as they are for a group deciding
+between suggestions.
+"""
+
+import argparse
+import random
+
+from .similar import create_people
+from .utils import (
+    benchmark_database,
+    create_synthetic_movies,
+    format_ms,
+    median_time,
+    setup_django,
+)
+
+
+def create_lists(users, items, seed=0):
+    from accounts.models import CustomUser
+    from lists.models import Item, List
+    from movies.models import EligibleMovie
+
+    rng = random.Random(seed)
+    movie_ids = list(EligibleMovie.objects.values_list("movie_id", flat=True))
+    user_ids = []
+    for i in range(users):
+        user = CustomUser.objects.create_user(
+            email=f"member{i}@example.com", password="pw"
+        )
+        _list = List.objects.create(owner=user, name="watch-list")
+        Item.objects.bulk_create(
+            Item(_list=_list, movie_id=movie_id, watched=rng.random() < 0.25)
+            for movie_id in rng.sample(movie_ids, min(items, len(movie_ids)))
+        )
+        user_ids.append(user.pk)
+    return user_ids
+
+
+def run(sizes, users, items):
+    from django.core.cache import cache
+
+    from movies.group import rank_for_group
+    from movies.recommendations import movie_features
+
+    print(f"{'size':<10}{'users':>7}{'items':>7}{'cold':>12}{'warm':>12}")
+    for size in sizes:
+        with benchmark_database():
+            create_synthetic_movies(size)
+            create_people(size)
+            user_ids = create_lists(users, items)
+            cache.clear()
+            movie_features.clear()
+            movie_features.get()
+
+            cold = median_time(lambda: rank_for_group(user_ids), repeat=1)
+            warm = median_time(lambda: rank_for_group(user_ids), repeat=20)
+            print(f"{size:<10}{users:>7}{items:>7}{format_ms(cold)}{format_ms(warm)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.users, args.items)
+
+
+if __name__ == "__main__":
+    main()
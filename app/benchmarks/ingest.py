@@ -0,0 +1,104 @@
+"""Compare movies/second for add_movie_to_db and ingest_movies.
+
+    python -m benchmarks.ingest --counts 500 2000
+
+Records are made from the OMDB response recorded in fixtures/, with the
+id, title, cast, director and genres varied from pools sized to the run,
+so later movies reuse people and genres added by earlier ones. OMDB is
+not called; both paths get the same formatted records.
+"""
+
+import argparse
+import copy
+import json
+import random
+import time
+from pathlib import Path
+from unittest import mock
+
+from .utils import benchmark_database, setup_django
+
+FIXTURE = Path(__file__).parent / "fixtures" / "omdb_tt11525644.json"
+GENRES = [
+    "Action",
+    "Comedy",
+    "Crime",
+    "Drama",
+    "Horror",
+    "Mystery",
+    "Romance",
+    "Sci-Fi",
+    "Thriller",
+    "Western",
+]
+
+
+def make_records(count, seed=0):
+    from movies.utils import OMDBFetch
+
+    rng = random.Random(seed)
+    response = json.loads(FIXTURE.read_text())
+    ratings = response["Ratings"]
+    records = []
+    for i in range(count):
+        imdbid = f"tt{i:08}"
+        record = copy.deepcopy(response)
+        record.update(
+            imdbID=imdbid,
+            Title=f"{response['Title']} {i}",
+            Actors=", ".join(
+                f"Actor {rng.randrange(count)}" for _ in range(rng.randint(2, 4))
+            ),
+            Director=f"Director {rng.randrange(max(count // 5, 1))}",
+            Genre=", ".join(rng.sample(GENRES, rng.randint(1, 3))),
+            Ratings=rng.sample(ratings, rng.randint(1, len(ratings))),
+        )
+        records.append(OMDBFetch(imdbid).format_response_data(record))
+    return records
+
+
+def time_single(records):
+    from movies.tasks import add_movie_to_db
+    from movies.utils import OMDBFetch
+
+    with mock.patch.object(OMDBFetch, "get_data", side_effect=records):
+        start = time.perf_counter()
+        for record in records:
+            add_movie_to_db(record["imdbID"])
+        return time.perf_counter() - start
+
+
+def time_bulk(records, batch_size):
+    from movies.ingest import ingest_movies
+
+    start = time.perf_counter()
+    ingest_movies(records, batch_size=batch_size)
+    return time.perf_counter() - start
+
+
+def run(counts, batch_size):
+    print(f"{'movies':<10}{'single':>14}{'bulk':>14}{'speedup':>10}")
+    for count in counts:
+        records = make_records(count)
+        with benchmark_database():
+            single = time_single(copy.deepcopy(records))
+        with benchmark_database():
+            bulk = time_bulk(copy.deepcopy(records), batch_size)
+        print(
+            f"{count:<10}{count / single:>10.0f} m/s{count / bulk:>10.0f} m/s"
+            f"{single / bulk:>9.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--batch-size", type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.counts, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
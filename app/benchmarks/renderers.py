@@ -0,0 +1,108 @@
+"""Compare JSONRenderer with FastJSONRenderer on MovieSerializer output.
+
+    python -m benchmarks.renderers --page-sizes 30 100 --loops 200
+"""
+
+import argparse
+
+from .utils import (
+    benchmark_database,
+    create_synthetic_movies,
+    format_ms,
+    median_time,
+    setup_django,
+)
+
+
+def create_movies_with_relations(count):
+    """Movies with the cast, reviews and on-demand links a real page carries."""
+    from movies.models import Actor, Director, Movie, OnDemand, Review
+
+    create_synthetic_movies(count, genre_count=20)
+    actors = Actor.objects.bulk_create(
+        Actor(name=f"Actor {i}") for i in range(count * 4)
+    )
+    directors = Director.objects.bulk_create(
+        Director(name=f"Director {i}") for i in range(count)
+    )
+    movies = list(Movie.objects.order_by("pk"))
+    Movie.actors.through.objects.bulk_create(
+        Movie.actors.through(movie_id=movie.pk, actor_id=actors[i * 4 + j].pk)
+        for i, movie in enumerate(movies)
+        for j in range(4)
+    )
+    Movie.director.through.objects.bulk_create(
+        Movie.director.through(movie_id=movie.pk, director_id=directors[i].pk)
+        for i, movie in enumerate(movies)
+    )
+    Review.objects.bulk_create(
+        Review(movie=movie, source=source, score=score)
+        for movie in movies
+        for source, score in (("imdb", 72), ("metacritic", 65), ("rotten_toms", 88))
+    )
+    OnDemand.objects.bulk_create(
+        OnDemand(
+            movie=movie, service="Google Play", url=f"https://play.example/{movie.pk}"
+        )
+        for movie in movies
+    )
+
+
+def run(page_sizes, loops, repeat):
+    from django.db.models import Value
+    from rest_framework.renderers import JSONRenderer
+
+    from config.renderers import FastJSONRenderer
+    from movies.models import Movie
+    from movies.serializers import MovieCardSerializer, MovieSerializer
+
+    renderers = {"json": JSONRenderer(), "fast": FastJSONRenderer()}
+
+    with benchmark_database():
+        create_movies_with_relations(max(page_sizes))
+        print(f"{'page':<16}{'bytes':>8}{'json':>12}{'fast':>12}{'speedup':>10}")
+        for page_size in page_sizes:
+            movies = list(
+                Movie.objects.with_related()
+                .annotate(on_list=Value(False))
+                .order_by("-avg_rating", "slug")[:page_size]
+            )
+            for name, serializer_class in (
+                ("full", MovieSerializer),
+                ("card", MovieCardSerializer),
+            ):
+                data = {
+                    "count": page_size,
+                    "next": None,
+                    "previous": None,
+                    "results": serializer_class(movies, many=True).data,
+                }
+                timings = {}
+                for renderer_name, renderer in renderers.items():
+
+                    def render():
+                        for _ in range(loops):
+                            renderer.render(data)
+
+                    timings[renderer_name] = median_time(render, repeat) / loops
+                size = len(renderers["fast"].render(data))
+                print(
+                    f"{f'{name} x {page_size}':<16}{size:>8}"
+                    f"{format_ms(timings['json'])}{format_ms(timings['fast'])}"
+                    f"{timings['json'] / timings['fast']:>9.1f}x"
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[30, 100])
+    parser.add_argument("--loops", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.page_sizes, args.loops, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Time /api/movies/search against a synthetic corpus.
+
+    python -m benchmarks.search --sizes 10000 100000 500000
+
+Titles, plots and people come from the Faker instance used by the test
+factories. On Postgres the tsvector column is populated and searched; on
+other databases the in-process index is built and searched instead.
+"""
+
+import argparse
+import random
+
+from .utils import (
+    benchmark_database,
+    create_synthetic_movies,
+    format_ms,
+    median_time,
+    setup_django,
+)
+
+
+def create_corpus(size, seed=0, people_count=20_000, batch_size=5000):
+    from django.db import connection
+
+    from movies.models import Actor, Director, Movie
+    from movies.tests.factories import faker
+
+    faker.seed_instance(seed)
+    rng = random.Random(seed)
+    create_synthetic_movies(
+        size,
+        title=lambda i: faker.catch_phrase(),
+        plot=lambda i: faker.paragraph(nb_sentences=3),
+    )
+    names = list({faker.name() for _ in range(people_count)})
+    actors = Actor.objects.bulk_create(Actor(name=name) for name in names)
+    directors = Director.objects.bulk_create(
+        Director(name=name) for name in names[: people_count // 10]
+    )
+
+    movie_ids = list(Movie.objects.values_list("pk", flat=True))
+    for start in range(0, len(movie_ids), batch_size):
+        end = start + batch_size
+        batch = movie_ids[start:end]
+        Movie.actors.through.objects.bulk_create(
+            Movie.actors.through(movie_id=movie_id, actor_id=actor.pk)
+            for movie_id in batch
+            for actor in rng.sample(actors, 3)
+        )
+        Movie.director.through.objects.bulk_create(
+            Movie.director.through(
+                movie_id=movie_id, director_id=rng.choice(directors).pk
+            )
+            for movie_id in batch
+        )
+        if connection.vendor == "postgresql":
+            Movie.objects.filter(pk__in=batch).update_search_vectors()
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE movies_movie")
+    return names
+
+
+def run(sizes, repeat):
+    from django.db import connection
+    from django.test import override_settings
+    from rest_framework.test import APIRequestFactory
+
+    from movies.catalogue import bump_catalogue_version
+    from movies.search import movie_search_index
+    from movies.views import MovieSearch
+
+    view = MovieSearch.as_view(throttle_classes=[])
+    factory = APIRequestFactory()
+    backend = "postgres" if connection.vendor == "postgresql" else "in-process"
+
+    for size in sizes:
+        with benchmark_database():
+            names = create_corpus(size)
+            queries = {
+                "common word": "solution",
+                "two words": "intuitive framework",
+                "person": names[0].split()[-1],
+                "no match": "zyzzyva",
+            }
+
+            bump_catalogue_version()
+            build_time = 0
+            if backend == "in-process":
+                build_time = median_time(movie_search_index.get, repeat=1)
+
+            print(f"\n{size} movies, {backend} (index build {format_ms(build_time)})")
+            print(f"{'query':<16}{'search':>12}{'results':>9}")
+            for name, query in queries.items():
+                results = []
+
+                def get():
+                    response = view(factory.get("/api/movies/search/", {"q": query}))
+                    assert response.status_code == 200
+                    results[:] = response.data["results"]
+
+                # A zero timeout skips the response cache, so every call searches.
+                with override_settings(CATALOGUE_CACHE_TIMEOUT=0):
+                    search_time = median_time(get, repeat)
+                print(f"{name:<16}{format_ms(search_time)}{len(results):>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
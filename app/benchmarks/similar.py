@@ -0,0 +1,82 @@
+"""Time the refresh_movie_neighbours batch job.
+
+    python -m benchmarks.similar --sizes 10000 100000
+
+Each synthetic movie gets one to three of 20 genres, a director and four
+actors drawn from pools sized to the catalogue, so people recur across
+movies as they do in the real data.
+"""
+
+import argparse
+import random
+import time
+
+from .utils import benchmark_database, create_synthetic_movies, setup_django
+
+
+def create_people(size, seed=0, batch_size=5000):
+    from movies.models import Actor, Director, Movie
+
+    rng = random.Random(seed)
+    actors = Actor.objects.bulk_create(
+        Actor(name=f"Actor {i}") for i in range(max(size // 2, 1))
+    )
+    directors = Director.objects.bulk_create(
+        Director(name=f"Director {i}") for i in range(max(size // 5, 1))
+    )
+    movie_ids = list(Movie.objects.values_list("pk", flat=True))
+    for start in range(0, len(movie_ids), batch_size):
+        end = start + batch_size
+        batch = movie_ids[start:end]
+        Movie.actors.through.objects.bulk_create(
+            Movie.actors.through(movie_id=movie_id, actor_id=actor.pk)
+            for movie_id in batch
+            for actor in rng.sample(actors, 4)
+        )
+        Movie.director.through.objects.bulk_create(
+            Movie.director.through(
+                movie_id=movie_id, director_id=rng.choice(directors).pk
+            )
+            for movie_id in batch
+        )
+
+
+def run(sizes):
+    from movies.models import EligibleMovie
+    from movies.similar import MovieFeatures, refresh_movie_neighbours
+
+    print(
+        f"{'size':<10}{'eligible':>10}{'features':>12}{'neighbours':>12}{'total':>12}"
+    )
+    for size in sizes:
+        with benchmark_database():
+            create_synthetic_movies(size)
+            create_people(size)
+
+            start = time.perf_counter()
+            features = MovieFeatures.from_queryset(EligibleMovie.objects.all())
+            features_time = time.perf_counter() - start
+            start = time.perf_counter()
+            features.nearest_neighbours()
+            neighbours_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            refresh_movie_neighbours()
+            total_time = time.perf_counter() - start
+            print(
+                f"{size:<10}{len(features):>10}{features_time:>11.1f}s"
+                f"{neighbours_time:>11.1f}s{total_time:>11.1f}s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Shared helpers for the benchmark scripts.
+
+Run a benchmark from the app directory, e.g.
+    python -m benchmarks.filter_index --sizes 10000 100000
+Each run creates a throwaway test database and removes it afterwards.
+"""
+
+import contextlib
+import datetime
+import os
+import random
+import statistics
+import time
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """Run the enclosed block against a fresh test database."""
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def median_time(func, repeat=5):
+    """Return the median wall-clock seconds of calling func."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def format_ms(seconds):
+    return f"{seconds * 1000:9.2f} ms"
+
+
+def create_synthetic_movies(
+    count, genre_count=20, batch_size=5000, seed=0, title=None, plot=None
+):
+    """
+    Bulk insert eligible-looking movies with stored ratings and genres.
+
+    title and plot, if given, are called with the movie's index to
+    generate its text.
+
+    Reviews are not created; the stored avg_rating and review_count are set
+    directly, and the eligible movie summary refreshed, as the
+    rebuild_movie_ratings command would leave them.
+    """
+    from movies.models import EligibleMovie, Genre, Movie
+
+    rng = random.Random(seed)
+    genres = Genre.objects.bulk_create(
+        Genre(name=f"Genre {i}") for i in range(genre_count)
+    )
+    genre_ids = [genre.id for genre in genres]
+    through = Movie.genre.through
+    first_day = datetime.date(1925, 1, 1).toordinal()
+    last_day = datetime.date(2024, 12, 31).toordinal()
+
+    for start in range(0, count, batch_size):
+        movies = []
+        movie_genres = []
+        for i in range(start, min(start + batch_size, count)):
+            imdbid = f"tt{i:09d}"
+            movies.append(
+                Movie(
+                    imdbid=imdbid,
+                    title=title(i) if title else f"Synthetic Movie {i}",
+                    slug=f"{i:09d}-synthetic",
+                    released=datetime.date.fromordinal(
+                        rng.randint(first_day, last_day)
+                    ),
+                    runtime=rng.randint(60, 200),
+                    writer="Synthetic Writer",
+                    plot=plot(i) if plot else "A synthetic plot.",
+                    poster_url="www.example.com/img.jpg",
+                    avg_rating=round(rng.uniform(20, 100), 1),
+                    review_count=3,
+                )
+            )
+            for genre_id in rng.sample(genre_ids, rng.randint(1, 3)):
+                movie_genres.append(through(movie_id=imdbid, genre_id=genre_id))
+        Movie.objects.bulk_create(movies)
+        through.objects.bulk_create(movie_genres)
+    EligibleMovie.objects.refresh()
+
+    return genre_ids
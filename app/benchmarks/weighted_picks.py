@@ -0,0 +1,67 @@
+"""Compare AliasTable draws with random.choices over the same weights.
+
+    python -m benchmarks.weighted_picks --sizes 10000 100000 1000000
+
+random.choices is given precomputed cumulative weights, so both sides
+skip their O(n) setup and only the per-draw cost is compared.
+"""
+
+import argparse
+import itertools
+import random
+
+from .utils import format_ms, median_time, setup_django
+
+
+def run(sizes, draws, repeat, seed=0):
+    from movies.picks import AliasTable, rating_weight
+
+    rng = random.Random(seed)
+    print(
+        f"{'size':<10}{'setup':>12}{'alias':>12}{'choices':>12}"
+        f"{'alias draws/s':>16}"
+    )
+    for size in sizes:
+        weights = [
+            rating_weight(rng.uniform(40, 100), rng.randint(1, 3)) for _ in range(size)
+        ]
+        table = None
+
+        def build():
+            nonlocal table
+            table = AliasTable(weights)
+
+        setup_time = median_time(build, repeat=1)
+        cum_weights = list(itertools.accumulate(weights))
+        population = range(size)
+
+        def alias():
+            for _ in range(draws):
+                table.draw(rng)
+
+        def choices():
+            rng.choices(population, cum_weights=cum_weights, k=draws)
+
+        alias_time = median_time(alias, repeat)
+        choices_time = median_time(choices, repeat)
+        print(
+            f"{size:<10}{format_ms(setup_time)}{format_ms(alias_time)}"
+            f"{format_ms(choices_time)}{draws / alias_time:>16,.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--draws", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    run(args.sizes, args.draws, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    orjson serializes dicts, lists (including DRF's ReturnDict/ReturnList),
+    dates and UUIDs natively; anything else goes through DRF's encoder, so
+    Decimals and lazy strings render as they do with JSONRenderer. NaN and
+    infinity render as null rather than raising. Indented or ASCII-only
+    output, and a missing orjson, fall back to JSONRenderer.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson is not None else None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if not self.can_render_fast(indent):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(
+            data, default=self.encoder_class().default, option=self.options
+        )
+        # Match JSONRenderer, which escapes these so output is valid JavaScript.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+    def can_render_fast(self, indent):
+        if orjson is None or indent is not None:
+            return False
+        return self.compact and not self.ensure_ascii
@@ -6,6 +6,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 CONFIG_BASE_DIR = Path(__file__).resolve().parent.parent
 APP_BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -144,14 +146,59 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
-    "DEFAULT_RENDERER_CLASSES": ("rest_framework.renderers.JSONRenderer",),
+    "DEFAULT_RENDERER_CLASSES": ("config.renderers.FastJSONRenderer",),
     "DEFAULT_THROTTLE_CLASSES": [
         "rest_framework.throttling.AnonRateThrottle",
         "rest_framework.throttling.UserRateThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": ANON_RATE_LIMIT, "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": ANON_RATE_LIMIT,
+        "user": "1000/day",
+        "autocomplete": "120/min",
+    },
 }
 
+# Cache settings
+
+REDIS_CACHE_URL = os.environ.get("REDIS_CACHE_URL")
+
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Catalogue settings
+
+CATALOGUE_CACHE_TIMEOUT = 60 * 60 * 24
+CATALOGUE_VERSION_CHECK_INTERVAL = 5
+CATALOGUE_ESTIMATED_COUNTS = int(
+    os.environ.get("CATALOGUE_ESTIMATED_COUNTS", default=0)
+)
+MOVIE_FILTER_INDEX = int(os.environ.get("MOVIE_FILTER_INDEX", default=0))
+ON_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+DECK_TIMEOUT = 60 * 60 * 6
+RECOMMENDATIONS_CACHE_TIMEOUT = 60 * 60 * 24
+GROUP_CONSENT_MAX_AGE = 60 * 60 * 24
+RANDOM_PICK_WEIGHT = "movies.picks.rating_weight"
+
+# OMDB fetching; the rate is shared by every worker when Redis is configured.
+OMDB_REQUESTS_PER_SECOND = float(os.environ.get("OMDB_REQUESTS_PER_SECOND", default=2))
+OMDB_BURST = int(os.environ.get("OMDB_BURST", default=4))
+OMDB_MAX_IN_FLIGHT = int(os.environ.get("OMDB_MAX_IN_FLIGHT", default=4))
+OMDB_MAX_RETRIES = 4
+OMDB_BACKOFF_BASE = 1
+OMDB_BACKOFF_MAX = 60
+OMDB_TIMEOUT = 10
+
 SECRET_SIGNING_KEY = os.environ.get("SECRET_KEY")
 
 SIMPLE_JWT = {
@@ -186,6 +233,16 @@ CELERY_TIMEZONE = "UTC"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 CELERY_IMPORTS = ("movies.tasks",)
+CELERY_BEAT_SCHEDULE = {
+    "update-movie-neighbours": {
+        "task": "movies.tasks.update_movie_neighbours",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "refresh-active-recommendations": {
+        "task": "movies.tasks.refresh_active_recommendations",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
 
 if not DEBUG:
     LOGGING = {
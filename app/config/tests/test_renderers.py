@@ -0,0 +1,62 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from config import renderers
+from config.renderers import FastJSONRenderer
+
+DATA = ReturnDict(
+    {
+        "uid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "released": datetime.date(1994, 5, 1),
+        "added": datetime.datetime(
+            2024, 1, 2, 3, 4, 5, 678, tzinfo=datetime.timezone.utc
+        ),
+        "price": decimal.Decimal("9.99"),
+        "title": "Café\u2028line",
+        "detail": ErrorDetail("Not found.", code="not_found"),
+        "label": gettext_lazy("Movie"),
+        "ratings": {1: 80, 2: 60},
+        "results": ReturnList([{"slug": "a", "on_list": False}], serializer=None),
+    },
+    serializer=None,
+)
+
+
+def test_fast_renderer_matches_json_renderer():
+    fast = FastJSONRenderer().render(DATA)
+    stock = JSONRenderer().render(DATA)
+
+    assert json.loads(fast) == json.loads(stock)
+    assert b"\\u2028" in fast
+
+
+def test_fast_renderer_empty_response():
+    assert FastJSONRenderer().render(None) == b""
+
+
+def test_fast_renderer_indent_falls_back():
+    rendered = (
+        FastJSONRenderer().render({"a": 1}, "application/json; indent=4", {}).decode()
+    )
+    assert rendered == '{\n    "a": 1\n}'
+
+
+def test_fast_renderer_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, "orjson", None)
+    assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA)
+
+
+@pytest.mark.django_db
+def test_api_uses_fast_renderer(client):
+    resp = client.get("/api/genres/")
+    assert resp.status_code == 200
+    assert resp["Content-Type"] == "application/json"
+    assert isinstance(resp.accepted_renderer, FastJSONRenderer)
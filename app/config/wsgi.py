@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
 
 application = get_wsgi_application()
+
+from movies.autocomplete import warm_autocomplete_index  # noqa: E402
+from movies.index import warm_movie_filter_index  # noqa: E402
+
+warm_movie_filter_index()
+warm_autocomplete_index()
@@ -1,10 +1,18 @@
 import pytest
+from django.core.cache import cache
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from accounts.models import CustomUser
 
 
+@pytest.fixture(autouse=True)
+def clear_catalogue_cache(settings):
+    """Start each test with an empty cache and always-fresh catalogue artifacts."""
+    settings.CATALOGUE_VERSION_CHECK_INTERVAL = 0
+    cache.clear()
+
+
 @pytest.fixture
 def auth_user_client():
     user = CustomUser.objects.create_user(
@@ -0,0 +1,33 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Item
+
+
+def on_list_cache_key(user_id):
+    return f"lists:on_list:{user_id}"
+
+
+def get_on_list(user):
+    """
+    Return a token and the set of slugs of movies on any of the user's lists.
+
+    Both are cached per user until invalidate_on_list is called; the token
+    changes whenever the set is rebuilt, so it can stand in for the set in
+    ETags.
+    """
+    key = on_list_cache_key(user.pk)
+    entry = cache.get(key)
+    if entry is None:
+        slugs = Item.objects.filter(_list__owner=user).values_list(
+            "movie__slug", flat=True
+        )
+        entry = (uuid.uuid4().hex, frozenset(slugs))
+        cache.set(key, entry, settings.ON_LIST_CACHE_TIMEOUT)
+    return entry
+
+
+def invalidate_on_list(user_id):
+    cache.delete(on_list_cache_key(user_id))
@@ -1,6 +1,10 @@
 import uuid
 
 from django.db import models
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
 
 from accounts.models import CustomUser
 from movies.models import Movie
@@ -26,3 +30,30 @@ class Item(models.Model):
 
     def __str__(self):
         return f"{self.movie} on {self._list}"
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed_receiver(sender, instance, *args, **kwargs):
+    from movies.recommendations import update_recommendations
+
+    from .cache import invalidate_on_list
+
+    lists = List.objects.filter(pk=instance._list_id)
+    lists.update(updated=timezone.now())
+    for owner_id in lists.values_list("owner_id", flat=True):
+        invalidate_on_list(owner_id)
+        update_recommendations(owner_id, instance.movie_id)
+
+
+def get_list_version(user):
+    """
+    Return the last change to any of the user's lists, and a token that
+    changes whenever one of those lists or its items does.
+    """
+    lists = List.objects.filter(owner=user).aggregate(
+        updated=Max("updated"), items=Count("item")
+    )
+    updated = lists["updated"]
+    stamp = updated.isoformat() if updated else ""
+    return updated, f"{user.pk}:{stamp}:{lists['items']}"
@@ -1,16 +1,17 @@
 from rest_framework import serializers
 
 from lists.models import Item, List
+from movies.fieldsets import SparseFieldsSerializerMixin
 from movies.serializers import MovieSerializer
 
 
-class ListSerializer(serializers.ModelSerializer):
+class ListSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = List
         fields = ["name"]
 
 
-class ItemSerializer(serializers.ModelSerializer):
+class ItemSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     movie = MovieSerializer(read_only=True)
     _list = ListSerializer(read_only=True)
 
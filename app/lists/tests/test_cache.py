@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from accounts.models import CustomUser
+from lists.cache import get_on_list
+from lists.models import Item, List
+from movies.tests.factories import MovieFactory
+
+DEFAULT_LIST = "watch-list"
+
+
+@pytest.mark.django_db
+def test_on_list_cached_per_user(django_assert_num_queries):
+    user = CustomUser.objects.create_user(email="standard@user.com", password="testpw")
+    other_user = CustomUser.objects.create_user(
+        email="other@user.com", password="testpw"
+    )
+    movie = MovieFactory()
+    Item.objects.create(
+        _list=List.objects.create(owner=user, name=DEFAULT_LIST), movie=movie
+    )
+
+    token, on_list = get_on_list(user)
+    assert on_list == {movie.slug}
+
+    with django_assert_num_queries(0):
+        assert get_on_list(user) == (token, on_list)
+
+    assert get_on_list(other_user)[1] == set()
+
+
+@pytest.mark.django_db
+def test_on_list_invalidated_by_list_changes(auth_user_client):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    movie = MovieFactory(review=[80])
+    token, _ = get_on_list(user)
+
+    data = json.dumps({"movie_slug": movie.slug})
+    auth_user_client.post("/list/", data, content_type="application/json")
+    added_token, on_list = get_on_list(user)
+    assert added_token != token
+    assert on_list == {movie.slug}
+    assert auth_user_client.get("/api/movies/").data["results"][0]["on_list"] is True
+
+    data = json.dumps({"watched": True})
+    auth_user_client.patch(
+        f"/list/{movie.slug}/", data, content_type="application/json"
+    )
+    patched_token, on_list = get_on_list(user)
+    assert patched_token != added_token
+    assert on_list == {movie.slug}
+
+    auth_user_client.delete(f"/list/{movie.slug}/")
+    assert get_on_list(user)[1] == set()
+    assert auth_user_client.get("/api/movies/").data["results"][0]["on_list"] is False
@@ -1,7 +1,7 @@
 import pytest
 
 from accounts.models import CustomUser
-from lists.models import Item, List
+from lists.models import Item, List, get_list_version
 from movies.tests.factories import MovieFactory
 
 
@@ -38,3 +38,34 @@ def test_item_model():
     assert item.added
     assert item.updated
     assert str(item) == f"{item.movie} on {item._list}"
+
+
+@pytest.mark.django_db
+def test_list_updated_when_items_change():
+    user = CustomUser.objects.create_user(email="standard@user.com", password="testpw")
+    _list = List.objects.create(owner=user, name="test list")
+    created = _list.updated
+
+    item = Item.objects.create(_list=_list, movie=MovieFactory())
+    _list.refresh_from_db()
+    added = _list.updated
+    assert added > created
+
+    item.delete()
+    _list.refresh_from_db()
+    assert _list.updated > added
+
+
+@pytest.mark.django_db
+def test_get_list_version():
+    user = CustomUser.objects.create_user(email="standard@user.com", password="testpw")
+    assert get_list_version(user) == (None, f"{user.pk}::0")
+
+    _list = List.objects.create(owner=user, name="test list")
+    Item.objects.create(_list=_list, movie=MovieFactory())
+    _list.refresh_from_db()
+
+    assert get_list_version(user) == (
+        _list.updated,
+        f"{user.pk}:{_list.updated.isoformat()}:1",
+    )
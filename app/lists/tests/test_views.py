@@ -4,7 +4,8 @@ import pytest
 
 from accounts.models import CustomUser
 from lists.models import Item, List
-from movies.tests.factories import MovieFactory
+from movies.models import Actor
+from movies.tests.factories import MovieFactory, MovieWithGenreFactory
 
 DEFAULT_LIST = "watch-list"
 
@@ -278,3 +279,75 @@ def test_update_single_list_item_not_authorized(client):
     )
     assert resp.status_code == 401
     assert resp.data["detail"] == "Authentication credentials were not provided."
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("item_count", [1, 30])
+def test_get_all_list_items_query_budget(
+    auth_user_client, django_assert_num_queries, item_count
+):
+    """Nested movie relations are prefetched, so list size doesn't change query count."""
+    user = CustomUser.objects.get(email="fixture@user.com")
+    _list = List.objects.create(owner=user, name=DEFAULT_LIST)
+    actor = Actor.objects.create(name="Clem Fandango")
+    for _ in range(item_count):
+        movie = MovieWithGenreFactory(genre=["comedy"], review=[60, 80])
+        movie.actors.add(actor)
+        Item.objects.create(_list=_list, movie=movie)
+
+    # user, list version, list, count, items with movie, then one prefetch per
+    # nested relation
+    with django_assert_num_queries(10):
+        resp = auth_user_client.get("/list/")
+
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == item_count
+    assert resp.data["results"][0]["movie"]["avg_rating"] == 70.0
+
+
+@pytest.mark.django_db
+def test_get_list_items_sparse_fields(auth_user_client, django_assert_num_queries):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    _list = List.objects.create(owner=user, name=DEFAULT_LIST)
+    movie = MovieWithGenreFactory(genre=["comedy"], review=[60, 80])
+    Item.objects.create(_list=_list, movie=movie)
+
+    # user, list version, list, count, items with movie; no nested relations
+    with django_assert_num_queries(5):
+        resp = auth_user_client.get("/list/?fields=watched,movie.title")
+
+    assert resp.status_code == 200
+    assert resp.data["results"] == [
+        {"watched": False, "movie": {"slug": movie.slug, "title": movie.title}}
+    ]
+
+
+@pytest.mark.django_db
+def test_get_list_items_not_modified(auth_user_client, django_assert_num_queries):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    _list = List.objects.create(owner=user, name=DEFAULT_LIST)
+    item = Item.objects.create(_list=_list, movie=MovieFactory())
+    first = auth_user_client.get("/list/")
+    assert first["Last-Modified"]
+
+    # user, then the list version
+    with django_assert_num_queries(2):
+        resp = auth_user_client.get("/list/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert resp.status_code == 304
+
+    resp = auth_user_client.get("/list/?page=1", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert resp.status_code == 200
+
+    data = json.dumps({"watched": True})
+    auth_user_client.patch(
+        f"/list/{item.movie.slug}/", data, content_type="application/json"
+    )
+    resp = auth_user_client.get("/list/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert resp.status_code == 200
+    assert resp.data["results"][0]["watched"] is True
+
+    etag = resp["ETag"]
+    auth_user_client.delete(f"/list/{item.movie.slug}/")
+    resp = auth_user_client.get("/list/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp.data["results"] == []
@@ -1,18 +1,23 @@
 from django.core.exceptions import ObjectDoesNotExist
 from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import permissions, status
 from rest_framework.generics import ListAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from lists.models import Item, List
+from lists.models import Item, List, get_list_version
 from lists.serializers import CreateItemSerializer, ItemSerializer
+from movies.cache import canonical_query, make_etag
+from movies.catalogue import get_catalogue_version
+from movies.fieldsets import SparseFieldsViewMixin
 from movies.models import Movie
 
 DEFAULT_LIST = "watch-list"
 
 
-class MovieItemList(ListAPIView):
+class MovieItemList(SparseFieldsViewMixin, ListAPIView):
     serializer_class = ItemSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -22,10 +27,45 @@ class MovieItemList(ListAPIView):
         except ObjectDoesNotExist:
             return List.objects.create(name=name, owner=owner)
 
+    def list(self, request, *args, **kwargs):
+        """
+        Answer If-None-Match/If-Modified-Since with 304 from the user's list
+        version alone, before the list or its movies are loaded.
+        """
+        updated, list_version = get_list_version(request.user)
+        etag = make_etag(
+            get_catalogue_version(),
+            list_version,
+            canonical_query(request.query_params, request.query_params),
+        )
+        last_modified = int(updated.timestamp()) if updated else None
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
     def get_queryset(self, format=None):
         user = self.request.user
         _list = self.get_list_or_create(name=DEFAULT_LIST, owner=user)
-        return Item.objects.filter(_list=_list).order_by("-added")
+        items = Item.objects.filter(_list=_list).order_by("-added")
+
+        fields = self.get_serializer().fields
+        if "_list" in fields:
+            items = items.select_related("_list")
+        if "movie" in fields:
+            related_fields = fields["movie"].get_related_fields()
+            items = items.select_related("movie").prefetch_related(
+                *(f"movie__{field}" for field in related_fields)
+            )
+        return items
 
     def post(self, request, *args, **kwargs):
         serializer = CreateItemSerializer(data=request.data)
@@ -1,5 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
 
+from .catalogue import bump_catalogue_version
 from .models import Movie
 
 
@@ -17,7 +19,10 @@ class MovieAdmin(admin.ModelAdmin):
         "country",
         "poster_url",
         "type_field",
+        "avg_rating",
+        "review_count",
     )
+    readonly_fields = ("avg_rating", "review_count")
     list_display = (
         "imdbid",
         "title",
@@ -30,4 +35,18 @@ class MovieAdmin(admin.ModelAdmin):
         "country",
         "poster_url",
         "type_field",
+        "avg_rating",
+        "review_count",
     )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(bump_catalogue_version)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        transaction.on_commit(bump_catalogue_version)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        transaction.on_commit(bump_catalogue_version)
@@ -0,0 +1,129 @@
+import heapq
+import logging
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db.models import Max
+
+from .catalogue import CatalogueArtifact
+from .models import EligibleMovie, Movie
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+MOVIE = "movie"
+PERSON = "person"
+MAX_SUGGESTIONS = 20
+# Prefixes up to this length can match most of the catalogue, so their
+# results are worked out when the index is built rather than per keystroke.
+PRECOMPUTED_PREFIX_LENGTH = 3
+
+
+def fold(text):
+    """Lower-case text, strip accents and collapse punctuation to spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(tokenize(text))
+
+
+class AutocompleteIndex:
+    """
+    Sorted prefix index over movie titles and cast and director names.
+
+    Every word of a title or name starts a key, so "sta" finds "Space
+    Station". Suggestions are numbered in rank order (movies by avg_rating,
+    people by their best listed movie), which makes the best matches for a
+    prefix the smallest suggestion numbers in its range of keys.
+    """
+
+    def __init__(self, suggestions, keys, key_suggestions):
+        self.suggestions = suggestions
+        self.keys = keys
+        self.key_suggestions = key_suggestions
+        self.prefix_suggestions = self.precompute_short_prefixes()
+
+    def __len__(self):
+        return len(self.suggestions)
+
+    @classmethod
+    def from_suggestions(cls, suggestions):
+        """Build from (score, suggestion) pairs; each suggestion needs a label."""
+        ranked = sorted(suggestions, key=lambda pair: (-pair[0], pair[1]["label"]))
+        entries = sorted(
+            (key, number)
+            for number, (_, suggestion) in enumerate(ranked)
+            for key in cls.suggestion_keys(suggestion["label"])
+        )
+        return cls(
+            [suggestion for _, suggestion in ranked],
+            [key for key, _ in entries],
+            array("l", (number for _, number in entries)),
+        )
+
+    @staticmethod
+    def suggestion_keys(label):
+        words = fold(label).split(" ")
+        return {" ".join(words[start:]) for start in range(len(words)) if words[start]}
+
+    def precompute_short_prefixes(self):
+        prefix_suggestions = defaultdict(list)
+        for number, suggestion in enumerate(self.suggestions):
+            for key in self.suggestion_keys(suggestion["label"]):
+                for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                    numbers = prefix_suggestions[key[:length]]
+                    if len(numbers) < MAX_SUGGESTIONS and numbers[-1:] != [number]:
+                        numbers.append(number)
+        return dict(prefix_suggestions)
+
+    def suggest(self, query, limit):
+        """Return up to limit suggestions whose words start with query, best first."""
+        prefix = fold(query)
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            numbers = self.prefix_suggestions.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + "\U0010ffff", lo=start)
+            numbers = heapq.nsmallest(limit, set(self.key_suggestions[start:end]))
+        return [self.suggestions[number] for number in numbers]
+
+
+def build_autocomplete_index():
+    suggestions = [
+        (avg_rating, {"type": MOVIE, "label": title, "slug": slug})
+        for avg_rating, title, slug in EligibleMovie.objects.values_list(
+            "avg_rating", "movie__title", "slug"
+        )
+    ]
+
+    people = {}
+    for through, field in (
+        (Movie.actors.through, "actor__name"),
+        (Movie.director.through, "director__name"),
+    ):
+        best_ratings = (
+            through.objects.filter(movie__eligible__isnull=False)
+            .values_list(field)
+            .annotate(best_rating=Max("movie__eligible__avg_rating"))
+        )
+        for name, best_rating in best_ratings:
+            people[name] = max(best_rating, people.get(name, best_rating))
+    suggestions.extend(
+        (best_rating, {"type": PERSON, "label": name})
+        for name, best_rating in people.items()
+    )
+    return AutocompleteIndex.from_suggestions(suggestions)
+
+
+autocomplete_index = CatalogueArtifact(build_autocomplete_index, background=True)
+
+
+def warm_autocomplete_index():
+    """Build the index up front so the first keystroke doesn't pay for it."""
+    try:
+        autocomplete_index.get()
+    except Exception as e:
+        logger.error(f"Failed to build autocomplete index: {e}")
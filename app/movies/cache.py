@@ -0,0 +1,86 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from lists.cache import get_on_list
+
+from .catalogue import get_catalogue_version
+
+
+def canonical_query(query_params, keys):
+    """Encode the given query params in a stable order, ignoring any others."""
+    return urlencode(
+        [(key, query_params[key]) for key in sorted(keys) if query_params.get(key)]
+    )
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.sha256("|".join(parts).encode()).hexdigest()[:32])
+
+
+def catalogue_cache_key(prefix, *parts):
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    return f"catalogue:{prefix}:{get_catalogue_version()}:{digest}"
+
+
+class CatalogueCacheMixin:
+    """
+    Serve catalogue responses from the shared cache.
+
+    Entries are keyed on the request path, the canonical form of
+    cache_query_params and the catalogue version, so bumping the version
+    retires every entry at once. Only the anonymous representation is
+    cached; add_user_fields merges per-user data in after the lookup.
+
+    Responses carry a strong ETag over the same key, plus the user's
+    on-list token when user_fields is set, and a matching If-None-Match is
+    answered with 304 before the cache or database is touched.
+    """
+
+    cache_prefix = None
+    cache_query_params = ()
+    user_fields = False
+
+    def get_canonical_query(self, request):
+        return canonical_query(request.query_params, self.cache_query_params)
+
+    def get_cache_key(self, request):
+        return catalogue_cache_key(
+            self.cache_prefix,
+            request.get_host(),
+            request.path,
+            self.get_canonical_query(request),
+        )
+
+    def get_etag(self, request, key):
+        if not self.user_fields or not request.user.is_authenticated:
+            return make_etag(key)
+        on_list_token, _ = get_on_list(request.user)
+        return make_etag(key, on_list_token)
+
+    def cached_response(self, request, get_data):
+        key = self.get_cache_key(request)
+        etag = self.get_etag(request, key)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
+
+        data = cache.get(key)
+        if data is None:
+            data = get_data()
+            cache.set(key, data, settings.CATALOGUE_CACHE_TIMEOUT)
+        response = Response(
+            self.add_user_fields(request, data), status=status.HTTP_200_OK
+        )
+        response["ETag"] = etag
+        return response
+
+    def add_user_fields(self, request, data):
+        return data
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_VERSION_KEY = "catalogue:version"
+
+
+def get_catalogue_version(key=CATALOGUE_VERSION_KEY):
+    """
+    Return the token identifying the current state of the movie catalogue,
+    or of the part of it versioned under key.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_catalogue_version(key=CATALOGUE_VERSION_KEY):
+    """Mark every structure derived from the catalogue (or key) as stale."""
+    version = uuid.uuid4().hex
+    cache.set(key, version, timeout=None)
+    return version
+
+
+class CatalogueArtifact:
+    """
+    Process-local value derived from the catalogue.
+
+    The value is built on first use and rebuilt whenever the catalogue
+    version changes. The shared version is checked at most once every
+    CATALOGUE_VERSION_CHECK_INTERVAL seconds, and the build runs under a
+    lock so threads in a worker share a single copy. get(build=False)
+    returns None instead of building, for callers that mustn't wait.
+
+    With background=True, a value that is already built keeps being served
+    while one thread rebuilds it, so only the first build holds up requests.
+    """
+
+    def __init__(self, build, background=False):
+        self.build = build
+        self.background = background
+        self._lock = threading.Lock()
+        self._value = None
+        self._version = None
+        self._checked_at = None
+        self._rebuild_thread = None
+
+    def get(self, build=True):
+        now = time.monotonic()
+        interval = settings.CATALOGUE_VERSION_CHECK_INTERVAL
+        if self._checked_at is not None and now - self._checked_at < interval:
+            return self._value
+
+        version = get_catalogue_version()
+        if version != self._version:
+            if not build:
+                return None
+            if self.background and self._value is not None:
+                self._start_rebuild(version)
+            else:
+                with self._lock:
+                    if version != self._version:
+                        self._value = self.build()
+                        self._version = version
+        self._checked_at = now
+        return self._value
+
+    def _start_rebuild(self, version):
+        with self._lock:
+            if self._rebuild_thread is not None and self._rebuild_thread.is_alive():
+                return
+            self._rebuild_thread = threading.Thread(
+                target=self._rebuild, args=(version,), daemon=True
+            )
+            self._rebuild_thread.start()
+
+    def _rebuild(self, version):
+        try:
+            value = self.build()
+            with self._lock:
+                self._value = value
+                self._version = version
+        except Exception as e:
+            logger.error(f"Failed to rebuild catalogue artifact: {e}")
+        finally:
+            connections.close_all()
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+            self._version = None
+            self._checked_at = None
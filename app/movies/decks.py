@@ -0,0 +1,81 @@
+import random
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+DECK_CHUNK_SIZE = 500
+MAX_DEAL = 50
+
+
+def deck_cache_key(deck_id, part):
+    return f"deck:{deck_id}:{part}"
+
+
+class Deck:
+    """
+    Shuffled permutation of movie ids, dealt out in order from the cache.
+
+    The permutation is stored in chunks next to a position counter. Dealing
+    advances the counter with cache.incr, which is atomic on Redis, so
+    concurrent deals from one deck never share a movie. Each deal reads only
+    the chunks it needs, and every key expires DECK_TIMEOUT seconds after
+    the deck was created.
+    """
+
+    def __init__(self, deck_id, size, owner_id=None, chunk_size=DECK_CHUNK_SIZE):
+        self.deck_id = deck_id
+        self.size = size
+        self.owner_id = owner_id
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def create(cls, movie_ids, owner_id=None, chunk_size=DECK_CHUNK_SIZE):
+        movie_ids = list(movie_ids)
+        random.shuffle(movie_ids)
+        deck = cls(uuid.uuid4().hex, len(movie_ids), owner_id, chunk_size)
+        values = {
+            deck_cache_key(deck.deck_id, "meta"): (deck.size, owner_id, chunk_size),
+            deck_cache_key(deck.deck_id, "position"): 0,
+        }
+        for number, start in enumerate(range(0, deck.size, deck.chunk_size)):
+            end = start + deck.chunk_size
+            values[deck.chunk_key(number)] = movie_ids[start:end]
+        cache.set_many(values, settings.DECK_TIMEOUT)
+        return deck
+
+    @classmethod
+    def load(cls, deck_id):
+        """Return the deck with this id, or None if it has expired."""
+        meta = cache.get(deck_cache_key(deck_id, "meta"))
+        if meta is None:
+            return None
+        return cls(deck_id, *meta)
+
+    def chunk_key(self, number):
+        return deck_cache_key(self.deck_id, f"chunk:{number}")
+
+    def deal(self, count):
+        """
+        Return the next count movie ids and how many remain, or None if the
+        deck expired.
+        """
+        try:
+            end = cache.incr(deck_cache_key(self.deck_id, "position"), count)
+        except ValueError:
+            return None
+        start = min(end - count, self.size)
+        end = min(end, self.size)
+        if start == end:
+            return [], 0
+
+        first, last = start // self.chunk_size, (end - 1) // self.chunk_size
+        keys = [self.chunk_key(number) for number in range(first, last + 1)]
+        chunks = cache.get_many(keys)
+        if len(chunks) < len(keys):
+            return None
+        movie_ids = [movie_id for key in keys for movie_id in chunks[key]]
+        offset = first * self.chunk_size
+        remaining = self.size - end
+        start, end = start - offset, end - offset
+        return movie_ids[start:end], remaining
@@ -0,0 +1,115 @@
+from collections import Counter
+
+from django.db.models import Count, Q
+
+from .filters import MovieFilter
+from .index import MISSING_RUNTIME, get_movie_filter_index
+from .models import RUNTIME_BUCKET_BOUNDS, EligibleMovie, Genre
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def count_from_index(index, filter_params):
+    """Return (total, genre, decade, runtime bucket counts) from the index."""
+    mask = index.match(filter_params)
+    genre_bits = index.genre_bits[mask]
+    genres = {
+        genre_id: np.count_nonzero(genre_bits & index.genre_masks[genre_id])
+        for genre_id in index.genre_ids
+    }
+    decades, decade_counts = np.unique(index.years[mask] // 10 * 10, return_counts=True)
+    runtimes = index.runtimes[mask]
+    runtimes = runtimes[runtimes != MISSING_RUNTIME]
+    buckets = np.bincount(
+        np.searchsorted(RUNTIME_BUCKET_BOUNDS, runtimes, side="right"),
+        minlength=len(RUNTIME_BUCKET_BOUNDS) + 1,
+    )
+    return (
+        int(np.count_nonzero(mask)),
+        {genre_id: int(count) for genre_id, count in genres.items()},
+        dict(zip(decades.tolist(), decade_counts.tolist())),
+        dict(enumerate(buckets.tolist())),
+    )
+
+
+def count_from_database(filter_params, genre_ids):
+    """
+    Return (total, genre, decade, runtime bucket counts) from one query.
+
+    Matches are grouped by decade and runtime bucket, with a conditional
+    count per genre in each group, so the filtered movies are read once
+    and the groups summed here.
+    """
+    queryset = MovieFilter(filter_params, queryset=EligibleMovie.objects.all()).qs
+    rows = (
+        queryset.order_by()
+        .values("decade", "runtime_bucket")
+        .annotate(
+            total=Count("pk", distinct=True),
+            **{
+                f"genre_{genre_id}": Count("pk", filter=Q(movie__genre=genre_id))
+                for genre_id in genre_ids
+            },
+        )
+    )
+    total, genres, decades, buckets = 0, Counter(), Counter(), Counter()
+    for row in rows:
+        total += row["total"]
+        decades[row["decade"]] += row["total"]
+        if row["runtime_bucket"] is not None:
+            buckets[row["runtime_bucket"]] += row["total"]
+        for genre_id in genre_ids:
+            genres[genre_id] += row[f"genre_{genre_id}"]
+    return total, genres, decades, buckets
+
+
+def runtime_facet(bucket, count):
+    """Describe a runtime bucket by its min and max; None where open-ended."""
+    bounds = (None, *RUNTIME_BUCKET_BOUNDS, None)
+    high = bounds[bucket + 1]
+    return {
+        "bucket": bucket,
+        "min": bounds[bucket],
+        "max": None if high is None else high - 1,
+        "count": count,
+    }
+
+
+def facet_counts(filter_params):
+    """
+    Return how many listed movies match filter_params in total and per
+    genre, decade and runtime bucket.
+
+    Uses the movie filter index when it is enabled, and a single grouped
+    query otherwise.
+    """
+    genre_names = dict(Genre.objects.values_list("pk", "name"))
+    index = get_movie_filter_index()
+    if index is not None:
+        total, genres, decades, buckets = count_from_index(index, filter_params)
+    else:
+        total, genres, decades, buckets = count_from_database(
+            filter_params, sorted(genre_names)
+        )
+
+    genre_facets = [
+        {"id": genre_id, "name": name, "count": genres.get(genre_id, 0)}
+        for genre_id, name in genre_names.items()
+    ]
+    genre_facets.sort(key=lambda facet: (-facet["count"], facet["name"]))
+    return {
+        "count": total,
+        "genres": genre_facets,
+        "decades": [
+            {"decade": decade, "count": count}
+            for decade, count in sorted(decades.items())
+            if count
+        ],
+        "runtimes": [
+            runtime_facet(bucket, buckets.get(bucket, 0))
+            for bucket in range(len(RUNTIME_BUCKET_BOUNDS) + 1)
+        ],
+    }
@@ -0,0 +1,95 @@
+from rest_framework.exceptions import ValidationError
+
+
+def parse_fields(value):
+    """
+    Parse a ?fields= value into a tree of requested fields.
+
+    "title,genre.name" becomes {"title": None, "genre": {"name": None}};
+    None selects the whole field, including every nested field.
+    """
+    tree = {}
+    for path in value.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        *parents, leaf = path.split(".")
+        node = tree
+        for name in parents:
+            if name in node and node[name] is None:
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[leaf] = None
+    return tree
+
+
+def format_fields(tree, prefix=""):
+    """Return the canonical, sorted ?fields= value for a parsed tree."""
+    paths = []
+    for name, subtree in sorted(tree.items()):
+        if subtree is None:
+            paths.append(f"{prefix}{name}")
+        else:
+            paths.append(format_fields(subtree, prefix=f"{prefix}{name}."))
+    return ",".join(paths)
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer that can be limited to a subset of its fields.
+
+    Pass fields as a tree from parse_fields; nested serializers using this
+    mixin are limited to their part of the tree. Fields named in
+    always_included_fields are kept regardless.
+    """
+
+    always_included_fields = ()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            self.restrict_fields(fields)
+
+    def restrict_fields(self, tree, prefix=""):
+        unknown = sorted(set(tree) - set(self.fields))
+        if unknown:
+            names = ", ".join(f"{prefix}{name}" for name in unknown)
+            raise ValidationError({"fields": [f"Unknown fields: {names}."]})
+
+        for name in list(self.fields):
+            if name not in tree and name not in self.always_included_fields:
+                self.fields.pop(name)
+            elif tree.get(name):
+                field = self.fields[name]
+                field = getattr(field, "child", field)
+                if not isinstance(field, SparseFieldsSerializerMixin):
+                    raise ValidationError(
+                        {"fields": [f"{prefix}{name} has no nested fields."]}
+                    )
+                field.restrict_fields(tree[name], prefix=f"{prefix}{name}.")
+
+
+class SparseFieldsViewMixin:
+    """
+    Honour ?fields= by limiting the serializer to the requested fields.
+
+    The value is parsed and validated before any query runs, and its
+    canonical form is added to the catalogue cache key.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        value = request.query_params.get("fields")
+        self.requested_fields = parse_fields(value) if value else None
+        self.get_serializer()
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault("fields", self.requested_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_canonical_query(self, request):
+        query = super().get_canonical_query(request)
+        if self.requested_fields is None:
+            return query
+        return f"{query}&fields={format_fields(self.requested_fields)}"
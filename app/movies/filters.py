@@ -1,10 +1,149 @@
+import re
+from dataclasses import dataclass
+
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+
+from .models import EligibleMovie, Movie
+
+DECADE_PATTERN = re.compile(r"^(pre|[1-9]\d{3})$")
+RUNTIME_PATTERN = re.compile(r"^[<>]?\d{1,3}$")
+GENRES_PATTERN = re.compile(r"^\d+(,\d+)*$")
+MAX_GENRE_ID = 2**31 - 1
+
+PRE_DECADE_START = 1920
+PRE_DECADE_END = 1959
+SHORT_RUNTIME_MAX = 74
+LONG_RUNTIME_MIN = 151
+RUNTIME_OFFSET_IF_EQUAL = 3
+MATCH_ANY_GENRE = "any"
+MATCH_ALL_GENRES = "all"
+
+
+@dataclass(frozen=True)
+class MovieFilterParams:
+    """
+    Validated, canonical form of the MovieFilter query parameters.
+
+    Genres are sorted and deduplicated, decades are snapped to year bounds
+    and the runtime boundary rules are applied, so equivalent queries
+    produce the same key. genre_match says whether a movie needs any or
+    all of the genres; with fewer than two genres it is always "any".
+    """
+
+    genres: tuple[int, ...] = ()
+    genre_match: str = MATCH_ANY_GENRE
+    year_min: int | None = None
+    year_max: int | None = None
+    runtime_min: int | None = None
+    runtime_max: int | None = None
+
+    @classmethod
+    def from_query(cls, query_params):
+        errors = {}
+        genres = query_params.get("g") or ""
+        genre_match = query_params.get("gmatch") or MATCH_ANY_GENRE
+        decade_min = query_params.get("dmin") or ""
+        decade_max = query_params.get("dmax") or ""
+        runtime_min = query_params.get("rmin") or ""
+        runtime_max = query_params.get("rmax") or ""
+
+        if genres and not GENRES_PATTERN.match(genres):
+            errors["g"] = ["Enter a comma-separated list of genre ids."]
+        elif genres and max(map(int, genres.split(","))) > MAX_GENRE_ID:
+            errors["g"] = [f"Genre ids can be at most {MAX_GENRE_ID}."]
+        if genre_match not in (MATCH_ANY_GENRE, MATCH_ALL_GENRES):
+            errors["gmatch"] = [f"Choose '{MATCH_ANY_GENRE}' or '{MATCH_ALL_GENRES}'."]
+        for name, value in (("dmin", decade_min), ("dmax", decade_max)):
+            if value and not DECADE_PATTERN.match(value):
+                errors[name] = ["Enter a four-digit decade or 'pre'."]
+        for name, value in (("rmin", runtime_min), ("rmax", runtime_max)):
+            if value and not RUNTIME_PATTERN.match(value):
+                errors[name] = ["Enter a runtime in minutes, optionally after < or >."]
+        if errors:
+            raise ValidationError(errors)
+
+        genres = tuple(sorted({int(genre) for genre in genres.split(",") if genre}))
+        if len(genres) < 2:
+            genre_match = MATCH_ANY_GENRE
+        return cls(
+            genres=genres,
+            genre_match=genre_match,
+            year_min=cls._year_min(decade_min),
+            year_max=cls._year_max(decade_max),
+            **cls._runtime_bounds(runtime_min, runtime_max),
+        )
+
+    @staticmethod
+    def _year_min(decade):
+        if not decade:
+            return None
+        if decade == "pre":
+            return PRE_DECADE_START
+        return int(decade) // 10 * 10
+
+    @staticmethod
+    def _year_max(decade):
+        if not decade:
+            return None
+        if decade == "pre":
+            return PRE_DECADE_END
+        return int(decade) // 10 * 10 + 9
+
+    @staticmethod
+    def _runtime_bounds(runtime_min, runtime_max):
+        """
+        If runtimes are the same (and not a boundary value), offset them so
+        we can return a larger range of movies (not just that exact runtime).
+        A '<' minimum or '>' maximum is open-ended.
+        """
+        is_boundary = runtime_min[:1] in ("<", ">")
+        if runtime_min and runtime_min == runtime_max and not is_boundary:
+            return {
+                "runtime_min": int(runtime_min) - RUNTIME_OFFSET_IF_EQUAL,
+                "runtime_max": int(runtime_max) + RUNTIME_OFFSET_IF_EQUAL,
+            }
+
+        if not runtime_min or runtime_min.startswith("<"):
+            runtime_min = None
+        elif runtime_min.startswith(">"):
+            runtime_min = LONG_RUNTIME_MIN
+        else:
+            runtime_min = int(runtime_min)
+
+        if not runtime_max or runtime_max.startswith(">"):
+            runtime_max = None
+        elif runtime_max.startswith("<"):
+            runtime_max = SHORT_RUNTIME_MAX
+        else:
+            runtime_max = int(runtime_max)
 
-from .models import Movie
+        return {"runtime_min": runtime_min, "runtime_max": runtime_max}
+
+    def as_filter_data(self):
+        """Return the params as MovieFilter form data, omitting unset values."""
+        data = {
+            "g": ",".join(str(genre) for genre in self.genres) or None,
+            "gmatch": None if self.genre_match == MATCH_ANY_GENRE else self.genre_match,
+            "dmin": self.year_min,
+            "dmax": self.year_max,
+            "rmin": self.runtime_min,
+            "rmax": self.runtime_max,
+        }
+        return {name: str(value) for name, value in data.items() if value is not None}
+
+    @property
+    def key(self):
+        """Canonical query string shared by caches, ETags and logs."""
+        return "&".join(
+            f"{name}={value}" for name, value in self.as_filter_data().items()
+        )
 
 
 class MovieFilter(filters.FilterSet):
-    g = filters.CharFilter(field_name="genre__id", method="filter_genre")
+    g = filters.CharFilter(field_name="movie__genre__id", method="filter_genre")
+    gmatch = filters.CharFilter(method="filter_genre_match")
     dmin = filters.CharFilter(method="filter_decade_min")
     dmax = filters.CharFilter(method="filter_decade_max")
     rmin = filters.CharFilter(method="filter_runtime_min")
@@ -12,58 +151,57 @@ class MovieFilter(filters.FilterSet):
 
     def __init__(self, data=None, queryset=None, *, request=None, **kwargs):
         """
-        If runtimes are the same (and not a boundary value), offset them so
-        we can return a larger range of movies (not just that exact runtime).
+        Accept raw query params or MovieFilterParams; either way the filters
+        receive canonical values (genre ids, first/last year, minutes).
         """
-        runtime_offset_if_equal = 3
-
-        if data and "rmin" in data and "rmax" in data:
-            if data["rmin"] == data["rmax"] and not self._is_boundary_runtime(
-                data["rmin"]
-            ):
-                rmin = int(data["rmin"]) - runtime_offset_if_equal
-                rmax = int(data["rmax"]) + runtime_offset_if_equal
-                data = {**data, "rmin": str(rmin), "rmax": str(rmax)}
+        if data is not None:
+            if not isinstance(data, MovieFilterParams):
+                data = MovieFilterParams.from_query(data)
+            data = data.as_filter_data()
 
         super().__init__(data=data, queryset=queryset, **kwargs)
 
     def filter_genre(self, queryset, name, value):
-        if value:
-            return queryset.filter(genre__id__in=value.split(","))
+        """
+        Filter with EXISTS semi-joins on the movie-genre table, so a movie
+        matching several genres still appears once and no DISTINCT is needed.
+        """
+        if not value:
+            return queryset
+        genre_ids = [int(genre_id) for genre_id in value.split(",")]
+        movie_genres = Movie.genre.through.objects.filter(movie_id=OuterRef("pk"))
+        if self.form.cleaned_data.get("gmatch") == MATCH_ALL_GENRES:
+            for genre_id in genre_ids:
+                queryset = queryset.filter(
+                    Exists(movie_genres.filter(genre_id=genre_id))
+                )
+            return queryset
+        return queryset.filter(Exists(movie_genres.filter(genre_id__in=genre_ids)))
+
+    def filter_genre_match(self, queryset, name, value):
+        """Applied by filter_genre."""
         return queryset
 
     def filter_decade_min(self, queryset, name, value):
         if value:
-            start_decade = "1920" if value == "pre" else value
-            return queryset.filter(released__gte=f"{start_decade}-01-01")
+            return queryset.filter(released__gte=f"{value}-01-01")
         return queryset
 
     def filter_decade_max(self, queryset, name, value):
         if value:
-            end_decade = "1959" if value == "pre" else value
-            return queryset.filter(released__lte=f"{end_decade[:3]}9-12-31")
+            return queryset.filter(released__lte=f"{value}-12-31")
         return queryset
 
     def filter_runtime_min(self, queryset, name, value):
-        if value and not value.startswith("<"):
-            if value.startswith(">"):
-                value = 151
-            return queryset.filter(runtime__gte=value)
+        if value:
+            return queryset.filter(runtime__gte=int(value))
         return queryset
 
     def filter_runtime_max(self, queryset, name, value):
-        if value and not value.startswith(">"):
-            if value.startswith("<"):
-                value = 74
-            return queryset.filter(runtime__lte=value)
+        if value:
+            return queryset.filter(runtime__lte=int(value))
         return queryset
 
-    def _is_boundary_runtime(self, value: str) -> bool:
-        """Check if param is the upper or lower limit, e.g. starts with < or >."""
-        if value.startswith("<") or value.startswith(">"):
-            return True
-        return False
-
     class Meta:
-        model = Movie
-        fields = ["g", "dmin", "dmax", "rmin", "rmax"]
+        model = EligibleMovie
+        fields = ["g", "gmatch", "dmin", "dmax", "rmin", "rmax"]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import catalogue_cache_key
+from .catalogue import CatalogueArtifact
+from .models import Genre
+from .serializers import GenreCountSerializer
+
+
+def build_genre_list():
+    """
+    Return (cache key, serialized genres, most movies first), from the
+    shared cache if another worker has already read them.
+    """
+    key = catalogue_cache_key("genre-list")
+    genres = cache.get(key)
+    if genres is None:
+        queryset = Genre.objects.order_by("-movie_count", "name")
+        genres = [
+            dict(genre) for genre in GenreCountSerializer(queryset, many=True).data
+        ]
+        cache.set(key, genres, settings.CATALOGUE_CACHE_TIMEOUT)
+    return key, genres
+
+
+genre_list = CatalogueArtifact(build_genre_list)
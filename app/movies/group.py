@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.core import signing
+
+from .recommendations import (
+    WATCHED_WEIGHT,
+    get_taste_entries,
+    movie_features,
+    taste_matrix,
+)
+from .similar import top_k
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+CONSENT_SALT = "movies.group.consent"
+MAX_GROUP_SIZE = 10
+GROUP_RESULT_COUNT = 50
+
+
+def make_consent_token(user):
+    """Return a token letting whoever holds it include user in a group."""
+    return signing.dumps({"uid": str(user.uid)}, salt=CONSENT_SALT)
+
+
+def check_consent_token(uid, token):
+    """Return whether token is an unexpired consent token for uid."""
+    try:
+        payload = signing.loads(
+            token, salt=CONSENT_SALT, max_age=settings.GROUP_CONSENT_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return payload.get("uid") == str(uid)
+
+
+def rank_for_group(user_ids, limit=GROUP_RESULT_COUNT):
+    """
+    Return [(movie_id, overlap)] for the movies that best suit every user,
+    best first.
+
+    overlap is how many of the users have the movie on a list unwatched.
+    Movies any of them has watched are left out. Ties on overlap go to the
+    movie the group is predicted to like most: each user's taste scores
+    are scaled to at most 1 and averaged.
+    """
+    features = movie_features.get()
+    entries = get_taste_entries(user_ids)
+    count = len(features)
+    limit = min(limit, count)
+    if not limit:
+        return []
+
+    watched = set()
+    overlap = np.zeros(count)
+    for entry in entries.values():
+        weights = entry["weights"]
+        user_watched = {
+            movie_id for movie_id, weight in weights.items() if weight == WATCHED_WEIGHT
+        }
+        watched |= user_watched
+        unwatched = (weights.keys() - user_watched) & features.positions.keys()
+        positions = [features.positions[movie_id] for movie_id in unwatched]
+        np.add.at(overlap, np.asarray(positions, dtype=np.int64), 1)
+
+    tastes = taste_matrix(
+        [entry["vector"] for entry in entries.values()], features.matrix.shape[1]
+    )
+    affinity = (tastes @ features.matrix.T).toarray()
+    peaks = affinity.max(axis=1, keepdims=True)
+    affinity = np.divide(affinity, peaks, out=np.zeros_like(affinity), where=peaks > 0)
+
+    scores = overlap + affinity.mean(axis=0)
+    watched &= features.positions.keys()
+    scores[[features.positions[movie_id] for movie_id in watched]] = -np.inf
+    top, top_scores = top_k(scores[np.newaxis, :], limit)
+    return [
+        (features.movie_ids[position], int(overlap[position]))
+        for position, score in zip(top[0].tolist(), top_scores[0].tolist())
+        if score != -np.inf
+    ]
@@ -0,0 +1,158 @@
+import logging
+from collections.abc import Sequence
+
+from django.conf import settings
+
+from .catalogue import CatalogueArtifact
+from .filters import MATCH_ALL_GENRES
+from .models import EligibleMovie, Movie
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger(__name__)
+
+MAX_INDEXED_GENRES = 64
+MISSING_RUNTIME = -1
+
+
+class MovieIdPage(Sequence):
+    """Lazy sequence of movie ids for the positions matched in an index."""
+
+    def __init__(self, movie_ids, positions):
+        self.movie_ids = movie_ids
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self.movie_ids[position] for position in self.positions[key]]
+        return self.movie_ids[self.positions[key]]
+
+
+class MovieFilterIndex:
+    """
+    Columnar copy of the eligible catalogue for answering MovieFilter queries.
+
+    Rows are stored in list order (avg_rating DESC, slug ASC), so masking the
+    columns yields matches that are already sorted and ready to paginate.
+    Genres are stored as a bitmask per movie.
+    """
+
+    def __init__(self, movie_ids, years, runtimes, ratings, genre_bits, genre_ids):
+        self.movie_ids = movie_ids
+        self.years = years
+        self.runtimes = runtimes
+        self.ratings = ratings
+        self.genre_bits = genre_bits
+        self.genre_ids = genre_ids
+        self.genre_masks = {
+            genre_id: np.uint64(1 << bit) for bit, genre_id in enumerate(genre_ids)
+        }
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        rows = list(
+            queryset.order_by("-avg_rating", "slug").values_list(
+                "pk", "released", "runtime", "avg_rating"
+            )
+        )
+        count = len(rows)
+        movie_ids = [row[0] for row in rows]
+        years = np.fromiter((row[1].year for row in rows), dtype=np.int16, count=count)
+        runtimes = np.fromiter(
+            (MISSING_RUNTIME if row[2] is None else row[2] for row in rows),
+            dtype=np.int32,
+            count=count,
+        )
+        ratings = np.fromiter((row[3] for row in rows), dtype=np.float32, count=count)
+
+        positions = {movie_id: position for position, movie_id in enumerate(movie_ids)}
+        movie_genres = [
+            (positions[movie_id], genre_id)
+            for movie_id, genre_id in Movie.genre.through.objects.values_list(
+                "movie_id", "genre_id"
+            ).iterator()
+            if movie_id in positions
+        ]
+        genre_ids = sorted({genre_id for _, genre_id in movie_genres})
+        if len(genre_ids) > MAX_INDEXED_GENRES:
+            logger.warning(
+                f"Movie filter index disabled: {len(genre_ids)} genres exceeds "
+                f"the {MAX_INDEXED_GENRES} genre limit."
+            )
+            return None
+
+        genre_bit = {genre_id: bit for bit, genre_id in enumerate(genre_ids)}
+        genre_bits = np.zeros(count, dtype=np.uint64)
+        if movie_genres:
+            rows_with_genre = np.array([row for row, _ in movie_genres], dtype=np.int64)
+            bits = np.array(
+                [genre_bit[genre_id] for _, genre_id in movie_genres], dtype=np.uint64
+            )
+            np.bitwise_or.at(genre_bits, rows_with_genre, np.left_shift(1, bits))
+
+        return cls(movie_ids, years, runtimes, ratings, genre_bits, genre_ids)
+
+    def search(self, params):
+        """Return the ids of movies matching MovieFilterParams, in list order."""
+        return MovieIdPage(self.movie_ids, np.flatnonzero(self.match(params)))
+
+    def match(self, params):
+        """Return a boolean mask of the rows matching MovieFilterParams."""
+        mask = np.ones(len(self), dtype=bool)
+
+        if params.genres:
+            genre_mask = np.uint64(0)
+            for genre_id in params.genres:
+                genre_mask |= self.genre_masks.get(genre_id, np.uint64(0))
+            if params.genre_match == MATCH_ALL_GENRES:
+                if not all(genre_id in self.genre_masks for genre_id in params.genres):
+                    mask[:] = False
+                mask &= (self.genre_bits & genre_mask) == genre_mask
+            else:
+                mask &= (self.genre_bits & genre_mask) != 0
+
+        if params.year_min is not None:
+            mask &= self.years >= params.year_min
+
+        if params.year_max is not None:
+            mask &= self.years <= params.year_max
+
+        if params.runtime_min is not None:
+            mask &= self.runtimes >= params.runtime_min
+
+        if params.runtime_max is not None:
+            has_runtime = self.runtimes != MISSING_RUNTIME
+            mask &= has_runtime & (self.runtimes <= params.runtime_max)
+
+        return mask
+
+
+def build_movie_filter_index():
+    return MovieFilterIndex.from_queryset(EligibleMovie.objects.all())
+
+
+movie_filter_index = CatalogueArtifact(build_movie_filter_index)
+
+
+def get_movie_filter_index():
+    """Return the index for this worker, or None if it is disabled."""
+    if np is None or not settings.MOVIE_FILTER_INDEX:
+        return None
+    return movie_filter_index.get()
+
+
+def warm_movie_filter_index():
+    """Build the index up front so the first request doesn't pay for it."""
+    try:
+        get_movie_filter_index()
+    except Exception as e:
+        logger.error(f"Failed to build movie filter index: {e}")
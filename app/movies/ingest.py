@@ -0,0 +1,154 @@
+import logging
+
+from django.db import transaction
+
+from config.util import unique_slug
+
+from .models import Actor, Director, EligibleMovie, Genre, Movie, Review
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = 200
+# Text fields a record can't be stored without, besides its Ratings dict;
+# the optional ones fall back to these defaults when missing.
+REQUIRED_FIELDS = ("imdbID", "Title", "Actors", "Director", "Genre")
+OPTIONAL_FIELDS = {
+    "Rated": None,
+    "Released": None,
+    "Runtime": None,
+    "Writer": "",
+    "Plot": None,
+    "Language": None,
+    "Country": None,
+    "Poster": "N/A",
+}
+
+
+def split_names(value):
+    """Split an OMDB comma-separated field into names, in order, once each."""
+    return list(dict.fromkeys(name.strip() for name in value.split(",")))
+
+
+def resolve_names(model, names):
+    """
+    Return {name: pk} for names, creating any that don't exist yet.
+
+    Existing rows are found in one lookup. Missing ones are inserted
+    together, ignoring conflicts with concurrent inserts, and read back.
+    """
+    names = set(names)
+    pks = dict(model.objects.filter(name__in=names).values_list("name", "pk"))
+    missing = names - pks.keys()
+    if missing:
+        model.objects.bulk_create(
+            [model(name=name) for name in missing], ignore_conflicts=True
+        )
+        pks.update(model.objects.filter(name__in=missing).values_list("name", "pk"))
+    return pks
+
+
+def is_valid_record(record):
+    """Whether record has the fields ingest_batch can't default."""
+    if not isinstance(record, dict) or not isinstance(record.get("Ratings"), dict):
+        return False
+    return all(isinstance(record.get(key), str) for key in REQUIRED_FIELDS)
+
+
+def movie_from_record(record):
+    fields = {key: record.get(key, default) for key, default in OPTIONAL_FIELDS.items()}
+    movie = Movie(
+        imdbid=record["imdbID"],
+        title=record["Title"],
+        rated=fields["Rated"],
+        released=fields["Released"],
+        runtime=fields["Runtime"],
+        writer=fields["Writer"],
+        plot=fields["Plot"],
+        language=fields["Language"],
+        country=fields["Country"],
+        poster_url=fields["Poster"],
+    )
+    movie.slug = unique_slug(movie)
+    return movie
+
+
+def ingest_batch(records):
+    """
+    Add the movies in records, as formatted by OMDBFetch, skipping any
+    already present. Returns the ids of the movies added.
+
+    Everything is written with bulk inserts in one transaction. Bulk
+    inserts send no signals, so the stored ratings, eligible movie rows,
+    genre counts and search vectors are brought up to date directly.
+    """
+    relations = [
+        (Movie.actors.through, "actor_id", Actor, "Actors"),
+        (Movie.director.through, "director_id", Director, "Director"),
+        (Movie.genre.through, "genre_id", Genre, "Genre"),
+    ]
+    records = {record["imdbID"]: record for record in records}
+    with transaction.atomic():
+        existing = Movie.objects.filter(pk__in=list(records)).values_list("pk")
+        for (imdbid,) in existing:
+            del records[imdbid]
+        records = list(records.values())
+        if not records:
+            return []
+
+        movies = Movie.objects.bulk_create(
+            [movie_from_record(record) for record in records]
+        )
+        for through, field, model, key in relations:
+            pks = resolve_names(
+                model,
+                [name for record in records for name in split_names(record[key])],
+            )
+            through.objects.bulk_create(
+                through(movie_id=record["imdbID"], **{field: pks[name]})
+                for record in records
+                for name in split_names(record[key])
+            )
+        Review.objects.bulk_create(
+            Review(movie_id=record["imdbID"], source=source, score=score)
+            for record in records
+            for source, score in record["Ratings"].items()
+            if score is not None
+        )
+
+        added = Movie.objects.filter(pk__in=[movie.pk for movie in movies])
+        added.update_ratings()
+        EligibleMovie.objects.refresh(added)
+        added.update_search_vectors()
+    return [movie.pk for movie in movies]
+
+
+def ingest_movies(records, batch_size=INGEST_BATCH_SIZE):
+    """
+    Add the movies in records a batch at a time; see ingest_batch.
+
+    Records missing required fields are skipped. If a batch fails, its
+    movies are retried one at a time so a single bad record doesn't lose
+    the rest. Returns the ids of the movies added.
+    """
+    valid = []
+    for record in records:
+        if is_valid_record(record):
+            valid.append(record)
+        else:
+            imdbid = record.get("imdbID") if isinstance(record, dict) else None
+            logger.error(f"Skipping OMDB record {imdbid} missing required fields.")
+
+    added = []
+    for start in range(0, len(valid), batch_size):
+        end = start + batch_size
+        batch = valid[start:end]
+        try:
+            added.extend(ingest_batch(batch))
+        except Exception as e:
+            logger.error(f"Failed to add a batch of {len(batch)} movies: {e}")
+            for record in batch:
+                try:
+                    added.extend(ingest_batch([record]))
+                except Exception as e:
+                    logger.error(f"Failed to add {record['imdbID']}: {e}")
+    return added
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from movies.catalogue import bump_catalogue_version
+from movies.models import EligibleMovie, Movie
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the stored avg_rating and review_count for every movie, "
+        "and the eligible movie summary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of movies to update per query.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        movie_ids = list(
+            Movie.objects.order_by("pk").values_list("pk", flat=True).iterator()
+        )
+        updated = 0
+        for start in range(0, len(movie_ids), batch_size):
+            end = start + batch_size
+            batch = movie_ids[start:end]
+            movies = Movie.objects.filter(pk__in=batch)
+            updated += movies.update_ratings()
+            EligibleMovie.objects.refresh(movies)
+        bump_catalogue_version()
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt ratings for {updated} movies."))
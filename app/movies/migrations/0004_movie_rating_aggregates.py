@@ -0,0 +1,44 @@
+# Generated by Django 5.0.11 on 2026-10-18 13:27
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_rating_aggregates(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    Review = apps.get_model("movies", "Review")
+    reviews = Review.objects.filter(movie=OuterRef("pk")).order_by().values("movie")
+    Movie.objects.update(
+        avg_rating=Subquery(reviews.annotate(avg=Avg("score")).values("avg")),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(count=Count("pk")).values("count")), 0
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0003_alter_movie_type_field_alter_review_source"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="avg_rating",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="movie",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="movie",
+            index=models.Index(
+                fields=["-avg_rating", "slug"], name="movie_rating_slug_idx"
+            ),
+        ),
+        migrations.RunPython(populate_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.11 on 2026-10-18 13:42
+
+from bisect import bisect_right
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+MIN_LISTED_AVG_RATING = 40
+RUNTIME_BUCKET_BOUNDS = (75, 90, 105, 120, 135, 151)
+
+
+def populate_eligible_movies(apps, schema_editor):
+    Movie = apps.get_model("movies", "Movie")
+    EligibleMovie = apps.get_model("movies", "EligibleMovie")
+    movies = (
+        Movie.objects.filter(avg_rating__gte=MIN_LISTED_AVG_RATING)
+        .exclude(poster_url="N/A")
+        .values_list("pk", "slug", "avg_rating", "review_count", "released", "runtime")
+    )
+    EligibleMovie.objects.bulk_create(
+        (
+            EligibleMovie(
+                movie_id=movie_id,
+                slug=slug,
+                avg_rating=avg_rating,
+                review_count=review_count,
+                released=released,
+                decade=released.year // 10 * 10,
+                runtime=runtime,
+                runtime_bucket=(
+                    None
+                    if runtime is None
+                    else bisect_right(RUNTIME_BUCKET_BOUNDS, runtime)
+                ),
+            )
+            for movie_id, slug, avg_rating, review_count, released, runtime in movies
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0004_movie_rating_aggregates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EligibleMovie",
+            fields=[
+                (
+                    "movie",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="eligible",
+                        serialize=False,
+                        to="movies.movie",
+                    ),
+                ),
+                ("slug", models.SlugField(max_length=32)),
+                ("avg_rating", models.FloatField()),
+                ("review_count", models.PositiveIntegerField()),
+                ("released", models.DateField()),
+                ("decade", models.PositiveSmallIntegerField()),
+                ("runtime", models.IntegerField(null=True)),
+                ("runtime_bucket", models.PositiveSmallIntegerField(null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["-avg_rating", "slug"], name="eligible_rating_slug_idx"
+                    ),
+                    models.Index(fields=["released"], name="eligible_released_idx"),
+                    models.Index(fields=["runtime"], name="eligible_runtime_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_eligible_movies, migrations.RunPython.noop),
+    ]
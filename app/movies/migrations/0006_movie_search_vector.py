@@ -0,0 +1,57 @@
+# Generated by Django 5.0.11 on 2026-10-18 14:09
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POPULATE_SEARCH_VECTORS = """
+UPDATE movies_movie AS movie SET search_vector =
+    setweight(to_tsvector('english', coalesce(movie.title, '')), 'A')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(actor.name, ' ')
+        FROM movies_actor AS actor
+        JOIN movies_movie_actors AS movie_actor ON movie_actor.actor_id = actor.id
+        WHERE movie_actor.movie_id = movie.imdbid
+    ), '')), 'B')
+    || setweight(to_tsvector('english', coalesce((
+        SELECT string_agg(director.name, ' ')
+        FROM movies_director AS director
+        JOIN movies_movie_director AS movie_director
+            ON movie_director.director_id = director.id
+        WHERE movie_director.movie_id = movie.imdbid
+    ), '')), 'B')
+    || setweight(to_tsvector('english', coalesce(movie.plot, '')), 'C')
+"""
+
+
+def create_search_index(apps, schema_editor):
+    """GIN indexes are Postgres only, so the index is created outside Meta."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        "CREATE INDEX movie_search_vector_gin ON movies_movie USING gin (search_vector)"
+    )
+    schema_editor.execute(POPULATE_SEARCH_VECTORS)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS movie_search_vector_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0005_eligible_movie"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
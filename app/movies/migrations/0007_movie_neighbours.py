@@ -0,0 +1,30 @@
+# Generated by Django 5.0.11 on 2026-10-18 14:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0006_movie_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MovieNeighbours",
+            fields=[
+                (
+                    "movie",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="neighbours",
+                        serialize=False,
+                        to="movies.movie",
+                    ),
+                ),
+                ("neighbour_ids", models.JSONField(default=list)),
+            ],
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.11 on 2026-10-18 14:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_genre_movie_counts(apps, schema_editor):
+    Genre = apps.get_model("movies", "Genre")
+    EligibleMovie = apps.get_model("movies", "EligibleMovie")
+    movies = (
+        EligibleMovie.objects.filter(movie__genre=OuterRef("pk"))
+        .order_by()
+        .values("movie__genre")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Genre.objects.update(movie_count=Coalesce(Subquery(movies), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movies", "0007_movie_neighbours"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="genre",
+            name="movie_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_genre_movie_counts, migrations.RunPython.noop),
+    ]
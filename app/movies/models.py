@@ -1,5 +1,28 @@
-from django.db import models
-from django.db.models.signals import pre_save
+from bisect import bisect_right
+from collections import Counter
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connections, models, transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 
 from config.util import unique_slug
@@ -21,13 +44,112 @@ class Director(models.Model):
         return self.name
 
 
+class GenreQuerySet(models.QuerySet):
+    def update_movie_counts(self):
+        """Recount the eligible movies in each genre from scratch."""
+        movies = (
+            EligibleMovie.objects.filter(movie__genre=OuterRef("pk"))
+            .order_by()
+            .values("movie__genre")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return self.update(movie_count=Coalesce(Subquery(movies), 0))
+
+    def adjust_movie_counts(self, deltas):
+        """Add deltas[genre_id] to each genre's movie count, in one UPDATE."""
+        deltas = {genre_id: delta for genre_id, delta in deltas.items() if delta}
+        if not deltas:
+            return 0
+        change = Case(
+            *(
+                When(pk=genre_id, then=Value(delta))
+                for genre_id, delta in deltas.items()
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        return self.filter(pk__in=deltas).update(movie_count=F("movie_count") + change)
+
+
 class Genre(models.Model):
+    """
+    A genre, with the number of its movies that can appear in MovieList.
+
+    movie_count is adjusted by one whenever one of the genre's movies
+    becomes eligible or ineligible, gains or loses the genre, or is
+    deleted, so listing genres by popularity needs no aggregate query.
+    """
+
     name = models.CharField(unique=True, max_length=24)
+    movie_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = GenreQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
 
+def genre_counts(movie_ids):
+    """Count how many of the movies with movie_ids are in each genre."""
+    genre_ids = Movie.genre.through.objects.filter(movie_id__in=movie_ids)
+    return Counter(genre_ids.values_list("genre_id", flat=True))
+
+
+MOVIE_RELATED_FIELDS = ("actors", "director", "genre", "ondemand", "reviews")
+MIN_LISTED_AVG_RATING = 40
+# Lower bounds of runtime buckets 1-6; bucket 0 is anything under 75 minutes.
+RUNTIME_BUCKET_BOUNDS = (75, 90, 105, 120, 135, 151)
+ELIGIBLE_REFRESH_BATCH_SIZE = 5000
+SEARCH_CONFIG = "english"
+
+
+class MovieQuerySet(models.QuerySet):
+    def with_related(self, fields=MOVIE_RELATED_FIELDS):
+        """Prefetch the relations nested by MovieSerializer, or just those given."""
+        return self.prefetch_related(*fields)
+
+    def eligible(self):
+        """Movies rated well enough, and with a poster, to appear in listings."""
+        return self.filter(avg_rating__gte=MIN_LISTED_AVG_RATING).exclude(
+            poster_url="N/A"
+        )
+
+    def update_ratings(self):
+        """Recalculate the stored rating aggregates from each movie's reviews."""
+        reviews = Review.objects.filter(movie=OuterRef("pk")).order_by().values("movie")
+        avg_rating = reviews.annotate(avg=Avg("score")).values("avg")
+        review_count = reviews.annotate(count=Count("pk")).values("count")
+        return self.update(
+            avg_rating=Subquery(avg_rating),
+            review_count=Coalesce(Subquery(review_count), 0),
+        )
+
+    def update_search_vectors(self):
+        """
+        Recalculate search_vector from the title, cast, directors and plot,
+        weighted in that order. Full-text search is Postgres only; other
+        databases use the in-process index in movies.search instead.
+        """
+        if connections[self.db].vendor != "postgresql":
+            return 0
+
+        def names(model):
+            return Subquery(
+                model.objects.filter(movie=OuterRef("pk"))
+                .order_by()
+                .values("movie")
+                .annotate(names=StringAgg("name", delimiter=" "))
+                .values("names")
+            )
+
+        title = SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        actors = SearchVector(names(Actor), weight="B", config=SEARCH_CONFIG)
+        directors = SearchVector(names(Director), weight="B", config=SEARCH_CONFIG)
+        plot = SearchVector("plot", weight="C", config=SEARCH_CONFIG)
+        return self.update(search_vector=title + actors + directors + plot)
+
+
 class Movie(models.Model):
     imdbid = models.CharField(primary_key=True, unique=True, max_length=20)
     title = models.CharField(max_length=500)
@@ -46,10 +168,28 @@ class Movie(models.Model):
     type_field = models.CharField(
         db_column="type_", max_length=12, null=True, default="movie"
     )
+    avg_rating = models.FloatField(null=True, blank=True, editable=False)
+    review_count = models.PositiveIntegerField(default=0, editable=False)
+    # Postgres only; its GIN index is created in migration 0006.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = MovieQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-avg_rating", "slug"], name="movie_rating_slug_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title}"
 
+    def update_rating(self):
+        """Recalculate this movie's stored rating aggregates."""
+        movies = Movie.objects.filter(pk=self.pk)
+        movies.update_ratings()
+        EligibleMovie.objects.refresh(movies)
+        self.refresh_from_db(fields=["avg_rating", "review_count"])
+
 
 @receiver(pre_save, sender=Movie)
 def pre_save_receiver(sender, instance, *args, **kwargs):
@@ -57,6 +197,195 @@ def pre_save_receiver(sender, instance, *args, **kwargs):
         instance.slug = unique_slug(instance)
 
 
+@receiver(post_save, sender=Movie)
+def movie_post_save_receiver(sender, instance, *args, **kwargs):
+    movies = Movie.objects.filter(pk=instance.pk)
+    EligibleMovie.objects.refresh(movies)
+    movies.update_search_vectors()
+
+
+@receiver(m2m_changed, sender=Movie.actors.through)
+@receiver(m2m_changed, sender=Movie.director.through)
+def movie_people_changed_receiver(
+    sender, instance, action, reverse, pk_set, *args, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        movies = Movie.objects.filter(pk__in=pk_set or ())
+    else:
+        movies = Movie.objects.filter(pk=instance.pk)
+    movies.update_search_vectors()
+
+
+@receiver(m2m_changed, sender=Movie.genre.through)
+def movie_genres_changed_receiver(
+    sender, instance, action, reverse, pk_set, *args, **kwargs
+):
+    if action == "pre_clear":
+        related = instance.movie if reverse else instance.genre
+        instance._cleared_pks = set(related.values_list("pk", flat=True))
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if action == "post_clear":
+        pk_set = instance._cleared_pks
+    sign = 1 if action == "post_add" else -1
+
+    if reverse:
+        eligible = EligibleMovie.objects.filter(movie__in=pk_set or ())
+        deltas = {instance.pk: sign * eligible.count()}
+    elif EligibleMovie.objects.filter(movie=instance.pk).exists():
+        deltas = {genre_id: sign for genre_id in pk_set or ()}
+    else:
+        return
+    Genre.objects.adjust_movie_counts(deltas)
+
+
+@receiver(pre_delete, sender=Movie)
+def movie_pre_delete_receiver(sender, instance, *args, **kwargs):
+    instance._was_eligible = EligibleMovie.objects.filter(movie=instance.pk).exists()
+    instance._genre_ids = list(instance.genre.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Movie)
+def movie_post_delete_receiver(sender, instance, *args, **kwargs):
+    if instance._was_eligible:
+        Genre.objects.adjust_movie_counts(
+            {genre_id: -1 for genre_id in instance._genre_ids}
+        )
+
+
+def runtime_bucket(runtime):
+    if runtime is None:
+        return None
+    return bisect_right(RUNTIME_BUCKET_BOUNDS, runtime)
+
+
+class EligibleMovieQuerySet(models.QuerySet):
+    def refresh(self, movies=None, batch_size=ELIGIBLE_REFRESH_BATCH_SIZE):
+        """
+        Bring the summary rows for movies (default: all) in line with Movie.
+
+        Rows are upserted and stale rows deleted in one transaction, so
+        readers keep seeing the previous rows until it commits. In the same
+        transaction, the genres of movies that became eligible or ineligible
+        have their movie counts adjusted; a full refresh recounts them all.
+        """
+        full = movies is None
+        if full:
+            movies = Movie.objects.all()
+        eligible = movies.eligible().order_by()
+        fields = ["slug", "avg_rating", "review_count", "released", "runtime"]
+
+        with transaction.atomic():
+            listed = EligibleMovie.objects.filter(movie__in=movies.values("pk"))
+            if not full:
+                listed_ids = set(listed.values_list("movie_id", flat=True))
+            eligible_ids = set()
+            batch = []
+            for row in eligible.values_list("pk", *fields).iterator(batch_size):
+                batch.append(EligibleMovie.from_row(*row))
+                eligible_ids.add(row[0])
+                if len(batch) == batch_size:
+                    self._upsert(batch)
+                    batch = []
+            self._upsert(batch)
+
+            if full:
+                listed.exclude(movie__in=eligible.values("pk")).delete()
+                Genre.objects.update_movie_counts()
+                return
+
+            removed_ids = listed_ids - eligible_ids
+            EligibleMovie.objects.filter(movie__in=removed_ids).delete()
+            deltas = genre_counts(eligible_ids - listed_ids)
+            deltas.subtract(genre_counts(removed_ids))
+            Genre.objects.adjust_movie_counts(deltas)
+
+    def _upsert(self, rows):
+        if rows:
+            EligibleMovie.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["movie"],
+                update_fields=[
+                    "slug",
+                    "avg_rating",
+                    "review_count",
+                    "released",
+                    "decade",
+                    "runtime",
+                    "runtime_bucket",
+                ],
+            )
+
+
+class EligibleMovie(models.Model):
+    """
+    Summary row for each movie that can appear in MovieList.
+
+    Holds the movie's stored aggregates plus its decade and runtime bucket,
+    so listings filter and sort one narrow table rather than re-applying
+    the eligibility predicate to every movie. Kept current by
+    Movie.update_rating and Movie saves; refresh() rebuilds it in bulk.
+    """
+
+    movie = models.OneToOneField(
+        Movie, on_delete=models.CASCADE, primary_key=True, related_name="eligible"
+    )
+    slug = models.SlugField(max_length=32)
+    avg_rating = models.FloatField()
+    review_count = models.PositiveIntegerField()
+    released = models.DateField()
+    decade = models.PositiveSmallIntegerField()
+    runtime = models.IntegerField(null=True)
+    runtime_bucket = models.PositiveSmallIntegerField(null=True)
+
+    objects = EligibleMovieQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-avg_rating", "slug"], name="eligible_rating_slug_idx"
+            ),
+            models.Index(fields=["released"], name="eligible_released_idx"),
+            models.Index(fields=["runtime"], name="eligible_runtime_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.slug}"
+
+    @classmethod
+    def from_row(cls, movie_id, slug, avg_rating, review_count, released, runtime):
+        return cls(
+            movie_id=movie_id,
+            slug=slug,
+            avg_rating=avg_rating,
+            review_count=review_count,
+            released=released,
+            decade=released.year // 10 * 10,
+            runtime=runtime,
+            runtime_bucket=runtime_bucket(runtime),
+        )
+
+
+class MovieNeighbours(models.Model):
+    """
+    Precomputed "more like this" list for an eligible movie: the ids of its
+    most similar eligible movies, best first. Rebuilt in bulk by the
+    update_movie_neighbours task.
+    """
+
+    movie = models.OneToOneField(
+        Movie, on_delete=models.CASCADE, primary_key=True, related_name="neighbours"
+    )
+    neighbour_ids = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"{self.movie_id}"
+
+
 class OnDemand(models.Model):
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE, related_name="ondemand")
     service = models.CharField(max_length=50)
@@ -75,3 +404,15 @@ class Review(models.Model):
 
     def __str__(self):
         return self.source + "--" + str(self.score)
+
+
+@receiver(post_save, sender=Review)
+def review_post_save_receiver(sender, instance, *args, **kwargs):
+    instance.movie.update_rating()
+
+
+@receiver(post_delete, sender=Review)
+def review_post_delete_receiver(sender, instance, *args, **kwargs):
+    movies = Movie.objects.filter(pk=instance.movie_id)
+    movies.update_ratings()
+    EligibleMovie.objects.refresh(movies)
@@ -0,0 +1,190 @@
+import logging
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+
+from .utils import OMDBFetch
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_KEY = "omdb:token-bucket"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Takes ARGV[3] tokens, refilled at ARGV[1] per second up to ARGV[2], and
+# returns how many seconds the caller must wait before using them. The
+# bucket can go into debt, so concurrent callers queue up behind each other
+# rather than polling. Redis' clock is used so workers needn't agree on time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate) - cost
+redis.call("HSET", KEYS[1], "tokens", tokens, "updated", now)
+redis.call("EXPIRE", KEYS[1], math.ceil((capacity - tokens) / rate) + 60)
+if tokens >= 0 then
+    return "0"
+end
+return tostring(-tokens / rate)
+"""
+
+
+class TokenBucket(ABC):
+    """
+    Rate limiter handing out rate tokens per second, with bursts of up to
+    capacity. Subclasses implement reserve.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+
+    @abstractmethod
+    def reserve(self, cost=1):
+        """Take cost tokens and return the seconds to wait before using them."""
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        time.sleep(self.reserve())
+
+    def penalize(self, seconds):
+        """Hold back every caller for at least seconds, spending any burst."""
+        self.reserve(cost=self.capacity + seconds * self.rate)
+
+
+class LocalTokenBucket(TokenBucket):
+    """Token bucket shared by the threads of one process."""
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        super().__init__(rate, capacity)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = clock()
+
+    def reserve(self, cost=1):
+        with self._lock:
+            now = self.clock()
+            elapsed = max(0, now - self._updated)
+            tokens = min(self.capacity, self._tokens + elapsed * self.rate) - cost
+            self._tokens, self._updated = tokens, now
+        return max(0, -tokens / self.rate)
+
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket stored in Redis, so every worker shares one rate limit."""
+
+    def __init__(self, client, rate, capacity, key=TOKEN_BUCKET_KEY):
+        super().__init__(rate, capacity)
+        self.key = key
+        self.script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def reserve(self, cost=1):
+        wait = self.script(keys=[self.key], args=[self.rate, self.capacity, cost])
+        return float(wait)
+
+
+def get_token_bucket():
+    """Return the shared bucket when a Redis cache is configured."""
+    rate, capacity = settings.OMDB_REQUESTS_PER_SECOND, settings.OMDB_BURST
+    if settings.REDIS_CACHE_URL:
+        import redis
+
+        client = redis.Redis.from_url(settings.REDIS_CACHE_URL)
+        return RedisTokenBucket(client, rate, capacity)
+    logger.warning("No Redis cache configured; OMDB rate limit is per process.")
+    return LocalTokenBucket(rate, capacity)
+
+
+def backoff_delay(attempt, response=None):
+    """
+    Seconds to wait before retry number attempt: the server's Retry-After
+    if it sent one, otherwise exponential back-off with full jitter.
+    """
+    retry_after = None if response is None else response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), settings.OMDB_BACKOFF_MAX)
+    ceiling = min(settings.OMDB_BACKOFF_BASE * 2**attempt, settings.OMDB_BACKOFF_MAX)
+    return random.uniform(0, ceiling)
+
+
+class RateLimitedOMDBFetch(OMDBFetch):
+    """
+    OMDBFetch whose requests take a token from bucket first and are retried
+    on connection errors, 429 and 5xx responses.
+
+    A 429 holds back every caller of the bucket for the back-off delay, so
+    the whole pool slows down rather than each thread finding out alone.
+    """
+
+    def __init__(self, imdbid, bucket, session):
+        super().__init__(imdbid)
+        self.bucket = bucket
+        self.session = session
+
+    def request_data(self, url):
+        for attempt in range(settings.OMDB_MAX_RETRIES + 1):
+            self.bucket.acquire()
+            try:
+                response = self.session.get(url, timeout=settings.OMDB_TIMEOUT)
+            except requests.RequestException as e:
+                logger.warning(f"Request failed for {self.imdbid}: {e}")
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES:
+                delay = backoff_delay(attempt, response)
+                logger.warning(
+                    f"OMDB returned {response.status_code} for {self.imdbid}; "
+                    f"retrying in {delay:.1f}s."
+                )
+                if response.status_code == 429:
+                    # The next acquire waits out the penalty.
+                    self.bucket.penalize(delay)
+                else:
+                    time.sleep(delay)
+                continue
+
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except (requests.RequestException, ValueError) as e:
+                logger.error(f"Request failed for {self.imdbid}. Error: {e}")
+                return None
+            if data.get("Response") == "True":
+                return data
+            return None
+
+        logger.error(f"Giving up on {self.imdbid} after {attempt + 1} attempts.")
+        return None
+
+
+def fetch_omdb_records(imdbids, max_in_flight=None, bucket=None):
+    """
+    Fetch and format the OMDB records for imdbids, keeping up to
+    max_in_flight requests open, and return those found, in order.
+    """
+    max_in_flight = max_in_flight or settings.OMDB_MAX_IN_FLIGHT
+    bucket = bucket or get_token_bucket()
+    sessions = threading.local()
+
+    def fetch(imdbid):
+        if not hasattr(sessions, "session"):
+            sessions.session = requests.Session()
+        try:
+            return RateLimitedOMDBFetch(imdbid, bucket, sessions.session).get_data()
+        except Exception as e:
+            logger.error(f"Failed to fetch {imdbid}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        records = list(executor.map(fetch, imdbids))
+    return [record for record in records if record is not None]
@@ -0,0 +1,174 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.response import Response
+
+
+def estimated_count(queryset):
+    """
+    Return the planner's row estimate for the queryset's table, or None if
+    the database doesn't provide one (or the table hasn't been analyzed).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Page number pagination that avoids re-counting the same result set.
+
+    Counts are cached under the view's get_count_cache_key(), which should
+    cover the canonical filters and the catalogue version. With
+    CATALOGUE_ESTIMATED_COUNTS on, unfiltered requests use the planner's
+    estimate instead. Responses say whether the count is exact.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        paginator.count, self.count_exact = self.get_count(object_list)
+        return paginator
+
+    def get_count(self, object_list):
+        """Return the total count and whether it is exact."""
+        if not isinstance(object_list, QuerySet):
+            return len(object_list), True
+
+        if settings.CATALOGUE_ESTIMATED_COUNTS and not self.is_filtered():
+            estimate = estimated_count(object_list)
+            if estimate is not None:
+                return estimate, False
+
+        key = self.view.get_count_cache_key() if self.view is not None else None
+        count = cache.get(key) if key is not None else None
+        if count is None:
+            count = object_list.count()
+            if key is not None:
+                cache.set(key, count, settings.CATALOGUE_CACHE_TIMEOUT)
+        return count, True
+
+    def is_filtered(self):
+        filter_params = getattr(self.view, "filter_params", None)
+        return filter_params is None or bool(filter_params.key)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.paginator.count,
+                "count_exact": self.count_exact,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        schema["properties"]["count_exact"] = {"type": "boolean", "example": True}
+        return schema
+
+
+class MovieCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (avg_rating DESC, slug ASC).
+
+    The cursor carries the rating and slug of the boundary row, so each page
+    is a range scan on the rating/slug index with no OFFSET and no COUNT.
+    Ties on rating are broken by slug, which keeps ordering stable.
+    """
+
+    ordering = ("-avg_rating", "slug")
+    reverse_ordering = ("avg_rating", "-slug")
+    position_separator = "|"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            _, reverse, position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*self.reverse_ordering)
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            avg_rating, slug = self.decode_position(position)
+            if reverse:
+                beyond_rating = Q(avg_rating__gt=avg_rating)
+                beyond_slug = Q(avg_rating=avg_rating, slug__lt=slug)
+            else:
+                beyond_rating = Q(avg_rating__lt=avg_rating)
+                beyond_slug = Q(avg_rating=avg_rating, slug__gt=slug)
+            queryset = queryset.filter(beyond_rating | beyond_slug)
+
+        results = list(queryset[: self.page_size + 1])
+        self.page = results[: self.page_size]
+        has_following_position = len(results) > self.page_size
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = position is not None
+
+        self.next_position = (
+            self.encode_position(self.page[-1]) if self.page else position
+        )
+        self.previous_position = (
+            self.encode_position(self.page[0]) if self.page else position
+        )
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        cursor = Cursor(offset=0, reverse=False, position=self.next_position)
+        return self.encode_cursor(cursor)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        cursor = Cursor(offset=0, reverse=True, position=self.previous_position)
+        return self.encode_cursor(cursor)
+
+    def encode_position(self, movie):
+        return f"{movie.avg_rating!r}{self.position_separator}{movie.slug}"
+
+    def decode_position(self, position):
+        try:
+            avg_rating, slug = position.split(self.position_separator, 1)
+            return float(avg_rating), slug
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,156 @@
+import random
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .catalogue import CatalogueArtifact
+from .filters import MovieFilter
+from .index import get_movie_filter_index
+from .models import EligibleMovie
+
+MAX_PICKS = 20
+MAX_CACHED_FILTERS = 256
+# Weighted picks are drawn with replacement, so repeats are redrawn; this
+# bounds the draws for one request when a few movies hold most of the weight.
+MAX_DRAWS_PER_PICK = 20
+
+
+class FilterKeyCache:
+    """
+    Values built per MovieFilterParams key, least recently used evicted first.
+
+    Held in a CatalogueArtifact so every value is dropped together when the
+    catalogue version changes.
+    """
+
+    def __init__(self, build, max_size=MAX_CACHED_FILTERS):
+        self.build = build
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def get(self, filter_params):
+        key = filter_params.key
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+
+        value = self.build(filter_params)
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+        return value
+
+
+def matching_movie_ids(filter_params):
+    """Return a tuple of the ids of every listed movie matching filter_params."""
+    index = get_movie_filter_index()
+    if index is not None:
+        return tuple(index.search(filter_params)[:])
+    queryset = MovieFilter(filter_params, queryset=EligibleMovie.objects.all()).qs
+    return tuple(queryset.values_list("movie_id", flat=True).iterator())
+
+
+movie_id_arrays = CatalogueArtifact(lambda: FilterKeyCache(matching_movie_ids))
+
+
+def pick_movie_ids(filter_params, count=1):
+    """
+    Return up to count distinct random movie ids matching filter_params.
+
+    Once the id tuple for a filter set is built, each pick costs O(count)
+    whatever the size of the catalogue.
+    """
+    movie_ids = movie_id_arrays.get().get(filter_params)
+    return random.sample(movie_ids, min(count, len(movie_ids)))
+
+
+def rating_weight(avg_rating, review_count):
+    """
+    Default RANDOM_PICK_WEIGHT: strongly favour high ratings, and discount
+    ratings that rest on a single review source.
+    """
+    return (avg_rating / 100) ** 4 * review_count / (review_count + 1)
+
+
+class AliasTable:
+    """
+    Vose's alias method: after O(n) setup, draws an index with probability
+    proportional to its weight in O(1).
+    """
+
+    def __init__(self, weights):
+        count = len(weights)
+        total = sum(weights)
+        if not count or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight.")
+
+        self.probabilities = [0.0] * count
+        self.aliases = list(range(count))
+        scaled = [weight * count / total for weight in weights]
+        small = [index for index, weight in enumerate(scaled) if weight < 1]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probabilities[less] = scaled[less]
+            self.aliases[less] = more
+            scaled[more] += scaled[less] - 1
+            (small if scaled[more] < 1 else large).append(more)
+        # Whatever is left is 1 up to rounding error.
+        for index in small + large:
+            self.probabilities[index] = 1.0
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def draw(self, rng=random):
+        index = rng.randrange(len(self.probabilities))
+        if rng.random() < self.probabilities[index]:
+            return index
+        return self.aliases[index]
+
+
+def weighted_movie_ids(filter_params):
+    """
+    Return the ids of the listed movies matching filter_params with an
+    AliasTable of their RANDOM_PICK_WEIGHT, or None if none has any weight.
+    """
+    weight = import_string(settings.RANDOM_PICK_WEIGHT)
+    queryset = MovieFilter(filter_params, queryset=EligibleMovie.objects.all()).qs
+    movie_ids, weights = [], []
+    for movie_id, avg_rating, review_count in queryset.values_list(
+        "movie_id", "avg_rating", "review_count"
+    ).iterator():
+        movie_ids.append(movie_id)
+        weights.append(max(weight(avg_rating, review_count), 0))
+    if not any(weights):
+        return None
+    return tuple(movie_ids), AliasTable(weights)
+
+
+weighted_movie_tables = CatalogueArtifact(lambda: FilterKeyCache(weighted_movie_ids))
+
+
+def pick_weighted_movie_ids(filter_params, count=1, rng=random):
+    """
+    Return up to count distinct movie ids matching filter_params, each drawn
+    with probability proportional to its RANDOM_PICK_WEIGHT.
+    """
+    table = weighted_movie_tables.get().get(filter_params)
+    if table is None:
+        return []
+    movie_ids, alias_table = table
+    picks = {}
+    for _ in range(count * MAX_DRAWS_PER_PICK):
+        if len(picks) == count:
+            break
+        picks.setdefault(movie_ids[alias_table.draw(rng)], None)
+    return list(picks)
@@ -0,0 +1,329 @@
+import datetime
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from lists.models import Item, List
+
+from .cache import catalogue_cache_key
+from .catalogue import CatalogueArtifact
+from .models import EligibleMovie
+from .similar import MovieFeatures, top_k
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover
+    np = sparse = None
+
+WATCHED_WEIGHT = 1.0
+UNWATCHED_WEIGHT = 0.5
+RECOMMENDATION_COUNT = 50
+RECOMMENDATION_CHUNK_SIZE = 128
+# Users scored at once by rank_movies; each is a dense float32 row over the
+# whole catalogue, so 16 users are 32MB at 500k movies.
+RANK_CHUNK_SIZE = 16
+ACTIVE_USER_DAYS = 30
+# An update holds its user's lock for one cache read and write; waiters
+# give up after RECOMMENDATIONS_LOCK_WAIT seconds.
+RECOMMENDATIONS_LOCK_TIMEOUT = 10
+RECOMMENDATIONS_LOCK_WAIT = 2
+
+movie_features = CatalogueArtifact(
+    lambda: MovieFeatures.from_queryset(EligibleMovie.objects.all())
+)
+
+
+def item_weight(watched):
+    return WATCHED_WEIGHT if watched else UNWATCHED_WEIGHT
+
+
+def recommendations_cache_key(user_id):
+    return catalogue_cache_key("recommendations", str(user_id))
+
+
+@contextmanager
+def cache_lock(key, timeout, wait):
+    """
+    Hold a lock shared by every worker through the cache, yielding whether
+    it was acquired within wait seconds. The lock expires after timeout
+    seconds in case its holder dies.
+    """
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + wait
+    while not cache.add(key, token, timeout):
+        if time.monotonic() >= deadline:
+            yield False
+            return
+        time.sleep(0.01)
+    try:
+        yield True
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+class Taste:
+    """
+    A user's taste vector: the sum of the feature rows of the movies on
+    their lists, weighted by whether each has been watched.
+
+    weights maps movie ids to their weight and vector maps feature columns
+    to their total, so a single movie's weight can be changed by adding
+    the difference times its row rather than rebuilding the sum.
+    """
+
+    def __init__(self, weights=None, vector=None):
+        self.weights = weights or {}
+        self.vector = vector or {}
+
+    @classmethod
+    def from_weights(cls, features, weights):
+        taste = cls()
+        for movie_id, weight in weights.items():
+            taste.set_weight(features, movie_id, weight)
+        return taste
+
+    def set_weight(self, features, movie_id, weight):
+        """Set one movie's weight, or remove it when weight is None."""
+        delta = (weight or 0) - self.weights.get(movie_id, 0)
+        if weight is None:
+            self.weights.pop(movie_id, None)
+        else:
+            self.weights[movie_id] = weight
+
+        position = features.positions.get(movie_id)
+        if not delta or position is None:
+            return
+        row = features.matrix[position]
+        for column, value in zip(row.indices.tolist(), row.data.tolist()):
+            total = self.vector.get(column, 0) + delta * value
+            if abs(total) < 1e-6:
+                self.vector.pop(column, None)
+            else:
+                self.vector[column] = total
+
+
+def rank_movies(features, tastes, seen, k=RECOMMENDATION_COUNT):
+    """
+    Return, for each taste vector, the ids of the k best-scoring movies
+    whose positions are not in its entry of seen.
+
+    tastes is a sparse users x features matrix; each score is the dot
+    product of a taste vector and a movie's feature row. Users are scored
+    RANK_CHUNK_SIZE at a time, and equal scores go to the movie earlier in
+    list order.
+    """
+    k = min(k, len(features))
+    if not k:
+        return [[] for _ in seen]
+
+    transposed = features.matrix.T.tocsr()
+    ranked = []
+    for start in range(0, len(seen), RANK_CHUNK_SIZE):
+        end = start + RANK_CHUNK_SIZE
+        scores = (tastes[start:end] @ transposed).toarray()
+        for row, positions in enumerate(seen[start:end]):
+            scores[row, list(positions)] = -np.inf
+        top, top_scores = top_k(scores, k)
+        ranked.extend(
+            [
+                features.movie_ids[position]
+                for position, score in zip(positions, row_scores)
+                if score != -np.inf
+            ]
+            for positions, row_scores in zip(top.tolist(), top_scores.tolist())
+        )
+    return ranked
+
+
+def seen_positions(features, weights):
+    return {
+        features.positions[movie_id]
+        for movie_id in weights
+        if movie_id in features.positions
+    }
+
+
+def get_user_weights(user_ids):
+    """Return each user's weight for every movie on any of their lists."""
+    weights = {user_id: {} for user_id in user_ids}
+    items = Item.objects.filter(_list__owner__in=user_ids).values_list(
+        "_list__owner_id", "movie_id", "watched"
+    )
+    for user_id, movie_id, watched in items:
+        user_weights = weights[user_id]
+        user_weights[movie_id] = max(
+            item_weight(watched), user_weights.get(movie_id, 0)
+        )
+    return weights
+
+
+def taste_vectors(features, weights):
+    """
+    Return a sparse matrix of taste vectors, one row per {movie_id: weight}
+    dict in weights, as the product of a users x movies weight matrix and
+    the feature matrix.
+    """
+    rows, columns, values = [], [], []
+    for row, user_weights in enumerate(weights):
+        for movie_id, weight in user_weights.items():
+            if movie_id in features.positions:
+                rows.append(row)
+                columns.append(features.positions[movie_id])
+                values.append(weight)
+    user_movies = sparse.csr_matrix(
+        (
+            np.asarray(values, dtype=np.float32),
+            (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)),
+        ),
+        shape=(len(weights), len(features)),
+    )
+    return (user_movies @ features.matrix).tocsr()
+
+
+def row_dict(row):
+    """Return a sparse matrix row as a {column: value} dict."""
+    return dict(zip(row.indices.tolist(), row.data.tolist()))
+
+
+def taste_matrix(vectors, column_count):
+    """Stack taste vectors ({column: value} dicts) into a sparse matrix."""
+    rows, columns, values = [], [], []
+    for row, vector in enumerate(vectors):
+        rows.extend([row] * len(vector))
+        columns.extend(vector)
+        values.extend(vector.values())
+    return sparse.csr_matrix(
+        (
+            np.asarray(values, dtype=np.float32),
+            (np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)),
+        ),
+        shape=(len(vectors), column_count),
+    )
+
+
+def get_taste_entries(user_ids):
+    """
+    Return the cached recommendation entry of each user, building and
+    caching the missing ones from their list items in a single query.
+    """
+    keys = {user_id: recommendations_cache_key(user_id) for user_id in user_ids}
+    cached = cache.get_many(keys.values())
+    entries = {user_id: cached[key] for user_id, key in keys.items() if key in cached}
+    missing = [user_id for user_id in user_ids if user_id not in entries]
+    if missing:
+        features = movie_features.get()
+        weights = get_user_weights(missing)
+        tastes = taste_vectors(features, [weights[user_id] for user_id in missing])
+        built = {}
+        for row, user_id in enumerate(missing):
+            entries[user_id] = {
+                "weights": weights[user_id],
+                "vector": row_dict(tastes[row]),
+                "movie_ids": None,
+            }
+            built[keys[user_id]] = entries[user_id]
+        cache.set_many(built, settings.RECOMMENDATIONS_CACHE_TIMEOUT)
+    return entries
+
+
+def get_recommendations(user, limit=RECOMMENDATION_COUNT):
+    """
+    Return the ids of the eligible movies best matching the user's taste,
+    leaving out movies already on their lists.
+
+    The taste vector and ranking are cached per user for the current
+    catalogue version; update_recommendations keeps the taste vector in
+    step with list changes, and the ranking is redone on the next call.
+    """
+    features = movie_features.get()
+    entry = get_taste_entries([user.pk])[user.pk]
+    if entry["movie_ids"] is None:
+        tastes = taste_matrix([entry["vector"]], features.matrix.shape[1])
+        seen = [seen_positions(features, entry["weights"])]
+        entry["movie_ids"] = rank_movies(features, tastes, seen)[0]
+        cache.set(
+            recommendations_cache_key(user.pk),
+            entry,
+            settings.RECOMMENDATIONS_CACHE_TIMEOUT,
+        )
+    return entry["movie_ids"][:limit]
+
+
+def update_recommendations(user_id, movie_id):
+    """
+    Bring a user's cached taste vector in line with their lists after an
+    item for movie_id was added, changed or removed.
+
+    This runs inside the list edit, so it never builds the feature matrix:
+    if this worker's copy is stale, or another edit holds the user's lock
+    too long, the entry is dropped and rebuilt from the lists on next read.
+    """
+    key = recommendations_cache_key(user_id)
+    features = movie_features.get(build=False)
+    if features is None:
+        cache.delete(key)
+        return
+
+    lock = cache_lock(
+        f"{key}:lock", RECOMMENDATIONS_LOCK_TIMEOUT, RECOMMENDATIONS_LOCK_WAIT
+    )
+    with lock as locked:
+        if not locked:
+            cache.delete(key)
+            return
+        entry = cache.get(key)
+        if entry is None:
+            return
+
+        watched = Item.objects.filter(
+            _list__owner_id=user_id, movie_id=movie_id
+        ).values_list("watched", flat=True)
+        weight = max((item_weight(value) for value in watched), default=None)
+        taste = Taste(entry["weights"], entry["vector"])
+        taste.set_weight(features, movie_id, weight)
+        entry = {"weights": taste.weights, "vector": taste.vector, "movie_ids": None}
+        cache.set(key, entry, settings.RECOMMENDATIONS_CACHE_TIMEOUT)
+
+
+def refresh_recommendations(user_ids=None, chunk_size=RECOMMENDATION_CHUNK_SIZE):
+    """
+    Recompute and cache recommendations for user_ids, by default every user
+    whose lists changed in the last ACTIVE_USER_DAYS days.
+
+    Users are scored a chunk at a time: their weights form a sparse users x
+    movies matrix, whose product with the feature matrix gives their taste
+    vectors. Returns the number of users refreshed.
+    """
+    features = movie_features.get()
+    if user_ids is None:
+        since = timezone.now() - datetime.timedelta(days=ACTIVE_USER_DAYS)
+        user_ids = (
+            List.objects.filter(updated__gte=since)
+            .values_list("owner_id", flat=True)
+            .distinct()
+        )
+    user_ids = sorted(set(user_ids))
+
+    for start in range(0, len(user_ids), chunk_size):
+        end = start + chunk_size
+        chunk = user_ids[start:end]
+        weights = get_user_weights(chunk)
+        tastes = taste_vectors(features, [weights[user_id] for user_id in chunk])
+        seen = [seen_positions(features, weights[user_id]) for user_id in chunk]
+        ranked = rank_movies(features, tastes, seen)
+
+        entries = {}
+        for row, user_id in enumerate(chunk):
+            entries[recommendations_cache_key(user_id)] = {
+                "weights": weights[user_id],
+                "vector": row_dict(tastes[row]),
+                "movie_ids": ranked[row],
+            }
+        cache.set_many(entries, settings.RECOMMENDATIONS_CACHE_TIMEOUT)
+    return len(user_ids)
@@ -0,0 +1,127 @@
+import heapq
+import re
+from collections import defaultdict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F
+
+from .catalogue import CatalogueArtifact
+from .models import SEARCH_CONFIG, Movie
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Match ts_rank's default weights for the A (title), B (people) and C (plot)
+# labels used by Movie.update_search_vectors.
+TITLE_WEIGHT = 1.0
+PEOPLE_WEIGHT = 0.4
+PLOT_WEIGHT = 0.2
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def normalize_query(query):
+    """Collapse case and whitespace so equivalent queries share a cache key."""
+    return " ".join(query.lower().split())
+
+
+class MovieSearchIndex:
+    """
+    In-process inverted index over title, people and plot.
+
+    Stands in for the Postgres full-text index on other databases. A movie
+    matches when it contains every query term; its score is the sum of the
+    weights of the fields each term appears in. Positions follow list order
+    (avg_rating DESC, slug ASC), which breaks ties between equal scores.
+    """
+
+    def __init__(self, movie_ids, postings):
+        self.movie_ids = movie_ids
+        self.postings = postings
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        rows = list(
+            queryset.order_by("-avg_rating", "slug").values_list("pk", "title", "plot")
+        )
+        movie_ids = [row[0] for row in rows]
+        positions = {movie_id: position for position, movie_id in enumerate(movie_ids)}
+        postings = defaultdict(dict)
+
+        def add(position, text, weight):
+            for token in set(tokenize(text)):
+                token_postings = postings[token]
+                token_postings[position] = token_postings.get(position, 0) + weight
+
+        for position, (_, title, plot) in enumerate(rows):
+            add(position, title, TITLE_WEIGHT)
+            add(position, plot, PLOT_WEIGHT)
+
+        for through, field in (
+            (Movie.actors.through, "actor__name"),
+            (Movie.director.through, "director__name"),
+        ):
+            people = defaultdict(list)
+            for movie_id, name in through.objects.values_list(
+                "movie_id", field
+            ).iterator():
+                if movie_id in positions:
+                    people[positions[movie_id]].append(name)
+            for position, names in people.items():
+                add(position, " ".join(names), PEOPLE_WEIGHT)
+
+        return cls(movie_ids, dict(postings))
+
+    def search(self, query, limit):
+        """Return the ids of the best matching movies, best first."""
+        scores = None
+        for term in set(tokenize(query)):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                return []
+            if scores is None:
+                scores = dict(term_postings)
+            else:
+                scores = {
+                    position: score + term_postings[position]
+                    for position, score in scores.items()
+                    if position in term_postings
+                }
+        if not scores:
+            return []
+
+        best = heapq.nsmallest(
+            limit, scores, key=lambda position: (-scores[position], position)
+        )
+        return [self.movie_ids[position] for position in best]
+
+
+def build_movie_search_index():
+    return MovieSearchIndex.from_queryset(Movie.objects.filter(eligible__isnull=False))
+
+
+movie_search_index = CatalogueArtifact(build_movie_search_index)
+
+
+def search_movie_ids(query, limit):
+    """
+    Return the ids of listed movies matching query, best match first.
+
+    Uses the tsvector column and its GIN index on Postgres, and the
+    in-process MovieSearchIndex elsewhere.
+    """
+    movies = Movie.objects.filter(eligible__isnull=False)
+    if connections[movies.db].vendor != "postgresql":
+        return movie_search_index.get().search(query, limit)
+
+    search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    return list(
+        movies.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-avg_rating", "slug")
+        .values_list("pk", flat=True)[:limit]
+    )
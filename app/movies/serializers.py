@@ -1,11 +1,20 @@
 # from django.db.models import fields
-from django.db.models import Avg
 from rest_framework import serializers
 
-from .models import Actor, Director, Genre, Movie, OnDemand, Review
+from .fieldsets import SparseFieldsSerializerMixin
+from .group import GROUP_RESULT_COUNT, MAX_GROUP_SIZE, check_consent_token
+from .models import (
+    MOVIE_RELATED_FIELDS,
+    Actor,
+    Director,
+    Genre,
+    Movie,
+    OnDemand,
+    Review,
+)
 
 
-class ActorSerializer(serializers.ModelSerializer):
+class ActorSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Actor
         fields = (
@@ -16,7 +25,7 @@ class ActorSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class DirectorSerializer(serializers.ModelSerializer):
+class DirectorSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Director
         fields = (
@@ -27,25 +36,32 @@ class DirectorSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ["id", "name"]
 
 
-class OnDemandSerializer(serializers.ModelSerializer):
+class GenreCountSerializer(GenreSerializer):
+    """Genre with its listed movie count, for GenreList only."""
+
+    class Meta(GenreSerializer.Meta):
+        fields = ["id", "name", "movie_count"]
+
+
+class OnDemandSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = OnDemand
         fields = ["id", "service", "url"]
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ["id", "source", "score"]
 
 
-class MovieSerializer(serializers.ModelSerializer):
+class MovieSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     actors = ActorSerializer(many=True, read_only=True)
     director = DirectorSerializer(many=True, read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
@@ -56,9 +72,14 @@ class MovieSerializer(serializers.ModelSerializer):
 
     avg_rating = serializers.SerializerMethodField(read_only=True)
 
+    always_included_fields = ("slug",)
+
     def get_avg_rating(self, movie):
-        if hasattr(movie, "reviews"):
-            return movie.reviews.aggregate(avg_score=Avg("score"))["avg_score"]
+        return getattr(movie, "avg_rating", None)
+
+    def get_related_fields(self):
+        """Names of the relations this serializer will render."""
+        return [name for name in MOVIE_RELATED_FIELDS if name in self.fields]
 
     class Meta:
         model = Movie
@@ -80,3 +101,37 @@ class MovieSerializer(serializers.ModelSerializer):
             "on_list",
         )
         read_only_fields = ("__all__",)
+
+
+class MovieCardSerializer(MovieSerializer):
+    """Compact movie representation for list grids."""
+
+    class Meta(MovieSerializer.Meta):
+        fields = (
+            "slug",
+            "title",
+            "released",
+            "runtime",
+            "poster_url",
+            "avg_rating",
+            "on_list",
+        )
+
+
+class GroupMemberSerializer(serializers.Serializer):
+    uid = serializers.UUIDField()
+    token = serializers.CharField()
+
+    def validate(self, data):
+        if not check_consent_token(data["uid"], data["token"]):
+            raise serializers.ValidationError("Invalid or expired consent token.")
+        return data
+
+
+class GroupSerializer(serializers.Serializer):
+    """Other members of a group, each with the consent token they shared."""
+
+    members = GroupMemberSerializer(many=True, max_length=MAX_GROUP_SIZE - 1)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=GROUP_RESULT_COUNT, default=20
+    )
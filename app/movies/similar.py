@@ -0,0 +1,206 @@
+import logging
+
+from django.db import transaction
+
+from .models import EligibleMovie, Movie, MovieNeighbours
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover
+    np = sparse = None
+
+logger = logging.getLogger(__name__)
+
+NEIGHBOUR_COUNT = 20
+# Bumped by each neighbour rebuild, so only MovieSimilar responses are
+# retired rather than every catalogue cache.
+NEIGHBOURS_VERSION_KEY = "catalogue:neighbours-version"
+# Rows of the similarity matrix computed at once; each chunk is a dense
+# chunk x catalogue float32 block.
+NEIGHBOUR_CHUNK_SIZE = 128
+NEIGHBOUR_WRITE_BATCH_SIZE = 5000
+# Decade and runtime bucket are shared by many movies, so they count for
+# less than genres and people.
+FEATURE_WEIGHTS = {
+    "genre": 1.0,
+    "director": 1.0,
+    "actor": 0.75,
+    "decade": 0.5,
+    "runtime": 0.25,
+}
+
+
+class MovieFeatures:
+    """
+    Sparse feature matrix over the eligible catalogue.
+
+    Each row is one movie, in list order (avg_rating DESC, slug ASC), with
+    weighted indicator columns for its genres, directors, actors, decade
+    and runtime bucket. OMDB lists only the leading cast, so every stored
+    actor counts. Rows are L2-normalised, so the dot product of two rows is
+    their cosine similarity.
+    """
+
+    def __init__(self, movie_ids, matrix):
+        self.movie_ids = movie_ids
+        self.matrix = matrix
+        self.positions = {
+            movie_id: position for position, movie_id in enumerate(movie_ids)
+        }
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    @classmethod
+    def from_queryset(cls, queryset):
+        rows = list(
+            queryset.order_by("-avg_rating", "slug").values_list(
+                "movie_id", "decade", "runtime_bucket"
+            )
+        )
+        movie_ids = [row[0] for row in rows]
+        positions = {movie_id: position for position, movie_id in enumerate(movie_ids)}
+
+        entries = {
+            "decade": [(position, row[1]) for position, row in enumerate(rows)],
+            "runtime": [
+                (position, row[2])
+                for position, row in enumerate(rows)
+                if row[2] is not None
+            ],
+        }
+        for name, through, field in (
+            ("genre", Movie.genre.through, "genre_id"),
+            ("director", Movie.director.through, "director_id"),
+            ("actor", Movie.actors.through, "actor_id"),
+        ):
+            entries[name] = [
+                (positions[movie_id], value)
+                for movie_id, value in through.objects.values_list(
+                    "movie_id", field
+                ).iterator()
+                if movie_id in positions
+            ]
+
+        row_indices, column_indices, values = [], [], []
+        offset = 0
+        for name, pairs in entries.items():
+            # Number columns in value order so every worker lays them out alike.
+            columns = {
+                value: column
+                for column, value in enumerate(sorted({value for _, value in pairs}))
+            }
+            for position, value in pairs:
+                row_indices.append(position)
+                column_indices.append(offset + columns[value])
+            values.extend([FEATURE_WEIGHTS[name]] * len(pairs))
+            offset += len(columns)
+
+        matrix = sparse.csr_matrix(
+            (
+                np.asarray(values, dtype=np.float32),
+                (
+                    np.asarray(row_indices, dtype=np.int64),
+                    np.asarray(column_indices, dtype=np.int64),
+                ),
+            ),
+            shape=(len(movie_ids), offset),
+        )
+        return cls(movie_ids, normalize_rows(matrix))
+
+    def nearest_neighbours(self, k=NEIGHBOUR_COUNT, chunk_size=NEIGHBOUR_CHUNK_SIZE):
+        """
+        Return (neighbours, scores) arrays holding, for every row, the k most
+        similar other rows and their similarity, best first.
+
+        Equal scores keep list order, so better-rated movies come first.
+        """
+        count = len(self)
+        k = min(k, count - 1)
+        neighbours = np.zeros((count, max(k, 0)), dtype=np.int32)
+        scores = np.zeros((count, max(k, 0)), dtype=np.float32)
+        if k <= 0:
+            return neighbours, scores
+
+        transposed = self.matrix.T.tocsr()
+        for start in range(0, count, chunk_size):
+            end = min(start + chunk_size, count)
+            similarity = (self.matrix[start:end] @ transposed).toarray()
+            rows = np.arange(end - start)
+            similarity[rows, rows + start] = -1
+
+            neighbours[start:end], scores[start:end] = top_k(similarity, k)
+        return neighbours, scores
+
+    def neighbour_ids(self, k=NEIGHBOUR_COUNT):
+        """Yield (movie_id, neighbour_ids) with only neighbours sharing a feature."""
+        neighbours, scores = self.nearest_neighbours(k)
+        for position, movie_id in enumerate(self.movie_ids):
+            yield movie_id, [
+                self.movie_ids[neighbour]
+                for neighbour, score in zip(neighbours[position], scores[position])
+                if score > 0
+            ]
+
+
+def top_k(scores, k):
+    """
+    Return the columns of the k highest scores in each row, and the scores,
+    best first. Equal scores keep column order, including at the cut-off:
+    of several columns tied for the kth place, the first ones are taken.
+    """
+    kth = -np.partition(-scores, k - 1, axis=1)[:, [k - 1]]
+    above = scores > kth
+    ties = scores == kth
+    wanted_ties = k - above.sum(axis=1, keepdims=True)
+    chosen = above | (ties & (np.cumsum(ties, axis=1, dtype=np.int32) <= wanted_ties))
+    top = np.nonzero(chosen)[1].reshape(len(scores), k)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.lexsort((top, -top_scores))
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(
+        top_scores, order, axis=1
+    )
+
+
+def normalize_rows(matrix):
+    norms = np.sqrt(matrix.multiply(matrix).sum(axis=1)).A1
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).astype(np.float32) @ matrix
+
+
+def refresh_movie_neighbours(k=NEIGHBOUR_COUNT, batch_size=NEIGHBOUR_WRITE_BATCH_SIZE):
+    """
+    Recompute every eligible movie's neighbours and replace the stored lists.
+
+    Rows are upserted and stale rows deleted in one transaction, so readers
+    keep seeing the previous lists until it commits. Returns the number of
+    movies written, or None if NumPy or SciPy is missing.
+    """
+    if sparse is None:
+        logger.error("Cannot refresh movie neighbours without numpy and scipy.")
+        return None
+
+    features = MovieFeatures.from_queryset(EligibleMovie.objects.all())
+    with transaction.atomic():
+        batch = []
+        for movie_id, neighbour_ids in features.neighbour_ids(k):
+            batch.append(
+                MovieNeighbours(movie_id=movie_id, neighbour_ids=neighbour_ids)
+            )
+            if len(batch) == batch_size:
+                _upsert(batch)
+                batch = []
+        _upsert(batch)
+        MovieNeighbours.objects.filter(movie__eligible__isnull=True).delete()
+    return len(features)
+
+
+def _upsert(rows):
+    if rows:
+        MovieNeighbours.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["movie"],
+            update_fields=["neighbour_ids"],
+        )
@@ -1,12 +1,15 @@
 import logging
-import random
-import time
 
 from django.db import transaction
 
 from config.celery import app
 
+from .catalogue import bump_catalogue_version
+from .ingest import INGEST_BATCH_SIZE, ingest_movies
 from .models import Actor, Director, Genre, Movie, Review
+from .omdb import fetch_omdb_records, get_token_bucket
+from .recommendations import refresh_recommendations
+from .similar import NEIGHBOURS_VERSION_KEY, refresh_movie_neighbours
 from .utils import OMDBFetch, get_imdbids_from_webpage
 
 logger = logging.getLogger(__name__)
@@ -51,22 +54,52 @@ def add_movie_to_db(imdbid):
     movie.director.set(related_directors)
     movie.genre.set(related_genres)
 
-    for source, score in omdb_data["Ratings"].items():
-        Review.objects.create(movie=movie, source=source, score=score)
+    Review.objects.bulk_create(
+        Review(movie=movie, source=source, score=score)
+        for source, score in omdb_data["Ratings"].items()
+    )
+    movie.update_rating()
 
 
 @app.task()
 def add_movies_to_db(imdbids):
-    """Task to add a list of movies to DB."""
-    # Execute tasks sequentially to prevent rate limiting.
-    for imdbid in imdbids:
-        try:
-            add_movie_to_db(imdbid)
-        except Exception as e:
-            logger.error(f"Failed to add {imdbid}: {e}")
-        print(f"Added {imdbid} to DB.")
-        logger.info(f"Successfully added {imdbid} to DB.")
-        time.sleep(random.randint(1, 2))
+    """
+    Task to add a list of movies to DB. Movies are fetched and stored a
+    batch at a time, so each batch is listed as soon as it commits and an
+    interrupted run keeps the batches already done.
+    """
+    imdbids = list(imdbids)
+    bucket = get_token_bucket()
+    added = 0
+    for start in range(0, len(imdbids), INGEST_BATCH_SIZE):
+        end = start + INGEST_BATCH_SIZE
+        batch = ingest_movies(fetch_omdb_records(imdbids[start:end], bucket=bucket))
+        if batch:
+            bump_catalogue_version()
+        added += len(batch)
+        logger.info(f"Added {added} movies; {min(end, len(imdbids))} ids fetched.")
+    logger.info(f"Successfully added {added} of {len(imdbids)} movies to DB.")
+    if added:
+        transaction.on_commit(update_movie_neighbours.delay)
+
+
+@app.task()
+def update_movie_neighbours():
+    """
+    Task to recompute every movie's "more like this" list. Runs on the
+    beat schedule and after each import that added movies.
+    """
+    count = refresh_movie_neighbours()
+    if count is not None:
+        logger.info(f"Updated neighbours for {count} movies.")
+        bump_catalogue_version(NEIGHBOURS_VERSION_KEY)
+
+
+@app.task()
+def refresh_active_recommendations():
+    """Task to recompute recommendations for recently active users."""
+    count = refresh_recommendations()
+    logger.info(f"Updated recommendations for {count} users.")
 
 
 def add_movies_from_url_to_db(url: str):
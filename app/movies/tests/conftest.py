@@ -1,7 +1,12 @@
+import datetime
+
 import pytest
 from pytest_factoryboy import register
 
-from movies.models import Movie
+from accounts.models import CustomUser
+from lists.models import Item, List
+from lists.views import DEFAULT_LIST
+from movies.models import Director, Genre, Movie
 
 from .factories import GenreFactory, MovieFactory
 
@@ -9,6 +14,65 @@ register(GenreFactory)
 register(MovieFactory)
 
 
+@pytest.fixture
+def catalogue():
+    """Six 1980 movies in two genres, three of them by one director."""
+    horror = Genre.objects.create(name="Horror")
+    comedy = Genre.objects.create(name="Comedy")
+    carpenter = Director.objects.create(name="John Carpenter")
+
+    for title, genre, rating, director in (
+        ("Halloween", horror, 90, carpenter),
+        ("Airplane", comedy, 88, None),
+        ("The Thing", horror, 85, carpenter),
+        ("Trading Places", comedy, 80, None),
+        ("Scream", horror, 75, None),
+        ("The Fog", horror, 70, carpenter),
+    ):
+        movie = MovieFactory(
+            title=title,
+            slug=title.lower().replace(" ", "-"),
+            released=datetime.date(1980, 1, 1),
+            runtime=95,
+            review=[rating],
+        )
+        movie.genre.add(genre)
+        if director:
+            movie.director.add(director)
+
+
+@pytest.fixture
+def add_movies_by_year():
+    def _add_movies_by_year(years, rating=80):
+        for year in years:
+            MovieFactory(
+                title=f"Made in {year}",
+                released=datetime.date(year, 1, 1),
+                review=[rating],
+            )
+
+    return _add_movies_by_year
+
+
+@pytest.fixture
+def make_user():
+    def _make_user(email):
+        return CustomUser.objects.create_user(email=email, password="pw")
+
+    return _make_user
+
+
+@pytest.fixture
+def add_item():
+    def _add_item(user, slug, watched=False, name=DEFAULT_LIST):
+        _list, _ = List.objects.get_or_create(owner=user, name=name)
+        return Item.objects.create(
+            _list=_list, movie=Movie.objects.get(slug=slug), watched=watched
+        )
+
+    return _add_item
+
+
 @pytest.fixture(scope="function")
 def add_movie():
     def _add_movie(imdbid, title, released, runtime, poster_url):
@@ -25,9 +89,9 @@ def add_movie():
 
 
 @pytest.fixture
-def mock_requests_get(mocker):
-    mock = mocker.patch("requests.get")
-    mock.return_value.__enter__.return_value.json.return_value = {
+def omdb_response():
+    """A response recorded from the OMDB API."""
+    return {
         "Title": "No Sudden Move",
         "Year": "2021",
         "Rated": "R",
@@ -61,4 +125,10 @@ def mock_requests_get(mocker):
         "Website": "N/A",
         "Response": "True",
     }
+
+
+@pytest.fixture
+def mock_requests_get(mocker, omdb_response):
+    mock = mocker.patch("requests.get")
+    mock.return_value.__enter__.return_value.json.return_value = omdb_response
     return mock
@@ -0,0 +1,91 @@
+import pytest
+
+from movies.autocomplete import (
+    MAX_SUGGESTIONS,
+    AutocompleteIndex,
+    build_autocomplete_index,
+    fold,
+)
+from movies.models import Actor, Director
+
+from .factories import MovieFactory
+
+
+@pytest.fixture
+def catalogue():
+    MovieFactory(title="Space Station", slug="space-station", review=[90])
+    amelie = MovieFactory(title="Amélie", review=[85])
+    spartacus = MovieFactory(title="Spartacus", review=[70])
+    MovieFactory(title="Space Flop", review=[20])
+    amelie.actors.add(Actor.objects.create(name="Sam Spade"))
+    spartacus.director.add(Director.objects.create(name="Sam Spade"))
+
+
+def labels(suggestions):
+    return [suggestion["label"] for suggestion in suggestions]
+
+
+def test_fold():
+    assert fold("  Amélie: Part-II ") == "amelie part ii"
+    assert fold("!!") == ""
+
+
+@pytest.mark.django_db
+def test_index_ranks_by_rating(catalogue):
+    index = build_autocomplete_index()
+
+    assert len(index) == 4
+    assert labels(index.suggest("sp", limit=10)) == [
+        "Space Station",
+        "Sam Spade",
+        "Spartacus",
+    ]
+    assert index.suggest("sp", limit=10)[0] == {
+        "type": "movie",
+        "label": "Space Station",
+        "slug": "space-station",
+    }
+    assert index.suggest("sp", limit=10)[1] == {"type": "person", "label": "Sam Spade"}
+
+
+@pytest.mark.django_db
+def test_index_matches_later_words_and_longer_prefixes(catalogue):
+    index = build_autocomplete_index()
+
+    assert labels(index.suggest("stat", limit=10)) == ["Space Station"]
+    assert labels(index.suggest("space s", limit=10)) == ["Space Station"]
+    assert labels(index.suggest("spad", limit=10)) == ["Sam Spade"]
+    assert labels(index.suggest("AMEL", limit=10)) == ["Amélie"]
+    assert index.suggest("spaceship", limit=10) == []
+    assert index.suggest("", limit=10) == []
+
+
+def test_short_and_long_prefixes_rank_the_same():
+    index = AutocompleteIndex.from_suggestions(
+        (score, {"label": f"Word {score:02d}"}) for score in range(MAX_SUGGESTIONS + 5)
+    )
+
+    expected = [f"Word {score:02d}" for score in range(24, 14, -1)]
+    assert labels(index.suggest("wor", limit=10)) == expected
+    assert labels(index.suggest("word", limit=10)) == expected
+    assert len(index.suggest("w", limit=MAX_SUGGESTIONS)) == MAX_SUGGESTIONS
+
+
+@pytest.mark.django_db
+def test_autocomplete_endpoint(client, catalogue, django_assert_num_queries):
+    client.get("/api/autocomplete/?q=s")
+
+    with django_assert_num_queries(0):
+        resp = client.get("/api/autocomplete/?q=spa&limit=2")
+
+    assert resp.status_code == 200
+    assert labels(resp.data["results"]) == ["Space Station", "Sam Spade"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("limit", ["0", "21", "x"])
+def test_autocomplete_endpoint_invalid_limit(client, limit):
+    resp = client.get(f"/api/autocomplete/?q=spa&limit={limit}")
+
+    assert resp.status_code == 400
+    assert "limit" in resp.data
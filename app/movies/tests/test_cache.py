@@ -0,0 +1,215 @@
+import threading
+
+import pytest
+from django.contrib.admin.sites import AdminSite
+from django.test import RequestFactory
+
+from accounts.models import CustomUser
+from lists.models import Item, List
+from movies.admin import MovieAdmin
+from movies.cache import canonical_query
+from movies.catalogue import (
+    CatalogueArtifact,
+    bump_catalogue_version,
+    get_catalogue_version,
+)
+from movies.models import Movie
+from movies.tasks import add_movies_to_db
+
+from .factories import MovieFactory
+
+DEFAULT_LIST = "watch-list"
+
+
+def test_canonical_query_sorts_and_drops_unknown_params():
+    params = {"rmax": "120", "g": "1,3", "utm_source": "x", "dmin": ""}
+    assert canonical_query(params, ("g", "dmin", "rmax")) == "g=1%2C3&rmax=120"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "url", ["/api/movies/", "/api/movies/?g=1&rmin=90", "/api/genres/"]
+)
+def test_catalogue_responses_served_from_cache(client, django_assert_num_queries, url):
+    MovieFactory(title="Tester", review=[80])
+    first = client.get(url)
+
+    with django_assert_num_queries(0):
+        second = client.get(url)
+
+    assert second.status_code == 200
+    assert second.data == first.data
+
+
+@pytest.mark.django_db
+def test_movie_detail_served_from_cache(client, django_assert_num_queries):
+    movie = MovieFactory(title="Tester", review=[80])
+    client.get(f"/api/movies/{movie.slug}/")
+
+    with django_assert_num_queries(0):
+        resp = client.get(f"/api/movies/{movie.slug}/")
+
+    assert resp.status_code == 200
+    assert resp.data["title"] == "Tester"
+
+
+@pytest.mark.django_db
+def test_unknown_params_share_cache_entry(client, django_assert_num_queries):
+    MovieFactory(title="Tester", review=[80])
+    client.get("/api/movies/?rmin=90&g=1")
+
+    with django_assert_num_queries(0):
+        client.get("/api/movies/?g=1&rmin=90&utm_source=newsletter")
+
+
+@pytest.mark.django_db
+def test_catalogue_version_bump_invalidates_cache(client):
+    MovieFactory(title="Tester", review=[80])
+    client.get("/api/movies/")
+    MovieFactory(title="New Release", review=[90])
+
+    resp = client.get("/api/movies/")
+    assert [movie["title"] for movie in resp.data["results"]] == ["Tester"]
+
+    bump_catalogue_version()
+    resp = client.get("/api/movies/")
+    assert [movie["title"] for movie in resp.data["results"]] == [
+        "New Release",
+        "Tester",
+    ]
+
+
+@pytest.mark.django_db
+def test_on_list_not_shared_between_users(client, auth_user_client):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    movie = MovieFactory(title="Tester", review=[80])
+    _list = List.objects.create(owner=user, name=DEFAULT_LIST)
+    Item.objects.create(_list=_list, movie=movie)
+
+    authed = auth_user_client.get("/api/movies/")
+    anonymous = client.get("/api/movies/")
+    authed_detail = auth_user_client.get(f"/api/movies/{movie.slug}/")
+    anonymous_detail = client.get(f"/api/movies/{movie.slug}/")
+
+    assert authed.data["results"][0]["on_list"] is True
+    assert anonymous.data["results"][0]["on_list"] is False
+    assert authed_detail.data["on_list"] is True
+    assert anonymous_detail.data["on_list"] is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_admin_edit_bumps_catalogue_version():
+    movie = MovieFactory(title="Tester", review=[80])
+    version = get_catalogue_version()
+    movie_admin = MovieAdmin(Movie, AdminSite())
+    request = RequestFactory().post("/admin/")
+
+    movie.title = "Edited"
+    movie_admin.save_model(request, movie, form=None, change=True)
+
+    assert get_catalogue_version() != version
+
+
+@pytest.mark.django_db
+def test_add_movies_task_bumps_catalogue_version_when_movies_added(mocker):
+    mocker.patch("movies.tasks.fetch_omdb_records", return_value=[])
+    ingest = mocker.patch("movies.tasks.ingest_movies", return_value=[])
+    version = get_catalogue_version()
+
+    add_movies_to_db(["tt0000001"])
+    assert get_catalogue_version() == version
+
+    ingest.return_value = ["tt0000001"]
+    add_movies_to_db(["tt0000001"])
+    assert get_catalogue_version() != version
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "first_query, second_query",
+    [
+        ("g=3,1", "g=1,3"),
+        ("dmin=1990&dmax=1999", "dmax=1990&dmin=1995"),
+        ("rmin=90&rmax=90", "rmin=87&rmax=93"),
+    ],
+)
+def test_equivalent_filters_share_cache_entry(
+    client, django_assert_num_queries, first_query, second_query
+):
+    MovieFactory(title="Tester", review=[80])
+    first = client.get(f"/api/movies/?{first_query}")
+
+    with django_assert_num_queries(0):
+        second = client.get(f"/api/movies/?{second_query}")
+
+    assert second.data == first.data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/movies/", "/api/movies/?g=1", "/api/genres/"])
+def test_catalogue_not_modified(client, django_assert_num_queries, url):
+    MovieFactory(title="Tester", review=[80])
+    etag = client.get(url)["ETag"]
+
+    with django_assert_num_queries(0):
+        resp = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert resp.status_code == 304
+    assert resp["ETag"] == etag
+    assert not resp.content
+
+
+@pytest.mark.django_db
+def test_catalogue_etag_changes_with_version_and_query(client):
+    movie = MovieFactory(title="Tester", review=[80])
+    etag = client.get("/api/movies/")["ETag"]
+
+    assert client.get("/api/movies/?g=1")["ETag"] != etag
+    assert client.get(f"/api/movies/{movie.slug}/")["ETag"] != etag
+
+    bump_catalogue_version()
+    resp = client.get("/api/movies/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_catalogue_etag_changes_with_users_list(
+    auth_user_client, django_assert_num_queries
+):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    movie = MovieFactory(title="Tester", review=[80])
+    _list = List.objects.create(owner=user, name=DEFAULT_LIST)
+    etag = auth_user_client.get("/api/movies/")["ETag"]
+
+    # user lookup; the on-list token is cached
+    with django_assert_num_queries(1):
+        resp = auth_user_client.get("/api/movies/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+
+    Item.objects.create(_list=_list, movie=movie)
+    resp = auth_user_client.get("/api/movies/", HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp.data["results"][0]["on_list"] is True
+
+
+def test_background_artifact_serves_old_value_while_rebuilding():
+    release = threading.Event()
+    builds = iter(["first", "second"])
+
+    def build():
+        value = next(builds)
+        if value == "second":
+            release.wait(5)
+        return value
+
+    artifact = CatalogueArtifact(build, background=True)
+    assert artifact.get() == "first"
+
+    bump_catalogue_version()
+    assert artifact.get() == "first"
+    assert artifact.get() == "first"
+
+    release.set()
+    artifact._rebuild_thread.join(5)
+    assert artifact.get() == "second"
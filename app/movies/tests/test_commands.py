@@ -0,0 +1,31 @@
+import pytest
+from django.core.management import call_command
+
+from movies.models import EligibleMovie, Movie, Review
+
+
+@pytest.mark.django_db
+def test_rebuild_movie_ratings():
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    Review.objects.bulk_create(
+        [
+            Review(movie=movie, source="imdb", score=65),
+            Review(movie=movie, source="metacritic", score=75),
+        ]
+    )
+    unreviewed = Movie.objects.create(
+        imdbid="test5678", title="Tester 2", released="2021-01-14", poster_url="img"
+    )
+    Movie.objects.filter(pk=unreviewed.pk).update(avg_rating=99, review_count=3)
+
+    call_command("rebuild_movie_ratings", batch_size=1)
+
+    movie.refresh_from_db()
+    unreviewed.refresh_from_db()
+    assert movie.avg_rating == 70.0
+    assert movie.review_count == 2
+    assert unreviewed.avg_rating is None
+    assert unreviewed.review_count == 0
+    assert list(EligibleMovie.objects.values_list("movie_id", flat=True)) == [movie.pk]
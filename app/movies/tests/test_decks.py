@@ -0,0 +1,124 @@
+import pytest
+from django.core.cache import cache
+
+from accounts.models import CustomUser
+from movies.decks import Deck, deck_cache_key
+from movies.models import Movie
+
+
+@pytest.fixture
+def catalogue(add_movies_by_year):
+    add_movies_by_year(range(1970, 1995))
+
+
+def test_deck_deals_every_id_once():
+    movie_ids = [f"tt{number}" for number in range(23)]
+    deck = Deck.create(movie_ids, chunk_size=4)
+
+    dealt = []
+    remaining = []
+    for _ in range(5):
+        batch, left = deck.deal(5)
+        dealt.extend(batch)
+        remaining.append(left)
+
+    assert sorted(dealt) == sorted(movie_ids)
+    assert dealt != movie_ids
+    assert remaining == [18, 13, 8, 3, 0]
+    assert deck.deal(5) == ([], 0)
+
+
+def test_deck_deals_across_chunks():
+    movie_ids = [f"tt{number}" for number in range(10)]
+    deck = Deck.create(movie_ids, chunk_size=4)
+    shuffled = [
+        movie_id
+        for number in range(3)
+        for movie_id in cache.get(deck.chunk_key(number))
+    ]
+
+    assert deck.deal(3) == (shuffled[0:3], 7)
+    assert deck.deal(6) == (shuffled[3:9], 1)
+    assert deck.deal(6) == (shuffled[9:10], 0)
+
+
+def test_expired_deck():
+    deck = Deck.create(["tt1", "tt2"], owner_id=7, chunk_size=1)
+    loaded = Deck.load(deck.deck_id)
+    assert (loaded.size, loaded.owner_id, loaded.chunk_size) == (2, 7, 1)
+
+    cache.delete(deck_cache_key(deck.deck_id, "position"))
+    assert deck.deal(1) is None
+
+    cache.clear()
+    assert Deck.load(deck.deck_id) is None
+
+
+@pytest.mark.django_db
+def test_deck_endpoints(client, catalogue):
+    resp = client.post("/api/decks/?dmin=1980&dmax=1980")
+    assert resp.status_code == 201
+    assert resp.data["size"] == 10
+    deck_id = resp.data["deck"]
+
+    titles = []
+    for remaining in (6, 2, 0):
+        resp = client.post(f"/api/decks/{deck_id}/next/?n=4")
+        assert resp.status_code == 200
+        assert resp.data["remaining"] == remaining
+        titles.extend(movie["title"] for movie in resp.data["results"])
+
+    assert sorted(titles) == [f"Made in {year}" for year in range(1980, 1990)]
+    assert set(resp.data["results"][0]) == {
+        "slug",
+        "title",
+        "released",
+        "runtime",
+        "poster_url",
+        "avg_rating",
+        "on_list",
+    }
+
+    resp = client.post(f"/api/decks/{deck_id}/next/")
+    assert resp.data == {"results": [], "remaining": 0}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", ["n=0", "n=51", "n=x"])
+def test_deck_next_invalid_count(client, query):
+    deck = Deck.create(["tt1"])
+
+    resp = client.post(f"/api/decks/{deck.deck_id}/next/?{query}")
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_deck_create_invalid_params(client):
+    assert client.post("/api/decks/?exclude=seen").status_code == 400
+    assert client.post("/api/decks/?dmin=abc").status_code == 400
+
+
+@pytest.mark.django_db
+def test_unknown_deck(client):
+    resp = client.post("/api/decks/missing/next/")
+
+    assert resp.status_code == 404
+
+
+@pytest.mark.django_db
+def test_deck_excludes_on_list(auth_user_client, client, catalogue, add_item):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    add_item(user, Movie.objects.get(title="Made in 1980").slug)
+
+    resp = auth_user_client.post("/api/decks/?dmin=1980&dmax=1980&exclude=on_list")
+    assert resp.data["size"] == 9
+    deck_id = resp.data["deck"]
+
+    resp = auth_user_client.post(f"/api/decks/{deck_id}/next/?n=20")
+    titles = [movie["title"] for movie in resp.data["results"]]
+    assert len(titles) == 9
+    assert "Made in 1980" not in titles
+
+    resp = client.post(f"/api/decks/{deck_id}/next/")
+    assert resp.status_code == 404
@@ -0,0 +1,115 @@
+import datetime
+from collections import Counter
+
+import pytest
+from django.http import QueryDict
+from django.test import override_settings
+
+from movies.facets import facet_counts
+from movies.filters import MovieFilter, MovieFilterParams
+from movies.models import EligibleMovie, Genre, runtime_bucket
+
+from .factories import MovieFactory, MovieWithGenreFactory
+
+QUERIES = [
+    "",
+    "g={comedy}",
+    "g={comedy},{horror}",
+    "g={comedy},{horror}&gmatch=all",
+    "dmin=1980&dmax=1990",
+    "rmin=90&rmax=120",
+    "rmin=<75&rmax=<75",
+    "g={horror}&dmin=1960&dmax=2020&rmin=75&rmax=>150",
+]
+
+
+@pytest.fixture
+def catalogue():
+    released = [
+        datetime.date(1959, 12, 31),
+        datetime.date(1985, 1, 1),
+        datetime.date(1990, 1, 1),
+        datetime.date(2021, 1, 31),
+    ]
+    runtimes = [25, 74, 75, 90, 120, 151, None]
+    genres = [["comedy"], ["horror"], ["comedy", "horror"], []]
+    for i in range(40):
+        MovieWithGenreFactory(
+            genre=genres[i % len(genres)],
+            released=released[i % len(released)],
+            runtime=runtimes[i % len(runtimes)],
+            review=[30 + (i * 7) % 70],
+        )
+    Genre.objects.create(name="western")
+    MovieFactory(poster_url="N/A", review=[90])
+    return {genre.name: genre.id for genre in Genre.objects.all()}
+
+
+def expected_counts(params):
+    """Count the facets the slow way, one matching movie at a time."""
+    queryset = MovieFilter(params, queryset=EligibleMovie.objects.all()).qs
+    genres, decades, buckets = Counter(), Counter(), Counter()
+    for eligible in queryset.select_related("movie"):
+        decades[eligible.released.year // 10 * 10] += 1
+        if eligible.runtime is not None:
+            buckets[runtime_bucket(eligible.runtime)] += 1
+        for genre in eligible.movie.genre.all():
+            genres[genre.id] += 1
+    return queryset.count(), genres, decades, buckets
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("filter_index", [0, 1])
+@pytest.mark.parametrize("query", QUERIES)
+def test_facet_counts_match_filtered_movies(catalogue, query, filter_index):
+    params = MovieFilterParams.from_query(QueryDict(query.format(**catalogue)))
+    total, genres, decades, buckets = expected_counts(params)
+
+    with override_settings(MOVIE_FILTER_INDEX=filter_index):
+        facets = facet_counts(params)
+
+    assert facets["count"] == total
+    assert {facet["id"]: facet["count"] for facet in facets["genres"]} == {
+        genre_id: genres[genre_id] for genre_id in catalogue.values()
+    }
+    assert {facet["decade"]: facet["count"] for facet in facets["decades"]} == dict(
+        decades
+    )
+    assert {facet["bucket"]: facet["count"] for facet in facets["runtimes"]} == {
+        bucket: buckets[bucket] for bucket in range(7)
+    }
+
+
+@pytest.mark.django_db
+def test_facet_counts_use_one_grouped_query(catalogue, django_assert_num_queries):
+    # genre names, then the grouped counts
+    with django_assert_num_queries(2):
+        facet_counts(MovieFilterParams())
+
+
+@pytest.mark.django_db
+def test_facets_endpoint(client, catalogue, django_assert_num_queries):
+    horror = catalogue["horror"]
+    resp = client.get(f"/api/facets/?g={horror}&dmin=1980&dmax=1980")
+
+    assert resp.status_code == 200
+    assert resp.data == facet_counts(
+        MovieFilterParams(genres=(horror,), year_min=1980, year_max=1989)
+    )
+    assert resp.data["genres"][0]["name"] == "horror"
+    assert resp.data["genres"][-1] == {
+        "id": catalogue["western"],
+        "name": "western",
+        "count": 0,
+    }
+    assert resp.data["runtimes"][0]["max"] == 74
+    assert resp.data["runtimes"][-1]["min"] == 151
+
+    with django_assert_num_queries(0):
+        again = client.get(f"/api/facets/?dmax=1985&g={horror}&dmin=1985")
+    assert again.data == resp.data
+
+
+@pytest.mark.django_db
+def test_facets_endpoint_rejects_bad_filters(client):
+    assert client.get("/api/facets/?dmin=19").status_code == 400
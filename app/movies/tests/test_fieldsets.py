@@ -0,0 +1,50 @@
+import pytest
+from rest_framework.exceptions import ValidationError
+
+from movies.fieldsets import format_fields, parse_fields
+from movies.serializers import MovieSerializer
+
+
+@pytest.mark.parametrize(
+    "value, tree",
+    [
+        ("title", {"title": None}),
+        ("title, slug,", {"title": None, "slug": None}),
+        ("genre.name,genre.id", {"genre": {"name": None, "id": None}}),
+        ("genre.name,genre", {"genre": None}),
+        ("genre,genre.name", {"genre": None}),
+    ],
+)
+def test_parse_fields(value, tree):
+    assert parse_fields(value) == tree
+
+
+def test_format_fields_is_canonical():
+    assert format_fields(parse_fields("title,genre.name,genre.id,slug")) == (
+        "genre.id,genre.name,slug,title"
+    )
+    assert format_fields(parse_fields("slug,title")) == format_fields(
+        parse_fields("title,slug")
+    )
+
+
+def test_serializer_restricted_to_requested_fields():
+    serializer = MovieSerializer(fields=parse_fields("title,genre.name"))
+
+    assert list(serializer.fields) == ["slug", "title", "genre"]
+    assert list(serializer.fields["genre"].child.fields) == ["name"]
+    assert serializer.get_related_fields() == ["genre"]
+
+
+@pytest.mark.parametrize(
+    "value, message",
+    [
+        ("title,budget", "Unknown fields: budget."),
+        ("genre.rank", "Unknown fields: genre.rank."),
+        ("title.length", "title has no nested fields."),
+    ],
+)
+def test_serializer_rejects_unknown_fields(value, message):
+    with pytest.raises(ValidationError) as excinfo:
+        MovieSerializer(fields=parse_fields(value))
+    assert excinfo.value.detail["fields"] == [message]
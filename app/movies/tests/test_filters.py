@@ -0,0 +1,115 @@
+import pytest
+from django.http import QueryDict
+from rest_framework.exceptions import ValidationError
+
+from movies.filters import MovieFilterParams
+
+
+def params(query):
+    return MovieFilterParams.from_query(QueryDict(query))
+
+
+def test_empty_query():
+    assert params("") == MovieFilterParams()
+    assert params("").key == ""
+
+
+def test_genre_match():
+    assert params("g=1,2&gmatch=all").genre_match == "all"
+    assert params("g=1,2&gmatch=all").key == "g=1,2&gmatch=all"
+    assert params("g=1,2&gmatch=any").key == params("g=1,2").key == "g=1,2"
+    assert params("g=1&gmatch=all").key == params("g=1").key
+    assert params("gmatch=all").key == ""
+
+
+def test_genres_sorted_and_deduplicated():
+    assert params("g=3,1,3").genres == (1, 3)
+    assert params("g=3,1").key == params("g=1,3").key == "g=1,3"
+
+
+@pytest.mark.parametrize(
+    "query, year_min, year_max",
+    [
+        ("dmin=1990&dmax=1990", 1990, 1999),
+        ("dmin=1995&dmax=1999", 1990, 1999),
+        ("dmin=pre&dmax=pre", 1920, 1959),
+        ("dmin=pre&dmax=1960", 1920, 1969),
+        ("dmax=2020", None, 2029),
+    ],
+)
+def test_decades_snapped_to_years(query, year_min, year_max):
+    assert params(query).year_min == year_min
+    assert params(query).year_max == year_max
+
+
+def test_equivalent_decades_share_key():
+    assert params("dmin=1990&dmax=1999").key == params("dmin=1990&dmax=1990").key
+
+
+@pytest.mark.parametrize(
+    "query, runtime_min, runtime_max",
+    [
+        ("rmin=90&rmax=90", 87, 93),
+        ("rmin=90&rmax=120", 90, 120),
+        ("rmin=<75&rmax=120", None, 120),
+        ("rmin=<75&rmax=<75", None, 74),
+        ("rmin=150&rmax=>150", 150, None),
+        ("rmin=>150&rmax=>150", 151, None),
+        ("rmin=74&rmax=<75", 74, 74),
+    ],
+)
+def test_runtime_boundary_rules(query, runtime_min, runtime_max):
+    assert params(query).runtime_min == runtime_min
+    assert params(query).runtime_max == runtime_max
+
+
+def test_equivalent_runtimes_share_key():
+    assert params("rmin=90&rmax=90").key == params("rmin=87&rmax=93").key
+
+
+def test_key_is_stable_across_param_order():
+    assert params("rmax=120&g=2,1&dmin=1990").key == "g=1,2&dmin=1990&rmax=120"
+
+
+@pytest.mark.parametrize(
+    "query, field",
+    [
+        ("g=abc", "g"),
+        ("g=1,,2", "g"),
+        ("g=1,99999999999999999999999", "g"),
+        ("g=1,2&gmatch=most", "gmatch"),
+        ("dmin=199", "dmin"),
+        ("dmin=0000", "dmin"),
+        ("dmax=0999", "dmax"),
+        ("dmax=nineties", "dmax"),
+        ("rmin=abc", "rmin"),
+        ("rmax=<>90", "rmax"),
+    ],
+)
+def test_invalid_params_rejected(query, field):
+    with pytest.raises(ValidationError) as excinfo:
+        params(query)
+    assert field in excinfo.value.detail
+
+
+@pytest.mark.django_db
+def test_movie_list_rejects_invalid_params_before_querying(
+    client, django_assert_num_queries
+):
+    with django_assert_num_queries(0):
+        resp = client.get("/api/movies/?rmin=abc&g=1")
+
+    assert resp.status_code == 400
+    assert "rmin" in resp.data
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, field",
+    [("dmin=0000", "dmin"), ("dmax=0999", "dmax"), ("g=2147483648", "g")],
+)
+def test_movie_list_rejects_out_of_range_params(client, query, field):
+    resp = client.get(f"/api/movies/?{query}")
+
+    assert resp.status_code == 400
+    assert field in resp.data
@@ -0,0 +1,103 @@
+import pytest
+from django.core import signing
+from django.test import override_settings
+
+from accounts.models import CustomUser
+from movies.group import (
+    check_consent_token,
+    make_consent_token,
+    rank_for_group,
+)
+from movies.models import Movie
+
+
+def slugs(ranked):
+    return [
+        (Movie.objects.get(pk=movie_id).slug, overlap) for movie_id, overlap in ranked
+    ]
+
+
+@pytest.mark.django_db
+def test_consent_tokens(make_user):
+    user, other = make_user("one@user.com"), make_user("two@user.com")
+    token = make_consent_token(user)
+
+    assert check_consent_token(user.uid, token)
+    assert not check_consent_token(other.uid, token)
+    assert not check_consent_token(user.uid, token + "x")
+    with override_settings(GROUP_CONSENT_MAX_AGE=-1):
+        assert not check_consent_token(user.uid, token)
+    assert not check_consent_token(user.uid, signing.dumps({"uid": str(user.uid)}))
+
+
+@pytest.mark.django_db
+def test_rank_for_group_prefers_overlap_and_skips_watched(
+    catalogue, make_user, add_item
+):
+    one, two, three = (make_user(f"{n}@user.com") for n in ("one", "two", "three"))
+    add_item(one, "scream")
+    add_item(two, "scream")
+    add_item(three, "trading-places")
+    add_item(one, "airplane")
+    add_item(two, "halloween", watched=True)
+
+    ranked = slugs(rank_for_group([one.pk, two.pk, three.pk]))
+
+    assert ranked[0] == ("scream", 2)
+    assert ("halloween", 1) not in ranked and "halloween" not in dict(ranked)
+    assert dict(ranked)["airplane"] == 1
+    assert dict(ranked)["the-thing"] == 0
+
+
+@pytest.mark.django_db
+def test_rank_for_group_breaks_ties_by_affinity(catalogue, make_user, add_item):
+    one, two = make_user("one@user.com"), make_user("two@user.com")
+    add_item(one, "halloween", watched=True)
+    add_item(two, "scream", watched=True)
+
+    assert slugs(rank_for_group([one.pk, two.pk], limit=1)) == [("the-thing", 0)]
+
+
+@pytest.mark.django_db
+def test_group_endpoint(auth_user_client, client, catalogue, make_user, add_item):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    friend = make_user("friend@user.com")
+    add_item(user, "airplane")
+    add_item(friend, "airplane")
+
+    consent = {"uid": str(friend.uid), "token": make_consent_token(friend)}
+    resp = auth_user_client.post(
+        "/api/group/", {"members": [consent], "limit": 2}, format="json"
+    )
+
+    assert resp.status_code == 200
+    assert [(movie["slug"], movie["overlap"]) for movie in resp.data["results"]] == [
+        ("airplane", 2),
+        ("trading-places", 0),
+    ]
+    assert resp.data["results"][0]["on_list"] is True
+    assert client.post("/api/group/", {"members": []}, format="json").status_code == 401
+
+
+@pytest.mark.django_db
+def test_group_endpoint_rejects_bad_members(auth_user_client, catalogue, make_user):
+    friend = make_user("friend@user.com")
+    stranger = make_user("stranger@user.com")
+
+    forged = {"uid": str(stranger.uid), "token": make_consent_token(friend)}
+    resp = auth_user_client.post("/api/group/", {"members": [forged]}, format="json")
+    assert resp.status_code == 400
+
+    too_many = [{"uid": str(friend.uid), "token": make_consent_token(friend)}] * 10
+    resp = auth_user_client.post("/api/group/", {"members": too_many}, format="json")
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_group_consent_endpoint(auth_user_client):
+    user = CustomUser.objects.get(email="fixture@user.com")
+
+    resp = auth_user_client.get("/api/group/consent/")
+
+    assert resp.status_code == 200
+    assert check_consent_token(user.uid, resp.data["token"])
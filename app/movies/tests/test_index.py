@@ -0,0 +1,158 @@
+import datetime
+
+import pytest
+from django.core.cache import cache
+from django.http import QueryDict
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from movies.catalogue import bump_catalogue_version
+from movies.filters import MovieFilterParams
+from movies.index import MovieFilterIndex, get_movie_filter_index
+from movies.models import Genre, Movie
+from movies.views import MovieList
+
+from .factories import MovieFactory, MovieWithGenreFactory
+
+QUERIES = [
+    "",
+    "g={comedy}",
+    "g={comedy},{horror}",
+    "g={comedy},{horror}&gmatch=all",
+    "g={comedy},{thriller}&gmatch=all",
+    "g={comedy},999&gmatch=all",
+    "dmin=1990&dmax=1990",
+    "dmin=pre&dmax=pre",
+    "dmin=pre&dmax=1960",
+    "dmin=1980&dmax=2000",
+    "rmin=90&rmax=90",
+    "rmin=90&rmax=120",
+    "rmin=<75&rmax=120",
+    "rmin=<75&rmax=<75",
+    "rmin=150&rmax=>150",
+    "rmin=>150&rmax=>150",
+    "g={comedy},{horror}&dmin=1980&dmax=1990&rmin=90&rmax=150",
+]
+
+
+@pytest.fixture
+def catalogue():
+    released = [
+        datetime.date(1940, 1, 1),
+        datetime.date(1959, 12, 31),
+        datetime.date(1961, 6, 1),
+        datetime.date(1985, 1, 1),
+        datetime.date(1990, 1, 1),
+        datetime.date(1999, 12, 31),
+        datetime.date(2021, 1, 31),
+    ]
+    runtimes = [25, 74, 75, 87, 90, 93, 94, 120, 150, 151, 200, None]
+    genres = [["comedy"], ["horror"], ["thriller"], ["comedy", "horror"]]
+    for i in range(60):
+        MovieWithGenreFactory(
+            genre=genres[i % len(genres)],
+            released=released[i % len(released)],
+            runtime=runtimes[i % len(runtimes)],
+            review=[30 + (i * 7) % 70],
+        )
+    MovieFactory(poster_url="N/A", review=[90])
+    return {
+        "comedy": Genre.objects.get(name="comedy").id,
+        "horror": Genre.objects.get(name="horror").id,
+        "thriller": Genre.objects.get(name="thriller").id,
+    }
+
+
+def orm_movie_ids(query):
+    view = MovieList()
+    view.request = Request(APIRequestFactory().get(f"/api/movies/?{query}"))
+    view.filter_params = MovieFilterParams.from_query(view.request.query_params)
+    return list(view.get_queryset().values_list("pk", flat=True))
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", QUERIES)
+def test_index_matches_orm(catalogue, query):
+    query = query.format(**catalogue)
+    index = MovieFilterIndex.from_queryset(Movie.objects.eligible())
+
+    result = index.search(MovieFilterParams.from_query(QueryDict(query)))
+
+    assert list(result[:]) == orm_movie_ids(query)
+
+
+@pytest.mark.django_db
+def test_index_excludes_ineligible_movies():
+    MovieFactory(title="Listed", review=[80])
+    MovieFactory(title="Low rated", review=[30])
+    MovieFactory(title="No poster", poster_url="N/A", review=[80])
+    index = MovieFilterIndex.from_queryset(Movie.objects.eligible())
+
+    result = index.search(MovieFilterParams())
+
+    titles = Movie.objects.filter(pk__in=result[:]).values_list("title", flat=True)
+    assert list(titles) == ["Listed"]
+
+
+@pytest.mark.django_db
+def test_index_disabled_by_default():
+    assert get_movie_filter_index() is None
+
+
+@pytest.mark.django_db
+def test_index_rebuilt_when_catalogue_version_changes(settings):
+    settings.MOVIE_FILTER_INDEX = 1
+    MovieFactory(review=[80])
+    assert len(get_movie_filter_index()) == 1
+
+    MovieFactory(review=[80])
+    assert len(get_movie_filter_index()) == 1
+
+    bump_catalogue_version()
+    assert len(get_movie_filter_index()) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("query", QUERIES)
+def test_movie_list_with_index_matches_orm(client, settings, catalogue, query):
+    query = query.format(**catalogue)
+    orm_resp = client.get(f"/api/movies/?{query}")
+
+    cache.clear()
+    settings.MOVIE_FILTER_INDEX = 1
+    index_resp = client.get(f"/api/movies/?{query}")
+
+    assert index_resp.status_code == 200
+    assert index_resp.data == orm_resp.data
+
+
+@pytest.mark.django_db
+def test_movie_list_with_index_query_budget(
+    client, settings, django_assert_num_queries
+):
+    settings.MOVIE_FILTER_INDEX = 1
+    for _ in range(40):
+        MovieWithGenreFactory(genre=["comedy"], review=[80])
+    get_movie_filter_index()
+
+    # page hydration, then one prefetch per nested relation
+    with django_assert_num_queries(6):
+        resp = client.get("/api/movies/?page=2")
+
+    assert resp.status_code == 200
+    assert resp.data["count"] == 40
+    assert len(resp.data["results"]) == 10
+
+
+@pytest.mark.django_db
+def test_movie_list_with_stale_index_skips_deleted_movies(client, settings):
+    settings.MOVIE_FILTER_INDEX = 1
+    kept, deleted = MovieFactory(review=[80]), MovieFactory(review=[70])
+    get_movie_filter_index()
+    settings.CATALOGUE_VERSION_CHECK_INTERVAL = 60
+    deleted.delete()
+
+    resp = client.get("/api/movies/")
+
+    assert resp.status_code == 200
+    assert [movie["slug"] for movie in resp.data["results"]] == [kept.slug]
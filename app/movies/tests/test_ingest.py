@@ -0,0 +1,151 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from movies.ingest import ingest_movies, split_names
+from movies.models import Actor, EligibleMovie, Genre, Movie, Review
+from movies.tasks import add_movie_to_db, add_movies_to_db
+from movies.utils import OMDBFetch
+
+
+@pytest.fixture
+def make_record(omdb_response):
+    """Build formatted OMDB records from the recorded response."""
+
+    def _make_record(imdbid, **fields):
+        response = {**omdb_response, "imdbID": imdbid, **fields}
+        return OMDBFetch(imdbid).format_response_data(response)
+
+    return _make_record
+
+
+def describe(movie):
+    return {
+        "title": movie.title,
+        "released": movie.released,
+        "runtime": movie.runtime,
+        "avg_rating": movie.avg_rating,
+        "actors": sorted(movie.actors.values_list("name", flat=True)),
+        "directors": sorted(movie.director.values_list("name", flat=True)),
+        "genres": sorted(movie.genre.values_list("name", flat=True)),
+        "reviews": sorted(movie.reviews.values_list("source", "score")),
+        "eligible": EligibleMovie.objects.filter(movie=movie).exists(),
+    }
+
+
+def test_split_names():
+    assert split_names("Don Cheadle, Benicio Del Toro,Don Cheadle") == [
+        "Don Cheadle",
+        "Benicio Del Toro",
+    ]
+
+
+@pytest.mark.django_db
+def test_ingest_matches_single_movie_path(mocker, make_record):
+    mocker.patch.object(OMDBFetch, "get_data", return_value=make_record("tt0000001"))
+    add_movie_to_db("tt0000001")
+
+    assert ingest_movies([make_record("tt0000002")]) == ["tt0000002"]
+
+    single, bulk = Movie.objects.order_by("pk")
+    assert describe(bulk) == describe(single)
+    assert bulk.slug and bulk.slug != single.slug
+    assert Actor.objects.count() == 3
+    assert Genre.objects.get(name="Drama").movie_count == 2
+
+
+def count_queries(func):
+    with CaptureQueriesContext(connection) as context:
+        func()
+    return len(context)
+
+
+@pytest.mark.django_db
+def test_ingest_queries_dont_grow_with_batch(make_record):
+    Actor.objects.create(name="Don Cheadle")
+
+    def records(start, count):
+        return [
+            make_record(
+                f"tt{i:07}",
+                Actors=f"Don Cheadle, Actor {i}",
+                Director=f"Director {start}",
+                Genre=f"Genre {start}, Genre {i}",
+            )
+            for i in range(start, start + count)
+        ]
+
+    small = count_queries(lambda: ingest_movies(records(0, 2)))
+    large = count_queries(lambda: ingest_movies(records(2, 50), batch_size=50))
+
+    assert large == small
+    assert Movie.objects.count() == 52
+    assert Actor.objects.count() == 53
+    assert Movie.objects.get(pk="tt0000007").actors.count() == 2
+
+
+@pytest.mark.django_db
+def test_ingest_skips_existing_and_repeated_movies(make_record):
+    ingest_movies([make_record("tt0000001")])
+
+    added = ingest_movies(
+        [make_record("tt0000001"), make_record("tt0000002"), make_record("tt0000002")]
+    )
+
+    assert added == ["tt0000002"]
+    assert Review.objects.filter(movie="tt0000002").count() == 3
+
+
+@pytest.mark.django_db
+def test_ingest_isolates_bad_records(make_record):
+    records = [
+        make_record("tt0000001"),
+        make_record("tt0000002", Title=None),
+        make_record("tt0000003"),
+    ]
+
+    assert ingest_movies(records) == ["tt0000001", "tt0000003"]
+    assert Genre.objects.get(name="Crime").movie_count == 2
+
+
+@pytest.mark.django_db
+def test_ingest_skips_malformed_records(make_record):
+    missing_title = make_record("tt0000002")
+    del missing_title["Title"]
+    bad_date = make_record("tt0000003")
+    bad_date["Released"] = "someday"
+    missing_poster = make_record("tt0000004")
+    del missing_poster["Poster"]
+    records = [
+        make_record("tt0000001"),
+        missing_title,
+        bad_date,
+        missing_poster,
+        {"Response": "False"},
+    ]
+
+    assert ingest_movies(records) == ["tt0000001", "tt0000004"]
+    assert Movie.objects.get(pk="tt0000004").poster_url == "N/A"
+
+
+@pytest.mark.django_db
+def test_add_movies_task_ingests_each_batch_as_fetched(mocker):
+    mocker.patch("movies.tasks.INGEST_BATCH_SIZE", 2)
+    bucket = mocker.patch("movies.tasks.get_token_bucket").return_value
+    fetch = mocker.patch(
+        "movies.tasks.fetch_omdb_records", side_effect=lambda ids, bucket: ids
+    )
+    ingest = mocker.patch(
+        "movies.tasks.ingest_movies", side_effect=[["tt0000001"], [], ["tt0000005"]]
+    )
+    bump = mocker.patch("movies.tasks.bump_catalogue_version")
+
+    add_movies_to_db([f"tt000000{i}" for i in range(1, 6)])
+
+    assert fetch.call_args_list == [
+        mocker.call(["tt0000001", "tt0000002"], bucket=bucket),
+        mocker.call(["tt0000003", "tt0000004"], bucket=bucket),
+        mocker.call(["tt0000005"], bucket=bucket),
+    ]
+    assert ingest.call_count == 3
+    assert bump.call_count == 2
@@ -1,6 +1,17 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from movies.models import Actor, Director, Genre, Movie, OnDemand, Review
+from movies.models import (
+    Actor,
+    Director,
+    EligibleMovie,
+    Genre,
+    Movie,
+    OnDemand,
+    Review,
+    runtime_bucket,
+)
 
 
 @pytest.mark.django_db
@@ -106,3 +117,241 @@ def test_review_model(add_movie):
     assert review.source == "imdb"
     assert review.score == 65
     assert str(review) == review.source + "--" + str(review.score)
+
+
+@pytest.mark.django_db
+def test_movie_rating_aggregates_updated_on_review_create():
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    assert movie.avg_rating is None
+    assert movie.review_count == 0
+
+    Review.objects.create(movie=movie, source="imdb", score=60)
+    Review.objects.create(movie=movie, source="metacritic", score=80)
+
+    movie.refresh_from_db()
+    assert movie.avg_rating == 70.0
+    assert movie.review_count == 2
+
+
+@pytest.mark.django_db
+def test_movie_rating_aggregates_updated_on_review_update_and_delete():
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    review = Review.objects.create(movie=movie, source="imdb", score=60)
+    other_review = Review.objects.create(movie=movie, source="metacritic", score=80)
+
+    review.score = 100
+    review.save()
+    movie.refresh_from_db()
+    assert movie.avg_rating == 90.0
+
+    other_review.delete()
+    movie.refresh_from_db()
+    assert movie.avg_rating == 100.0
+    assert movie.review_count == 1
+
+    review.delete()
+    movie.refresh_from_db()
+    assert movie.avg_rating is None
+    assert movie.review_count == 0
+
+
+@pytest.mark.django_db
+def test_movie_queryset_update_ratings_after_bulk_create():
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    Review.objects.bulk_create(
+        [
+            Review(movie=movie, source="imdb", score=50),
+            Review(movie=movie, source="metacritic", score=70),
+        ]
+    )
+    movie.refresh_from_db()
+    assert movie.avg_rating is None
+
+    Movie.objects.filter(pk=movie.pk).update_ratings()
+    movie.refresh_from_db()
+    assert movie.avg_rating == 60.0
+    assert movie.review_count == 2
+
+
+@pytest.mark.django_db
+def test_eligible_movie_follows_reviews():
+    movie = Movie.objects.create(
+        imdbid="test1234",
+        title="Tester",
+        released="1994-05-01",
+        runtime=142,
+        poster_url="img",
+    )
+    assert not EligibleMovie.objects.exists()
+
+    review = Review.objects.create(movie=movie, source="imdb", score=80)
+    eligible = EligibleMovie.objects.get(movie=movie)
+    assert eligible.slug == movie.slug
+    assert eligible.avg_rating == 80.0
+    assert eligible.review_count == 1
+    assert eligible.decade == 1990
+    assert eligible.runtime_bucket == 5
+
+    review.score = 20
+    review.save()
+    assert not EligibleMovie.objects.exists()
+
+    review.score = 60
+    review.save()
+    review.delete()
+    assert not EligibleMovie.objects.exists()
+
+
+@pytest.mark.django_db
+def test_eligible_movie_follows_movie_changes():
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    Review.objects.create(movie=movie, source="imdb", score=80)
+
+    movie.runtime = 95
+    movie.save()
+    assert EligibleMovie.objects.get(movie=movie).runtime_bucket == 2
+
+    movie.poster_url = "N/A"
+    movie.save()
+    assert not EligibleMovie.objects.exists()
+
+    movie.poster_url = "img"
+    movie.save()
+    movie.delete()
+    assert not EligibleMovie.objects.exists()
+
+
+@pytest.mark.django_db
+def test_eligible_movie_refresh_after_bulk_update():
+    movies = [
+        Movie.objects.create(
+            imdbid=f"test{i}",
+            title=f"Tester {i}",
+            released="2021-01-14",
+            poster_url="img",
+        )
+        for i in range(3)
+    ]
+    Review.objects.bulk_create(
+        Review(movie=movie, source="imdb", score=score)
+        for movie, score in zip(movies, [80, 30, 60])
+    )
+    Movie.objects.update_ratings()
+    assert not EligibleMovie.objects.exists()
+
+    EligibleMovie.objects.refresh(batch_size=1)
+    assert set(EligibleMovie.objects.values_list("movie_id", flat=True)) == {
+        "test0",
+        "test2",
+    }
+
+    Movie.objects.filter(pk="test0").update(poster_url="N/A")
+    EligibleMovie.objects.refresh(Movie.objects.filter(pk="test0"))
+    assert list(EligibleMovie.objects.values_list("movie_id", flat=True)) == ["test2"]
+
+
+def genre_counts():
+    return dict(Genre.objects.values_list("name", "movie_count"))
+
+
+@pytest.mark.django_db
+def test_genre_movie_counts_follow_eligibility():
+    comedy = Genre.objects.create(name="comedy")
+    horror = Genre.objects.create(name="horror")
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    movie.genre.add(comedy, horror)
+    assert genre_counts() == {"comedy": 0, "horror": 0}
+
+    review = Review.objects.create(movie=movie, source="imdb", score=80)
+    assert genre_counts() == {"comedy": 1, "horror": 1}
+
+    review.score = 20
+    review.save()
+    assert genre_counts() == {"comedy": 0, "horror": 0}
+
+    review.score = 80
+    review.save()
+    movie.genre.remove(horror)
+    assert genre_counts() == {"comedy": 1, "horror": 0}
+
+    horror.movie.add(movie)
+    movie.genre.clear()
+    assert genre_counts() == {"comedy": 0, "horror": 0}
+
+    movie.genre.add(comedy)
+    movie.delete()
+    assert genre_counts() == {"comedy": 0, "horror": 0}
+
+
+@pytest.mark.django_db
+def test_genre_movie_counts_change_by_one():
+    comedy = Genre.objects.create(name="comedy")
+    movie = Movie.objects.create(
+        imdbid="test1234", title="Tester", released="2021-01-14", poster_url="img"
+    )
+    movie.genre.add(comedy)
+    Genre.objects.update(movie_count=100)
+
+    review = Review.objects.create(movie=movie, source="imdb", score=80)
+    assert genre_counts() == {"comedy": 101}
+
+    review.score = 90
+    with CaptureQueriesContext(connection) as context:
+        review.save()
+    assert not any('"movies_genre"' in query["sql"] for query in context)
+    assert genre_counts() == {"comedy": 101}
+
+    review.delete()
+    assert genre_counts() == {"comedy": 100}
+
+
+@pytest.mark.django_db
+def test_genre_movie_counts_after_bulk_refresh():
+    comedy = Genre.objects.create(name="comedy")
+    movies = [
+        Movie.objects.create(
+            imdbid=f"test{i}",
+            title=f"Tester {i}",
+            released="2021-01-14",
+            poster_url="img",
+        )
+        for i in range(3)
+    ]
+    comedy.movie.add(*movies)
+    Review.objects.bulk_create(
+        Review(movie=movie, source="imdb", score=score)
+        for movie, score in zip(movies, [80, 30, 60])
+    )
+    Movie.objects.update_ratings()
+    assert genre_counts() == {"comedy": 0}
+
+    EligibleMovie.objects.refresh()
+    assert genre_counts() == {"comedy": 2}
+
+
+@pytest.mark.parametrize(
+    "runtime, bucket",
+    [
+        (None, None),
+        (60, 0),
+        (74, 0),
+        (75, 1),
+        (104, 2),
+        (105, 3),
+        (150, 5),
+        (151, 6),
+        (240, 6),
+    ],
+)
+def test_runtime_bucket(runtime, bucket):
+    assert runtime_bucket(runtime) == bucket
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from django.conf import settings
+
+from movies.omdb import (
+    LocalTokenBucket,
+    RedisTokenBucket,
+    backoff_delay,
+    fetch_omdb_records,
+)
+
+
+class StubOMDBServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the OMDB API. Responds to ?i=<imdbid> with the
+    recorded response for that id, after any statuses scripted for it.
+    """
+
+    def __init__(self, omdb_response, delay=0.02):
+        super().__init__(("127.0.0.1", 0), StubOMDBHandler)
+        self.omdb_response = omdb_response
+        self.delay = delay
+        self.scripted = {}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address
+        return f"http://{host}:{port}/?i={{imdbid}}&apikey={{API_KEY}}"
+
+
+class StubOMDBHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        imdbid = parse_qs(urlparse(self.path).query)["i"][0]
+        with server.lock:
+            server.requests.append((imdbid, time.monotonic()))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            scripted = server.scripted.get(imdbid) or [200]
+            status = scripted.pop(0) if len(scripted) > 1 else scripted[0]
+        time.sleep(server.delay)
+
+        if isinstance(status, tuple):
+            status, headers = status
+        else:
+            headers = {}
+        if status == 200 and imdbid.startswith("tt"):
+            body = {**server.omdb_response, "imdbID": imdbid}
+        else:
+            body = {"Response": "False", "Error": "Incorrect IMDb ID."}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode())
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def omdb_server(omdb_response, monkeypatch, settings):
+    settings.OMDB_BACKOFF_BASE = 0.01
+    settings.OMDB_BACKOFF_MAX = 0.2
+    server = StubOMDBServer(omdb_response)
+    monkeypatch.setattr("movies.utils.OMDBID_URL", server.url)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class SpyBucket(LocalTokenBucket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.penalties = []
+
+    def penalize(self, seconds):
+        self.penalties.append(seconds)
+        super().penalize(seconds)
+
+
+def test_local_token_bucket_reserves_in_turn():
+    now = [0.0]
+    bucket = LocalTokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+
+    now[0] = 3.0
+    bucket.penalize(1.5)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+
+def test_backoff_delay_prefers_retry_after(settings):
+    settings.OMDB_BACKOFF_BASE = 1
+    settings.OMDB_BACKOFF_MAX = 60
+
+    class Response:
+        headers = {"Retry-After": "7"}
+
+    assert backoff_delay(0, Response()) == 7
+    assert all(0 <= backoff_delay(3) <= 8 for _ in range(100))
+    assert backoff_delay(20) <= 60
+
+
+def test_fetch_keeps_requests_in_flight(omdb_server):
+    imdbids = [f"tt{i:07}" for i in range(12)]
+    bucket = LocalTokenBucket(rate=1000, capacity=100)
+
+    records = fetch_omdb_records(imdbids, max_in_flight=4, bucket=bucket)
+
+    assert [record["imdbID"] for record in records] == imdbids
+    assert records[0]["Runtime"] == 999
+    assert omdb_server.max_in_flight == 4
+
+
+def test_fetch_respects_token_bucket(omdb_server):
+    omdb_server.delay = 0
+    bucket = LocalTokenBucket(rate=20, capacity=1)
+
+    fetch_omdb_records([f"tt{i:07}" for i in range(6)], max_in_flight=6, bucket=bucket)
+
+    times = sorted(sent for _, sent in omdb_server.requests)
+    assert times[-1] - times[0] >= 0.2
+
+
+def test_fetch_retries_server_errors_and_drops_missing(omdb_server):
+    omdb_server.scripted = {"tt0000001": [503, 500, 200], "tt0000002": [404]}
+    bucket = LocalTokenBucket(rate=1000, capacity=100)
+
+    records = fetch_omdb_records(["tt0000001", "tt0000002", "nm0000003"], bucket=bucket)
+
+    assert [record["imdbID"] for record in records] == ["tt0000001"]
+    assert [imdbid for imdbid, _ in omdb_server.requests].count("tt0000001") == 3
+
+
+def test_fetch_backs_off_whole_pool_on_429(omdb_server):
+    omdb_server.scripted = {"tt0000001": [(429, {"Retry-After": "5"}), 200]}
+    bucket = SpyBucket(rate=1000, capacity=100)
+
+    records = fetch_omdb_records(["tt0000001", "tt0000002"], bucket=bucket)
+
+    assert len(records) == 2
+    assert bucket.penalties == [settings.OMDB_BACKOFF_MAX]
+
+
+def test_fetch_gives_up_after_max_retries(omdb_server, settings):
+    settings.OMDB_MAX_RETRIES = 2
+    omdb_server.scripted = {"tt0000001": [502]}
+
+    records = fetch_omdb_records(
+        ["tt0000001"], bucket=LocalTokenBucket(rate=1000, capacity=100)
+    )
+
+    assert records == []
+    assert len(omdb_server.requests) == 3
+
+
+@pytest.mark.skipif(
+    not settings.REDIS_CACHE_URL, reason="needs a Redis server at REDIS_CACHE_URL"
+)
+def test_redis_token_bucket_is_shared():
+    import redis
+
+    client = redis.Redis.from_url(settings.REDIS_CACHE_URL)
+    key = "test:omdb:token-bucket"
+    client.delete(key)
+    first = RedisTokenBucket(client, rate=1, capacity=2, key=key)
+    second = RedisTokenBucket(client, rate=1, capacity=2, key=key)
+
+    assert first.reserve() == 0
+    assert second.reserve() == 0
+    assert first.reserve() == pytest.approx(1, abs=0.1)
+    assert second.reserve() == pytest.approx(2, abs=0.1)
+    client.delete(key)
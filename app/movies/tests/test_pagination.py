@@ -0,0 +1,153 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from movies.pagination import MovieCursorPagination
+
+from .factories import MovieFactory, MovieWithGenreFactory
+
+
+def get_titles(resp):
+    return [movie["title"] for movie in resp.data["results"]]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_is_opt_in(client):
+    MovieFactory(title="Tester", review=[80])
+
+    resp = client.get("/api/movies/")
+    assert resp.status_code == 200
+    assert "count" in resp.data
+
+    resp = client.get("/api/movies/?pagination=cursor")
+    assert resp.status_code == 200
+    assert "count" not in resp.data
+    assert resp.data["next"] is None
+    assert resp.data["previous"] is None
+    assert get_titles(resp) == ["Tester"]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_orders_ties_by_slug(client):
+    MovieFactory(title="Tie B", slug="b-tie", review=[70])
+    MovieFactory(title="Best", slug="z-best", review=[90])
+    MovieFactory(title="Tie A", slug="a-tie", review=[70])
+    MovieFactory(title="Tie C", slug="c-tie", review=[70])
+
+    resp = client.get("/api/movies/?pagination=cursor")
+
+    assert get_titles(resp) == ["Best", "Tie A", "Tie B", "Tie C"]
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_next_and_previous(client, monkeypatch):
+    monkeypatch.setattr(MovieCursorPagination, "page_size", 2)
+    MovieFactory(title="Tie B", slug="b-tie", review=[70])
+    MovieFactory(title="Best", slug="z-best", review=[90])
+    MovieFactory(title="Tie A", slug="a-tie", review=[70])
+    MovieFactory(title="Tie C", slug="c-tie", review=[70])
+    MovieFactory(title="Worst", slug="a-worst", review=[50])
+
+    first = client.get("/api/movies/?pagination=cursor")
+    assert get_titles(first) == ["Best", "Tie A"]
+    assert first.data["previous"] is None
+
+    second = client.get(first.data["next"])
+    assert get_titles(second) == ["Tie B", "Tie C"]
+
+    third = client.get(second.data["next"])
+    assert get_titles(third) == ["Worst"]
+    assert third.data["next"] is None
+
+    back = client.get(third.data["previous"])
+    assert get_titles(back) == ["Tie B", "Tie C"]
+
+    back = client.get(back.data["previous"])
+    assert get_titles(back) == ["Best", "Tie A"]
+    assert back.data["previous"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_keeps_filters(client, monkeypatch):
+    monkeypatch.setattr(MovieCursorPagination, "page_size", 1)
+    movie = MovieWithGenreFactory(title="Funny 1", genre=["comedy"], review=[90])
+    MovieWithGenreFactory(title="Funny 2", genre=["comedy"], review=[80])
+    MovieWithGenreFactory(title="Scary", genre=["horror"], review=[85])
+    comedy_id = movie.genre.get(name="comedy").id
+
+    first = client.get(f"/api/movies/?pagination=cursor&g={comedy_id}")
+    assert get_titles(first) == ["Funny 1"]
+    assert f"g={comedy_id}" in first.data["next"]
+
+    second = client.get(first.data["next"])
+    assert get_titles(second) == ["Funny 2"]
+    assert second.data["next"] is None
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_skips_count_query(client, django_assert_num_queries):
+    MovieFactory(title="Tester", review=[80])
+
+    # page of ids, movies, then one prefetch per nested relation
+    with django_assert_num_queries(7):
+        resp = client.get("/api/movies/?pagination=cursor")
+
+    assert resp.status_code == 200
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_invalid_cursor(client):
+    resp = client.get("/api/movies/?cursor=notacursor")
+    assert resp.status_code == 404
+
+
+def count_queries(context):
+    return [query for query in context.captured_queries if "COUNT(" in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_page_number_count_cached_per_filter_key(client):
+    for i in range(31):
+        MovieWithGenreFactory(title=f"Movie {i}", genre=["comedy"], review=[80])
+
+    resp = client.get("/api/movies/")
+    assert resp.data["count"] == 31
+    assert resp.data["count_exact"] is True
+
+    with CaptureQueriesContext(connection) as context:
+        resp = client.get("/api/movies/?page=2")
+    assert not count_queries(context)
+    assert resp.data["count"] == 31
+    assert len(resp.data["results"]) == 1
+
+    with CaptureQueriesContext(connection) as context:
+        client.get("/api/movies/?g=999")
+    assert count_queries(context)
+
+
+@pytest.mark.django_db
+def test_page_number_estimated_count(client, settings, monkeypatch):
+    settings.CATALOGUE_ESTIMATED_COUNTS = 1
+    monkeypatch.setattr("movies.pagination.estimated_count", lambda queryset: 1000)
+    movie = MovieWithGenreFactory(title="Tester", genre=["comedy"], review=[80])
+    genre_id = movie.genre.get().id
+
+    resp = client.get("/api/movies/")
+    assert resp.data["count"] == 1000
+    assert resp.data["count_exact"] is False
+
+    resp = client.get(f"/api/movies/?g={genre_id}")
+    assert resp.data["count"] == 1
+    assert resp.data["count_exact"] is True
+
+
+@pytest.mark.django_db
+def test_page_number_estimated_count_falls_back_to_exact(client, settings):
+    settings.CATALOGUE_ESTIMATED_COUNTS = 1
+    MovieFactory(title="Tester", review=[80])
+
+    resp = client.get("/api/movies/")
+
+    # SQLite has no planner estimate
+    assert resp.data["count"] == 1
+    assert resp.data["count_exact"] is True
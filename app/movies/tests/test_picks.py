@@ -0,0 +1,194 @@
+import datetime
+import random
+
+import pytest
+from django.test import override_settings
+
+from accounts.models import CustomUser
+from movies.filters import MovieFilterParams
+from movies.models import Movie
+from movies.picks import (
+    AliasTable,
+    FilterKeyCache,
+    movie_id_arrays,
+    pick_movie_ids,
+    pick_weighted_movie_ids,
+    weighted_movie_tables,
+)
+
+from .factories import MovieFactory
+
+
+@pytest.fixture
+def catalogue(add_movies_by_year):
+    add_movies_by_year((1975, 1985, 1995))
+    MovieFactory(title="Unlisted", released=datetime.date(1985, 1, 1), review=[10])
+
+
+def titles(movie_ids):
+    return sorted(
+        Movie.objects.filter(pk__in=movie_ids).values_list("title", flat=True)
+    )
+
+
+def test_filter_key_cache_evicts_least_recently_used():
+    built = []
+    cache = FilterKeyCache(lambda params: built.append(params.key), max_size=2)
+    first, second, third = (
+        MovieFilterParams(year_min=year) for year in (1970, 1980, 1990)
+    )
+
+    cache.get(first)
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+    cache.get(first)
+    cache.get(second)
+
+    assert built == [first.key, second.key, third.key, second.key]
+    assert len(cache) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("filter_index", [0, 1])
+def test_pick_movie_ids_respects_filters(catalogue, filter_index):
+    with override_settings(MOVIE_FILTER_INDEX=filter_index):
+        params = MovieFilterParams.from_query({"dmin": "1980", "dmax": "1980"})
+
+        assert titles(pick_movie_ids(params, count=5)) == ["Made in 1985"]
+        assert titles(pick_movie_ids(MovieFilterParams(), count=5)) == [
+            "Made in 1975",
+            "Made in 1985",
+            "Made in 1995",
+        ]
+
+
+@pytest.mark.django_db
+def test_pick_movie_ids_are_distinct(catalogue):
+    for _ in range(10):
+        movie_ids = pick_movie_ids(MovieFilterParams(), count=2)
+        assert len(set(movie_ids)) == 2
+
+
+@pytest.mark.django_db
+def test_pick_movie_ids_reuses_id_array(catalogue, django_assert_num_queries):
+    pick_movie_ids(MovieFilterParams())
+
+    with django_assert_num_queries(0):
+        pick_movie_ids(MovieFilterParams())
+    assert len(movie_id_arrays.get()) == 1
+
+
+@pytest.mark.django_db
+def test_random_endpoint_filters_and_count(client, catalogue):
+    resp = client.get("/api/movies/random/?dmin=1990&dmax=1990")
+    assert resp.status_code == 200
+    assert resp.data["title"] == "Made in 1995"
+
+    resp = client.get("/api/movies/random/?count=5&fields=title")
+    assert resp.status_code == 200
+    assert sorted(movie["title"] for movie in resp.data["results"]) == [
+        "Made in 1975",
+        "Made in 1985",
+        "Made in 1995",
+    ]
+
+
+@pytest.mark.django_db
+def test_random_endpoint_no_match(client, catalogue):
+    resp = client.get("/api/movies/random/?dmin=2010&dmax=2010")
+    assert resp.status_code == 404
+
+    resp = client.get("/api/movies/random/?dmin=2010&dmax=2010&count=3")
+    assert resp.status_code == 200
+    assert resp.data["results"] == []
+
+
+def test_alias_table_distribution():
+    weights = [1, 2, 3, 4, 0, 10]
+    table = AliasTable(weights)
+    rng = random.Random(1)
+    draws = 200_000
+
+    counts = [0] * len(weights)
+    for _ in range(draws):
+        counts[table.draw(rng)] += 1
+
+    assert counts[4] == 0
+    expected = [draws * weight / sum(weights) for weight in weights]
+    chi_square = sum(
+        (count - mean) ** 2 / mean for count, mean in zip(counts, expected) if mean
+    )
+    # Critical value for 4 degrees of freedom at p = 0.001.
+    assert chi_square < 18.47
+
+
+def test_alias_table_needs_positive_weight():
+    with pytest.raises(ValueError):
+        AliasTable([])
+    with pytest.raises(ValueError):
+        AliasTable([0, 0])
+
+
+def only_1995(avg_rating, review_count):
+    return 1 if avg_rating == 95 else 0
+
+
+@pytest.mark.django_db
+def test_pick_weighted_movie_ids(catalogue):
+    MovieFactory(title="Made in 2005", released=datetime.date(2005, 1, 1), review=[95])
+
+    with override_settings(RANDOM_PICK_WEIGHT="movies.tests.test_picks.only_1995"):
+        assert titles(pick_weighted_movie_ids(MovieFilterParams(), count=3)) == [
+            "Made in 2005"
+        ]
+        params = MovieFilterParams.from_query({"dmax": "1990"})
+        assert pick_weighted_movie_ids(params) == []
+
+    weighted_movie_tables.clear()
+    movie_ids = pick_weighted_movie_ids(MovieFilterParams(), count=4)
+    assert len(set(movie_ids)) == 4
+
+
+@pytest.mark.django_db
+def test_random_endpoint_weighted(client, catalogue):
+    resp = client.get("/api/movies/random/?mode=weighted&dmin=1970&dmax=1970")
+
+    assert resp.status_code == 200
+    assert resp.data["title"] == "Made in 1975"
+
+
+@pytest.mark.django_db
+def test_random_endpoint_with_stale_ids_skips_deleted_movies(
+    client, settings, catalogue
+):
+    client.get("/api/movies/random/?dmin=1990&dmax=1990")
+    settings.CATALOGUE_VERSION_CHECK_INTERVAL = 60
+    Movie.objects.get(title="Made in 1995").delete()
+
+    resp = client.get("/api/movies/random/?dmin=1990&dmax=1990")
+    assert resp.status_code == 404
+
+    resp = client.get("/api/movies/random/?dmin=1990&dmax=1990&count=3")
+    assert resp.status_code == 200
+    assert resp.data["results"] == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query", ["count=0", "count=21", "count=x", "dmin=abc", "mode=best"]
+)
+def test_random_endpoint_invalid_params(client, query):
+    resp = client.get(f"/api/movies/random/?{query}")
+
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_random_endpoint_marks_on_list(auth_user_client, catalogue, add_item):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    add_item(user, Movie.objects.get(title="Made in 1975").slug)
+
+    resp = auth_user_client.get("/api/movies/random/?dmax=1970")
+
+    assert resp.data["on_list"] is True
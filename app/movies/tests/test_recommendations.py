@@ -0,0 +1,152 @@
+import pytest
+from django.core.cache import cache
+
+from accounts.models import CustomUser
+from lists.models import Item
+from movies.models import Movie
+from movies.recommendations import (
+    Taste,
+    get_recommendations,
+    movie_features,
+    recommendations_cache_key,
+    refresh_recommendations,
+)
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user("taste@user.com")
+
+
+def slugs(movie_ids):
+    return [Movie.objects.get(pk=movie_id).slug for movie_id in movie_ids]
+
+
+@pytest.mark.django_db
+def test_taste_updates_match_rebuild(catalogue):
+    features = movie_features.get()
+    halloween = Movie.objects.get(slug="halloween").pk
+    airplane = Movie.objects.get(slug="airplane").pk
+
+    taste = Taste()
+    taste.set_weight(features, halloween, 0.5)
+    taste.set_weight(features, airplane, 1.0)
+    taste.set_weight(features, halloween, 1.0)
+    taste.set_weight(features, airplane, None)
+
+    rebuilt = Taste.from_weights(features, {halloween: 1.0})
+    assert taste.weights == rebuilt.weights
+    assert taste.vector.keys() == rebuilt.vector.keys()
+    for column, value in rebuilt.vector.items():
+        assert taste.vector[column] == pytest.approx(value)
+
+
+@pytest.mark.django_db
+def test_recommendations_follow_taste(catalogue, user, add_item):
+    add_item(user, "halloween", watched=True)
+
+    assert slugs(get_recommendations(user, limit=3)) == [
+        "the-thing",
+        "the-fog",
+        "scream",
+    ]
+
+
+@pytest.mark.django_db
+def test_recommendations_without_items_follow_rating(catalogue, user):
+    assert slugs(get_recommendations(user, limit=2)) == ["halloween", "airplane"]
+
+
+@pytest.mark.django_db
+def test_recommendations_update_incrementally(
+    catalogue, user, django_assert_num_queries, add_item
+):
+    add_item(user, "halloween")
+    get_recommendations(user)
+
+    add_item(user, "airplane", watched=True)
+    add_item(user, "trading-places", watched=True)
+    entry = cache.get(recommendations_cache_key(user.pk))
+    assert entry["movie_ids"] is None
+    assert len(entry["weights"]) == 3
+
+    with django_assert_num_queries(0):
+        recommended = get_recommendations(user, limit=2)
+    assert slugs(recommended) == ["the-thing", "the-fog"]
+
+    Item.objects.filter(movie__slug__in=["airplane", "trading-places"]).delete()
+    assert slugs(get_recommendations(user, limit=1)) == ["the-thing"]
+
+
+@pytest.mark.django_db
+def test_item_on_two_lists_keeps_weight_until_last_removed(catalogue, user, add_item):
+    add_item(user, "airplane", watched=True)
+    other = add_item(user, "airplane", name="favourites")
+    get_recommendations(user)
+
+    other.delete()
+    entry = cache.get(recommendations_cache_key(user.pk))
+    assert list(entry["weights"].values()) == [1.0]
+
+
+@pytest.mark.django_db
+def test_update_drops_entry_instead_of_building_features(
+    catalogue, user, mocker, add_item
+):
+    add_item(user, "halloween")
+    get_recommendations(user)
+    movie_features.clear()
+    build = mocker.spy(movie_features, "build")
+
+    add_item(user, "airplane", watched=True)
+
+    build.assert_not_called()
+    assert cache.get(recommendations_cache_key(user.pk)) is None
+    assert slugs(get_recommendations(user, limit=1)) == ["trading-places"]
+
+
+@pytest.mark.django_db
+def test_update_drops_entry_when_lock_is_held(catalogue, user, monkeypatch, add_item):
+    monkeypatch.setattr("movies.recommendations.RECOMMENDATIONS_LOCK_WAIT", 0)
+    add_item(user, "halloween")
+    get_recommendations(user)
+    key = recommendations_cache_key(user.pk)
+    cache.add(f"{key}:lock", "other", 60)
+
+    add_item(user, "airplane", watched=True)
+
+    assert cache.get(key) is None
+    assert cache.get(f"{key}:lock") == "other"
+    assert slugs(get_recommendations(user, limit=1)) == ["trading-places"]
+
+
+@pytest.mark.django_db
+def test_refresh_recommendations_matches_single_user(
+    catalogue, user, monkeypatch, make_user, add_item
+):
+    other = make_user("other@user.com")
+    add_item(user, "halloween", watched=True)
+    add_item(user, "scream")
+    add_item(other, "airplane")
+
+    expected = {u.pk: get_recommendations(u) for u in (user, other)}
+    cache.clear()
+
+    monkeypatch.setattr("movies.recommendations.RANK_CHUNK_SIZE", 1)
+    assert refresh_recommendations(chunk_size=2) == 2
+    for user_id, movie_ids in expected.items():
+        assert cache.get(recommendations_cache_key(user_id))["movie_ids"] == movie_ids
+
+
+@pytest.mark.django_db
+def test_recommendations_endpoint(auth_user_client, client, catalogue, add_item):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    add_item(user, "airplane", watched=True)
+
+    resp = auth_user_client.get("/api/recommendations/?limit=1")
+    assert resp.status_code == 200
+    assert [movie["slug"] for movie in resp.data["results"]] == ["trading-places"]
+    assert resp.data["results"][0]["on_list"] is False
+
+    assert auth_user_client.get("/api/recommendations/?limit=51").status_code == 400
+    assert client.get("/api/recommendations/").status_code == 401
@@ -0,0 +1,155 @@
+import pytest
+
+from accounts.models import CustomUser
+from lists.models import Item, List
+from movies.catalogue import bump_catalogue_version
+from movies.models import Actor, Director, Movie
+from movies.search import (
+    MovieSearchIndex,
+    build_movie_search_index,
+    normalize_query,
+    tokenize,
+)
+
+from .factories import MovieFactory
+
+DEFAULT_LIST = "watch-list"
+
+
+@pytest.fixture
+def catalogue():
+    MovieFactory(
+        title="Space Station", plot="Astronauts repair a station.", review=[90]
+    )
+    MovieFactory(
+        title="Deep Sea", plot="A space probe lands in the ocean.", review=[95]
+    )
+    heist = MovieFactory(title="The Heist", plot="A crew plans a robbery.", review=[70])
+    heist.actors.add(Actor.objects.create(name="Clem Fandango"))
+    heist.director.add(Director.objects.create(name="Len Z"))
+    MovieFactory(title="Space Flop", plot="Nobody liked it.", review=[20])
+
+
+def titles(movie_ids):
+    movies = Movie.objects.in_bulk(movie_ids)
+    return [movies[movie_id].title for movie_id in movie_ids]
+
+
+def test_tokenize_and_normalize():
+    assert tokenize("The  Space-Station, 2001!") == ["the", "space", "station", "2001"]
+    assert tokenize(None) == []
+    assert normalize_query("  Space   STATION ") == "space station"
+
+
+@pytest.mark.django_db
+def test_index_ranks_title_matches_above_plot_matches(catalogue):
+    index = build_movie_search_index()
+
+    assert len(index) == 3
+    assert titles(index.search("space", limit=10)) == ["Space Station", "Deep Sea"]
+
+
+@pytest.mark.django_db
+def test_index_requires_every_term(catalogue):
+    index = build_movie_search_index()
+
+    assert titles(index.search("space station", limit=10)) == ["Space Station"]
+    assert index.search("space heist", limit=10) == []
+    assert index.search("!!", limit=10) == []
+
+
+@pytest.mark.django_db
+def test_index_matches_people(catalogue):
+    index = build_movie_search_index()
+
+    assert titles(index.search("fandango", limit=10)) == ["The Heist"]
+    assert titles(index.search("len heist", limit=10)) == ["The Heist"]
+
+
+def test_index_limit_breaks_ties_by_position():
+    index = MovieSearchIndex(["a", "b", "c"], {"word": {0: 0.2, 1: 1.0, 2: 1.0}})
+
+    assert index.search("word", limit=2) == ["b", "c"]
+
+
+@pytest.mark.django_db
+def test_update_search_vectors_is_postgres_only():
+    movie = MovieFactory()
+
+    assert Movie.objects.filter(pk=movie.pk).update_search_vectors() == 0
+
+
+@pytest.mark.django_db
+def test_search_endpoint(client, catalogue):
+    resp = client.get("/api/movies/search/?q=Space")
+
+    assert resp.status_code == 200
+    assert [movie["title"] for movie in resp.data["results"]] == [
+        "Space Station",
+        "Deep Sea",
+    ]
+    assert set(resp.data["results"][0]) == {
+        "slug",
+        "title",
+        "released",
+        "runtime",
+        "poster_url",
+        "avg_rating",
+        "on_list",
+    }
+
+
+@pytest.mark.django_db
+def test_search_endpoint_limit_and_cache(client, catalogue, django_assert_num_queries):
+    resp = client.get("/api/movies/search/?q=space&limit=1")
+    assert [movie["title"] for movie in resp.data["results"]] == ["Space Station"]
+
+    with django_assert_num_queries(0):
+        resp = client.get("/api/movies/search/?limit=1&q=SPACE++")
+    assert resp.status_code == 200
+
+
+@pytest.mark.django_db
+def test_search_endpoint_with_stale_index_skips_deleted_movies(
+    client, settings, catalogue
+):
+    client.get("/api/movies/search/?q=space")
+    settings.CATALOGUE_VERSION_CHECK_INTERVAL = 60
+    Movie.objects.get(title="Space Station").delete()
+    bump_catalogue_version()
+
+    resp = client.get("/api/movies/search/?q=space")
+
+    assert resp.status_code == 200
+    assert [movie["title"] for movie in resp.data["results"]] == ["Deep Sea"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "query, field",
+    [
+        ("", "q"),
+        ("q=", "q"),
+        ("q=%21%21", "q"),
+        ("q=space&limit=0", "limit"),
+        ("q=space&limit=51", "limit"),
+    ],
+)
+def test_search_endpoint_invalid_params(client, query, field):
+    resp = client.get(f"/api/movies/search/?{query}")
+
+    assert resp.status_code == 400
+    assert field in resp.data
+
+
+@pytest.mark.django_db
+def test_search_endpoint_marks_on_list(auth_user_client, catalogue):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    movie = Movie.objects.get(title="Deep Sea")
+    Item.objects.create(
+        _list=List.objects.create(owner=user, name=DEFAULT_LIST), movie=movie
+    )
+
+    resp = auth_user_client.get("/api/movies/search/?q=space")
+
+    assert [movie["on_list"] for movie in resp.data["results"]] == [False, True]
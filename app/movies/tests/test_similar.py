@@ -0,0 +1,179 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from movies.catalogue import get_catalogue_version
+from movies.models import (
+    Actor,
+    Director,
+    EligibleMovie,
+    Genre,
+    Movie,
+    MovieNeighbours,
+)
+from movies.similar import MovieFeatures, refresh_movie_neighbours, top_k
+from movies.tasks import add_movies_to_db, update_movie_neighbours
+
+from .factories import MovieFactory
+
+
+@pytest.fixture
+def catalogue():
+    horror = Genre.objects.create(name="Horror")
+    comedy = Genre.objects.create(name="Comedy")
+    carpenter = Director.objects.create(name="John Carpenter")
+    curtis = Actor.objects.create(name="Jamie Lee Curtis")
+
+    def movie(title, genres, year, rating, director=None, actors=()):
+        movie = MovieFactory(
+            title=title,
+            slug=title.lower().replace(" ", "-"),
+            released=datetime.date(year, 1, 1),
+            runtime=95,
+            review=[rating],
+        )
+        movie.genre.set(genres)
+        if director:
+            movie.director.add(director)
+        for actor in actors:
+            movie.actors.add(actor)
+        return movie
+
+    movie("Halloween", [horror], 1978, 90, carpenter, [curtis])
+    movie("The Fog", [horror], 1980, 70, carpenter, [curtis])
+    movie("The Thing", [horror], 1982, 85, carpenter)
+    movie("Trading Places", [comedy], 1983, 75, None, [curtis])
+    movie("Airplane", [comedy], 1980, 80)
+    movie("Flop", [horror], 1980, 10, carpenter)
+
+
+def slugs(movie_ids):
+    return [Movie.objects.get(pk=movie_id).slug for movie_id in movie_ids]
+
+
+@pytest.mark.django_db
+def test_feature_rows_are_normalised(catalogue):
+    features = MovieFeatures.from_queryset(EligibleMovie.objects.all())
+
+    assert len(features) == 5
+    assert slugs(features.movie_ids)[0] == "halloween"
+    norms = np.sqrt(features.matrix.multiply(features.matrix).sum(axis=1)).A1
+    assert np.allclose(norms, 1)
+
+
+@pytest.mark.django_db
+def test_every_actor_has_a_column(catalogue):
+    halloween = Movie.objects.get(slug="halloween")
+    halloween.actors.add(Actor.objects.create(name="Donald Pleasence"))
+
+    features = MovieFeatures.from_queryset(EligibleMovie.objects.all())
+    position = features.movie_ids.index(halloween.pk)
+
+    # Decade, runtime bucket, genre, director and two actors.
+    assert features.matrix[position].nnz == 6
+
+
+@pytest.mark.django_db
+def test_nearest_neighbours(catalogue):
+    features = MovieFeatures.from_queryset(EligibleMovie.objects.all())
+    neighbours = dict(features.neighbour_ids(k=3))
+
+    halloween = Movie.objects.get(slug="halloween").pk
+    assert slugs(neighbours[halloween]) == ["the-fog", "the-thing", "trading-places"]
+    airplane = Movie.objects.get(slug="airplane").pk
+    assert slugs(neighbours[airplane])[0] == "trading-places"
+
+
+@pytest.mark.django_db
+def test_nearest_neighbours_in_chunks_match(catalogue):
+    features = MovieFeatures.from_queryset(EligibleMovie.objects.all())
+
+    whole = features.nearest_neighbours(k=4)
+    chunked = features.nearest_neighbours(k=4, chunk_size=2)
+
+    assert np.array_equal(whole[0], chunked[0])
+    assert np.allclose(whole[1], chunked[1])
+
+
+def test_top_k_keeps_column_order_for_ties():
+    scores = np.array(
+        [[0.5, 1.0, 0.5, 0.5, 1.0, 0.5], [0, 0, 0, 0, 0, 0]], dtype=np.float32
+    )
+
+    top, top_scores = top_k(scores, 3)
+
+    assert top.tolist() == [[1, 4, 0], [0, 1, 2]]
+    assert top_scores.tolist() == [[1.0, 1.0, 0.5], [0, 0, 0]]
+
+
+@pytest.mark.django_db
+def test_refresh_movie_neighbours_replaces_stale_rows(catalogue):
+    assert refresh_movie_neighbours(k=2) == 5
+    assert MovieNeighbours.objects.count() == 5
+
+    Movie.objects.get(slug="the-fog").reviews.update(score=10)
+    Movie.objects.filter(slug="the-fog").update_ratings()
+    EligibleMovie.objects.refresh()
+    refresh_movie_neighbours(k=2)
+
+    assert MovieNeighbours.objects.count() == 4
+    halloween = MovieNeighbours.objects.get(movie__slug="halloween")
+    assert slugs(halloween.neighbour_ids) == ["the-thing", "trading-places"]
+
+
+@pytest.mark.django_db
+def test_similar_endpoint(client, catalogue, django_assert_num_queries):
+    update_movie_neighbours()
+
+    resp = client.get("/api/movies/halloween/similar/?limit=2")
+    assert resp.status_code == 200
+    assert [movie["slug"] for movie in resp.data["results"]] == [
+        "the-fog",
+        "the-thing",
+    ]
+    assert "on_list" in resp.data["results"][0]
+
+    with django_assert_num_queries(0):
+        client.get("/api/movies/halloween/similar/?limit=2")
+
+
+@pytest.mark.django_db
+def test_similar_endpoint_without_neighbours(client, catalogue):
+    resp = client.get("/api/movies/flop/similar/")
+    assert resp.status_code == 200
+    assert resp.data["results"] == []
+
+    assert client.get("/api/movies/missing/similar/").status_code == 404
+    assert client.get("/api/movies/flop/similar/?limit=21").status_code == 400
+
+
+@pytest.mark.django_db
+def test_neighbour_rebuild_only_retires_similar_responses(client, catalogue):
+    client.get("/api/movies/halloween/similar/?limit=2")
+    catalogue_version = get_catalogue_version()
+
+    update_movie_neighbours()
+
+    assert get_catalogue_version() == catalogue_version
+    resp = client.get("/api/movies/halloween/similar/?limit=2")
+    assert [movie["slug"] for movie in resp.data["results"]] == [
+        "the-fog",
+        "the-thing",
+    ]
+
+
+@pytest.mark.django_db
+def test_import_queues_neighbour_rebuild(mocker, django_capture_on_commit_callbacks):
+    mocker.patch("movies.tasks.fetch_omdb_records", return_value=[])
+    ingest = mocker.patch("movies.tasks.ingest_movies", return_value=[])
+    delay = mocker.patch.object(update_movie_neighbours, "delay")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        add_movies_to_db(["tt0000001"])
+    delay.assert_not_called()
+
+    ingest.return_value = ["tt0000001"]
+    with django_capture_on_commit_callbacks(execute=True):
+        add_movies_to_db(["tt0000001"])
+    delay.assert_called_once_with()
@@ -3,10 +3,15 @@ import json
 from unittest import mock
 
 import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
 from accounts.models import CustomUser
 from lists.models import Item, List
-from movies.models import Actor, Director, OnDemand
+from movies.catalogue import bump_catalogue_version
+from movies.filters import MovieFilterParams
+from movies.genres import genre_list
+from movies.models import Actor, Director, Genre, OnDemand
 
 from .factories import MovieFactory, MovieWithGenreFactory
 
@@ -38,7 +43,7 @@ def test_get_random_movie(client, add_movie):
     movie_two = MovieFactory(
         title="Test 2: Revenge of the Test",
     )
-    with mock.patch("random.choice", return_value=movie_two.slug):
+    with mock.patch("random.sample", return_value=[movie_two.pk]):
         resp = client.get("/api/movies/random/")
         assert resp.status_code == 200
         assert "Revenge" in json.dumps(resp.data)
@@ -139,6 +144,52 @@ def test_get_queryset_filtered_by_2_genres(client):
     assert "Tense Tests" not in json.dumps(resp.data)
 
 
+@pytest.mark.django_db
+def test_get_queryset_filtered_by_genres_match_any_or_all(client):
+    movie = MovieWithGenreFactory.create(
+        title="Scary Comedy", genre=["comedy", "horror"]
+    )
+    MovieWithGenreFactory.create(title="Funny Tests", genre=["comedy"])
+    MovieWithGenreFactory.create(title="Scary Tests", genre=["horror"])
+    comedy_id = movie.genre.get(name="comedy").id
+    horror_id = movie.genre.get(name="horror").id
+
+    resp = client.get(f"/api/movies/?g={comedy_id},{horror_id}")
+    titles = [result["title"] for result in resp.data["results"]]
+    assert sorted(titles) == ["Funny Tests", "Scary Comedy", "Scary Tests"]
+    assert resp.data["count"] == 3
+
+    resp = client.get(f"/api/movies/?g={comedy_id},{horror_id}&gmatch=all")
+    titles = [result["title"] for result in resp.data["results"]]
+    assert titles == ["Scary Comedy"]
+    assert resp.data["count"] == 1
+
+
+@pytest.mark.django_db
+def test_genre_filter_plan_has_no_distinct_step():
+    from django.db import connection
+
+    from movies.views import MovieList
+
+    MovieWithGenreFactory.create(genre=["comedy", "horror"])
+    genre_ids = ",".join(str(pk) for pk in Genre.objects.values_list("pk", flat=True))
+    forbidden = {
+        "sqlite": ["DISTINCT", "TEMP B-TREE"],
+        "postgresql": ["Unique", "HashAggregate"],
+    }[connection.vendor]
+
+    for gmatch in ("any", "all"):
+        view = MovieList()
+        view.request = Request(
+            APIRequestFactory().get(f"/api/movies/?g={genre_ids}&gmatch={gmatch}")
+        )
+        view.filter_params = MovieFilterParams.from_query(view.request.query_params)
+        plan = view.get_queryset().explain()
+
+        for step in forbidden:
+            assert step not in plan, plan
+
+
 @pytest.mark.django_db
 def test_get_queryset_filtered_by_release_single_decade(client):
     MovieWithGenreFactory.create(
@@ -538,3 +589,191 @@ def test_get_single_movie_not_authed(client):
     assert resp.status_code == 200
     assert resp.data["title"] == other_movie.title
     assert resp.data["on_list"] is False
+
+
+def create_movies_with_relations(count):
+    actor = Actor.objects.create(name="Clem Fandango")
+    director = Director.objects.create(name="Len Z")
+    movies = []
+    for i in range(count):
+        movie = MovieWithGenreFactory(genre=["comedy", "horror"], review=[60, 80])
+        movie.actors.add(actor)
+        movie.director.add(director)
+        OnDemand.objects.create(movie=movie, service="Google Play", url=f"gp.com/{i}")
+        movies.append(movie)
+    return movies
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("movie_count", [1, 30])
+def test_get_all_movies_query_budget(client, django_assert_num_queries, movie_count):
+    """Nested relations are prefetched, so page size doesn't change query count."""
+    create_movies_with_relations(movie_count)
+
+    # count, page of ids, movies, then one prefetch per nested relation
+    with django_assert_num_queries(8):
+        resp = client.get("/api/movies/")
+
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == movie_count
+    assert resp.data["results"][0]["avg_rating"] == 70.0
+    assert len(resp.data["results"][0]["genre"]) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("movie_count", [1, 30])
+def test_get_all_movies_authed_query_budget(
+    auth_user_client, django_assert_num_queries, movie_count
+):
+    create_movies_with_relations(movie_count)
+
+    # user lookup, on-list slugs, count, page of ids, movies, then one prefetch
+    # per nested relation
+    with django_assert_num_queries(10):
+        resp = auth_user_client.get("/api/movies/")
+
+    assert resp.status_code == 200
+    assert len(resp.data["results"]) == movie_count
+
+
+@pytest.mark.django_db
+def test_get_movies_card_view(client, django_assert_num_queries):
+    create_movies_with_relations(30)
+    full = client.get("/api/movies/")
+
+    # page of ids, movies; the count is cached and no relations are rendered
+    with django_assert_num_queries(2):
+        resp = client.get("/api/movies/?view=card")
+
+    assert resp.status_code == 200
+    assert set(resp.data["results"][0]) == {
+        "slug",
+        "title",
+        "released",
+        "runtime",
+        "poster_url",
+        "avg_rating",
+        "on_list",
+    }
+    assert len(resp.content) * 3 < len(full.content)
+
+
+@pytest.mark.django_db
+def test_get_movies_invalid_view(client):
+    resp = client.get("/api/movies/?view=poster")
+    assert resp.status_code == 400
+    assert "view" in resp.data
+
+
+@pytest.mark.django_db
+def test_get_movies_sparse_fields(client, django_assert_num_queries):
+    create_movies_with_relations(2)
+
+    # count, page of ids, movies, then the genre prefetch only
+    with django_assert_num_queries(4):
+        resp = client.get("/api/movies/?fields=title,genre.name")
+
+    assert resp.status_code == 200
+    movie = resp.data["results"][0]
+    assert set(movie) == {"slug", "title", "genre"}
+    assert movie["genre"] == [{"name": "comedy"}, {"name": "horror"}]
+
+
+@pytest.mark.django_db
+def test_get_movies_sparse_fields_marks_on_list(auth_user_client):
+    user = CustomUser.objects.get(email="fixture@user.com")
+    movie = MovieFactory(review=[80])
+    Item.objects.create(
+        _list=List.objects.create(owner=user, name=DEFAULT_LIST), movie=movie
+    )
+
+    resp = auth_user_client.get("/api/movies/?view=card&fields=on_list")
+    assert resp.data["results"] == [{"slug": movie.slug, "on_list": True}]
+
+    resp = auth_user_client.get("/api/movies/?fields=title")
+    assert resp.data["results"] == [{"slug": movie.slug, "title": movie.title}]
+
+
+@pytest.mark.django_db
+def test_get_movies_unknown_fields_rejected_before_querying(
+    client, django_assert_num_queries
+):
+    with django_assert_num_queries(0):
+        resp = client.get("/api/movies/?fields=title,budget")
+
+    assert resp.status_code == 400
+    assert resp.data["fields"] == ["Unknown fields: budget."]
+
+
+@pytest.mark.django_db
+def test_get_single_movie_sparse_fields(client):
+    movie = MovieFactory(title="Tester", review=[80])
+
+    resp = client.get(f"/api/movies/{movie.slug}/?fields=title,avg_rating")
+
+    assert resp.data == {"slug": movie.slug, "title": "Tester", "avg_rating": 80.0}
+
+
+@pytest.mark.django_db
+def test_genres_count_listed_movies_only(client):
+    MovieWithGenreFactory(genre=["comedy"], review=[80])
+    MovieWithGenreFactory(genre=["comedy", "horror"], review=[80])
+    MovieWithGenreFactory(genre=["horror"], review=[30])
+    MovieWithGenreFactory(genre=["thriller"], poster_url="N/A", review=[80])
+
+    resp = client.get("/api/genres/")
+
+    assert [(genre["name"], genre["movie_count"]) for genre in resp.data] == [
+        ("comedy", 2),
+        ("horror", 1),
+        ("thriller", 0),
+    ]
+
+
+@pytest.mark.django_db
+def test_movie_genres_leave_out_movie_count(client):
+    movie = MovieWithGenreFactory(genre=["comedy"], review=[80])
+
+    resp = client.get("/api/movies/")
+    assert resp.data["results"][0]["genre"] == [
+        {"id": movie.genre.get().pk, "name": "comedy"}
+    ]
+
+
+@pytest.mark.django_db
+def test_genres_served_from_worker_copy(client, django_assert_num_queries):
+    MovieWithGenreFactory(genre=["comedy"], review=[80])
+    client.get("/api/genres/")
+
+    with django_assert_num_queries(0), mock.patch.object(genre_list, "build") as build:
+        resp = client.get("/api/genres/?fields=name")
+    assert resp.data == [{"name": "comedy"}]
+    build.assert_not_called()
+
+    MovieWithGenreFactory(genre=["horror"], review=[80])
+    MovieWithGenreFactory(genre=["horror"], review=[80])
+    bump_catalogue_version()
+    resp = client.get("/api/genres/?fields=name")
+    assert resp.data == [{"name": "horror"}, {"name": "comedy"}]
+
+
+@pytest.mark.django_db
+def test_get_genres_sparse_fields(client):
+    MovieWithGenreFactory(genre=["comedy"], review=[80])
+
+    resp = client.get("/api/genres/?fields=name")
+
+    assert resp.data == [{"name": "comedy"}]
+
+
+@pytest.mark.django_db
+def test_sparse_fields_cached_separately(client):
+    MovieFactory(title="Tester", review=[80])
+
+    full = client.get("/api/movies/")
+    sparse = client.get("/api/movies/?fields=title")
+    card = client.get("/api/movies/?view=card")
+
+    assert "plot" in full.data["results"][0]
+    assert "plot" not in sparse.data["results"][0]
+    assert "plot" not in card.data["results"][0]
@@ -1,10 +1,33 @@
 from django.urls import path
 
-from .views import GenreList, MovieDetail, MovieList, RandomMovie
+from .views import (
+    Autocomplete,
+    DeckDeal,
+    DeckList,
+    GenreList,
+    GroupChooser,
+    GroupConsent,
+    MovieDetail,
+    MovieFacets,
+    MovieList,
+    MovieSearch,
+    MovieSimilar,
+    RandomMovie,
+    Recommendations,
+)
 
 urlpatterns = [
     path("api/movies/", MovieList.as_view()),
     path("api/movies/random/", RandomMovie.as_view()),
+    path("api/movies/search/", MovieSearch.as_view()),
     path("api/movies/<slug:slug>/", MovieDetail.as_view()),
+    path("api/movies/<slug:slug>/similar/", MovieSimilar.as_view()),
     path("api/genres/", GenreList.as_view()),
+    path("api/facets/", MovieFacets.as_view()),
+    path("api/autocomplete/", Autocomplete.as_view()),
+    path("api/recommendations/", Recommendations.as_view()),
+    path("api/group/", GroupChooser.as_view()),
+    path("api/group/consent/", GroupConsent.as_view()),
+    path("api/decks/", DeckList.as_view()),
+    path("api/decks/<str:deck_id>/next/", DeckDeal.as_view()),
 ]
@@ -5,7 +5,7 @@ from datetime import datetime
 
 import requests
 
-from lists.models import Item
+from lists.cache import get_on_list
 
 from .constants import ReviewSources
 
@@ -16,17 +16,16 @@ OMDB_API_KEY = os.environ.get("OMDB_API_KEY")
 OMDBID_URL = "http://www.omdbapi.com/?i={imdbid}&apikey={API_KEY}"
 
 
-def annotate_object_if_auth(request, movie):
-    """
-    Add on_list field to movie object.
-    """
-    movie.on_list = False
+def mark_on_list(user, movies):
+    """Set on_list on serialized movies for the given user, if they include it."""
+    marked = [movie for movie in movies if "on_list" in movie]
+    if not user.is_authenticated or not marked:
+        return movies
 
-    if request.user.is_authenticated:
-        if Item.objects.filter(_list__owner=request.user, movie=movie):
-            movie.on_list = True
-
-    return movie
+    _, on_list = get_on_list(user)
+    for movie in marked:
+        movie["on_list"] = movie["slug"] in on_list
+    return movies
 
 
 class OMDBFetch:
@@ -139,8 +138,9 @@ class OMDBFetch:
     def get_data(self):
         try:
             response = self.search_by_id()
-            if self.check_keys_exist(response):
-                formatted_response = self.format_response_data(response)
+            if not self.check_keys_exist(response):
+                raise ValueError(f"Required keys not present for {self.imdbid}")
+            formatted_response = self.format_response_data(response)
             if not self.check_required_values_exist(formatted_response):
                 raise ValueError(f"Required fields not present for {self.imdbid}")
             return formatted_response
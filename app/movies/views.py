@@ -1,83 +1,440 @@
-import random
+from urllib.parse import urlencode
 
-from django.db.models import Avg, Count
-from django.db.models.expressions import Exists, OuterRef, Value
+from django.db.models.expressions import Value
 from django.http import Http404
-from rest_framework.generics import ListAPIView
+from django.utils.cache import get_conditional_response
+from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView, ListAPIView
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
+from accounts.models import CustomUser
 from lists.models import Item
-from movies.utils import annotate_object_if_auth
+from movies.utils import mark_on_list
 
-from .filters import MovieFilter
-from .models import Genre, Movie
-from .serializers import GenreSerializer, MovieSerializer
+from .autocomplete import MAX_SUGGESTIONS, autocomplete_index
+from .cache import CatalogueCacheMixin, catalogue_cache_key, make_etag
+from .catalogue import get_catalogue_version
+from .decks import MAX_DEAL, Deck
+from .facets import facet_counts
+from .fieldsets import SparseFieldsViewMixin
+from .filters import MovieFilter, MovieFilterParams
+from .genres import genre_list
+from .group import make_consent_token, rank_for_group
+from .index import get_movie_filter_index
+from .models import EligibleMovie, Movie
+from .pagination import CachedCountPagination, MovieCursorPagination
+from .picks import (
+    MAX_PICKS,
+    movie_id_arrays,
+    pick_movie_ids,
+    pick_weighted_movie_ids,
+)
+from .recommendations import RECOMMENDATION_COUNT, get_recommendations
+from .search import normalize_query, search_movie_ids, tokenize
+from .serializers import (
+    GenreCountSerializer,
+    GroupSerializer,
+    MovieCardSerializer,
+    MovieSerializer,
+)
+from .similar import NEIGHBOUR_COUNT, NEIGHBOURS_VERSION_KEY
 
 
-class MovieList(ListAPIView):
+def parse_limit(query_params, default, maximum, name="limit"):
+    """Return the query param name as a number from 1 to maximum, or default."""
+    value = query_params.get(name)
+    if not value:
+        return default
+    if not value.isdigit() or not 1 <= int(value) <= maximum:
+        raise ValidationError({name: [f"Enter a number from 1 to {maximum}."]})
+    return int(value)
+
+
+def get_movies_in_order(get_serializer, movie_ids, queryset=None):
+    """
+    Load the movies with movie_ids, in that order, with the related fields
+    the serializer needs and on_list left for mark_on_list to fill in.
+
+    get_serializer is a serializer class or a view's get_serializer. Ids
+    read from a per-worker artifact can lag the catalogue, so movies
+    deleted since are skipped.
+    """
+    if queryset is None:
+        queryset = Movie.objects.all()
+    movies = (
+        queryset.with_related(get_serializer().get_related_fields())
+        .annotate(on_list=Value(False))
+        .in_bulk(movie_ids)
+    )
+    return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+
+
+def serialize_movies(get_serializer, movie_ids, queryset=None):
+    """Serialize the movies with movie_ids in order; see get_movies_in_order."""
+    movies = get_movies_in_order(get_serializer, movie_ids, queryset)
+    return get_serializer(movies, many=True).data
+
+
+class MovieList(SparseFieldsViewMixin, CatalogueCacheMixin, ListAPIView):
     serializer_class = MovieSerializer
+    pagination_class = CachedCountPagination
+    view_serializer_classes = {"full": MovieSerializer, "card": MovieCardSerializer}
     filterset_class = MovieFilter
+    cursor_pagination_class = MovieCursorPagination
+    cache_prefix = "movies"
+    cache_query_params = ("page", "pagination", "cursor", "view")
+    user_fields = True
 
-    def get_queryset(self):
-        movies_qs = Movie.objects.annotate(avg_rating=Avg("reviews__score"))
-        if self.request.user.is_authenticated:
-            item = Item.objects.filter(
-                movie=OuterRef("pk"), _list__owner=self.request.user
-            )
-            movies_qs = movies_qs.annotate(on_list=Exists(item))
+    @property
+    def paginator(self):
+        """Use keyset pagination when the client opts in with ?pagination=cursor."""
+        if not hasattr(self, "_paginator") and self.uses_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
+
+    def uses_cursor_pagination(self):
+        params = self.request.query_params
+        return params.get("pagination") == "cursor" or "cursor" in params
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.filter_params = MovieFilterParams.from_query(request.query_params)
+
+    def get_serializer_class(self):
+        """Use the compact card representation when asked for ?view=card."""
+        view = self.request.query_params.get("view") or "full"
+        try:
+            return self.view_serializer_classes[view]
+        except KeyError:
+            choices = ", ".join(self.view_serializer_classes)
+            raise ValidationError({"view": [f"Choose one of: {choices}."]})
+
+    def get_canonical_query(self, request):
+        return f"{self.filter_params.key}&{super().get_canonical_query(request)}"
+
+    def get_count_cache_key(self):
+        return catalogue_cache_key("movies-count", self.filter_params.key)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, self.get_list_data)
+
+    def get_list_data(self):
+        index = None if self.uses_cursor_pagination() else get_movie_filter_index()
+        if index is None:
+            entries = self.paginate_queryset(self.get_queryset())
+            movie_ids = [entry.movie_id for entry in entries]
         else:
-            movies_qs = movies_qs.annotate(on_list=Value(False))
+            movie_ids = self.paginate_queryset(index.search(self.filter_params))
 
-        filterset = self.filterset_class(self.request.GET, queryset=movies_qs)
+        data = serialize_movies(self.get_serializer, movie_ids)
+        return self.get_paginated_response(data).data
 
-        return (
-            filterset.qs.order_by("-avg_rating")
-            .distinct()
-            .filter(avg_rating__gte=40)
-            .exclude(poster_url="N/A")
-        )
+    def add_user_fields(self, request, data):
+        mark_on_list(request.user, data["results"])
+        return data
+
+    def get_queryset(self):
+        """Matching rows of the eligible-movie summary, in list order."""
+        queryset = EligibleMovie.objects.only("movie_id", "avg_rating", "slug")
+        filterset = self.filterset_class(self.filter_params, queryset=queryset)
+        return filterset.qs.order_by("-avg_rating", "slug")
 
 
-class MovieDetail(APIView):
+class MovieDetail(SparseFieldsViewMixin, CatalogueCacheMixin, GenericAPIView):
+    serializer_class = MovieSerializer
+    cache_prefix = "movie"
+    user_fields = True
+
     def get_object(self, slug):
         try:
-            return Movie.objects.annotate(avg_rating=Avg("reviews__score")).get(
-                slug=slug
-            )
+            return Movie.objects.get(slug=slug)
         except Movie.DoesNotExist:
             raise Http404
 
     def get(self, request, slug, format=None):
+        return self.cached_response(request, lambda: self.get_movie_data(slug))
+
+    def get_movie_data(self, slug):
         movie = self.get_object(slug)
-        movie = annotate_object_if_auth(request, movie)
-        serializer = MovieSerializer(movie)
-        return Response(serializer.data)
+        movie.on_list = False
+        serializer = self.get_serializer(movie)
+        return serializer.data
 
+    def add_user_fields(self, request, data):
+        mark_on_list(request.user, [data])
+        return data
 
-class RandomMovie(APIView):
-    def get_object(self, slug):
-        try:
-            return Movie.objects.annotate(avg_rating=Avg("reviews__score")).get(
-                slug=slug
+
+class MovieSimilar(SparseFieldsViewMixin, CatalogueCacheMixin, GenericAPIView):
+    """The movies most like this one, from its precomputed neighbour list."""
+
+    serializer_class = MovieCardSerializer
+    cache_prefix = "similar"
+    cache_query_params = ("limit",)
+    user_fields = True
+    default_limit = 10
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.limit = parse_limit(
+            request.query_params, self.default_limit, NEIGHBOUR_COUNT
+        )
+
+    def get_cache_key(self, request):
+        """Also keyed on the neighbours version, bumped by each rebuild."""
+        version = get_catalogue_version(NEIGHBOURS_VERSION_KEY)
+        return f"{super().get_cache_key(request)}:{version}"
+
+    def get(self, request, slug):
+        return self.cached_response(request, lambda: self.get_similar_data(slug))
+
+    def get_similar_data(self, slug):
+        neighbours = (
+            Movie.objects.filter(slug=slug)
+            .values_list("neighbours__neighbour_ids", flat=True)
+            .first()
+        )
+        if neighbours is None and not Movie.objects.filter(slug=slug).exists():
+            raise Http404
+        movie_ids = (neighbours or [])[: self.limit]
+
+        listed = Movie.objects.filter(eligible__isnull=False)
+        return {"results": serialize_movies(self.get_serializer, movie_ids, listed)}
+
+    def add_user_fields(self, request, data):
+        mark_on_list(request.user, data["results"])
+        return data
+
+
+class Recommendations(APIView):
+    """Eligible movies matching the taste of the movies on the user's lists."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    default_limit = 20
+
+    def get(self, request):
+        limit = parse_limit(
+            request.query_params, self.default_limit, RECOMMENDATION_COUNT
+        )
+        movie_ids = get_recommendations(request.user, limit)
+        return Response({"results": serialize_movies(MovieCardSerializer, movie_ids)})
+
+
+class GroupConsent(APIView):
+    """Issue a token the user can share so others may include them in a group."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(
+            {"uid": request.user.uid, "token": make_consent_token(request.user)}
+        )
+
+
+class GroupChooser(APIView):
+    """
+    Rank movies for the signed-in user together with the group members who
+    shared consent tokens, by how many of them listed each movie and by
+    their predicted affinity.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = GroupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uids = {member["uid"] for member in serializer.validated_data["members"]}
+        user_ids = set(
+            CustomUser.objects.filter(uid__in=uids).values_list("pk", flat=True)
+        )
+        if len(user_ids) < len(uids):
+            raise ValidationError({"members": ["Unknown user."]})
+        user_ids.add(request.user.pk)
+
+        ranked = rank_for_group(sorted(user_ids), serializer.validated_data["limit"])
+        overlaps = dict(ranked)
+        movies = get_movies_in_order(MovieCardSerializer, list(overlaps))
+        results = MovieCardSerializer(movies, many=True).data
+        for card, movie in zip(results, movies):
+            card["overlap"] = overlaps[movie.pk]
+        return Response({"results": mark_on_list(request.user, results)})
+
+
+class MovieSearch(SparseFieldsViewMixin, CatalogueCacheMixin, GenericAPIView):
+    """Ranked full-text search over title, cast, directors and plot."""
+
+    serializer_class = MovieCardSerializer
+    cache_prefix = "search"
+    user_fields = True
+    default_limit = 20
+    max_limit = 50
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.search_query = normalize_query(request.query_params.get("q", ""))
+        if not tokenize(self.search_query):
+            raise ValidationError({"q": ["Enter a search term."]})
+        self.limit = parse_limit(
+            request.query_params, self.default_limit, self.max_limit
+        )
+
+    def get_canonical_query(self, request):
+        query = urlencode({"q": self.search_query, "limit": self.limit})
+        return f"{query}&{super().get_canonical_query(request)}"
+
+    def get(self, request):
+        return self.cached_response(request, self.get_search_data)
+
+    def get_search_data(self):
+        movie_ids = search_movie_ids(self.search_query, self.limit)
+        return {"results": serialize_movies(self.get_serializer, movie_ids)}
+
+    def add_user_fields(self, request, data):
+        mark_on_list(request.user, data["results"])
+        return data
+
+
+class Autocomplete(APIView):
+    """
+    Title and person suggestions for a search-as-you-type box.
+
+    Answered from the in-process AutocompleteIndex without touching the
+    database, so responses are not cached. Keystrokes are throttled under
+    their own scope rather than the daily anonymous limit.
+    """
+
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = "autocomplete"
+    default_limit = 8
+
+    def get(self, request):
+        limit = parse_limit(request.query_params, self.default_limit, MAX_SUGGESTIONS)
+        query = request.query_params.get("q", "")
+        results = autocomplete_index.get().suggest(query, limit)
+        return Response({"results": results})
+
+
+class RandomMovie(SparseFieldsViewMixin, GenericAPIView):
+    """
+    Random listed movies matching the MovieFilter params.
+
+    Without ?count= a single movie is returned; with it, a page of up to
+    count distinct picks. ?mode=weighted favours well-rated movies by
+    drawing them in proportion to RANDOM_PICK_WEIGHT.
+    """
+
+    serializer_class = MovieSerializer
+    pickers = {"uniform": pick_movie_ids, "weighted": pick_weighted_movie_ids}
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.filter_params = MovieFilterParams.from_query(request.query_params)
+        self.count = parse_limit(request.query_params, None, MAX_PICKS, name="count")
+        mode = request.query_params.get("mode") or "uniform"
+        if mode not in self.pickers:
+            choices = ", ".join(self.pickers)
+            raise ValidationError({"mode": [f"Choose one of: {choices}."]})
+        self.pick = self.pickers[mode]
+
+    def get(self, request):
+        movie_ids = self.pick(self.filter_params, self.count or 1)
+        movies = serialize_movies(self.get_serializer, movie_ids)
+        results = mark_on_list(request.user, movies)
+        if self.count is not None:
+            return Response({"results": results})
+        if not results:
+            raise Http404
+        return Response(results[0])
+
+
+class DeckList(APIView):
+    """
+    Create a shuffled deck of the listed movies matching the MovieFilter
+    params. Signed-in users can pass ?exclude=on_list to leave out movies
+    already on their lists; such decks can only be dealt to their owner.
+    """
+
+    def post(self, request):
+        filter_params = MovieFilterParams.from_query(request.query_params)
+        exclude = request.query_params.get("exclude")
+        if exclude not in (None, "", "on_list"):
+            raise ValidationError({"exclude": ["Choose one of: on_list."]})
+
+        movie_ids = movie_id_arrays.get().get(filter_params)
+        owner_id = None
+        if exclude and request.user.is_authenticated:
+            owner_id = request.user.pk
+            on_list = set(
+                Item.objects.filter(_list__owner=request.user).values_list(
+                    "movie_id", flat=True
+                )
             )
-        except Movie.DoesNotExist:
+            movie_ids = [movie_id for movie_id in movie_ids if movie_id not in on_list]
+
+        deck = Deck.create(movie_ids, owner_id=owner_id)
+        return Response(
+            {"deck": deck.deck_id, "size": deck.size}, status=status.HTTP_201_CREATED
+        )
+
+
+class DeckDeal(APIView):
+    """Deal the next ?n= movies from a deck; no movie is dealt twice."""
+
+    default_count = 10
+
+    def post(self, request, deck_id):
+        count = parse_limit(request.query_params, self.default_count, MAX_DEAL, "n")
+
+        deck = Deck.load(deck_id)
+        if deck is None or deck.owner_id not in (None, request.user.pk):
             raise Http404
+        dealt = deck.deal(count)
+        if dealt is None:
+            raise Http404
+        movie_ids, remaining = dealt
+
+        movies = serialize_movies(MovieCardSerializer, movie_ids)
+        results = mark_on_list(request.user, movies)
+        return Response({"results": results, "remaining": remaining})
+
+
+class GenreList(SparseFieldsViewMixin, GenericAPIView):
+    """
+    Genres with their listed movie counts, most movies first.
+
+    Served from this worker's copy of the list, which is shared through the
+    cache and rebuilt when the catalogue version changes, so steady-state
+    requests touch neither the database nor the shared cache.
+    """
+
+    serializer_class = GenreCountSerializer
 
     def get(self, request):
-        movie_slugs = Movie.objects.values_list("slug", flat=True)
-        movie_slug = random.choice(movie_slugs)
-        movie = self.get_object(movie_slug)
-        movie = annotate_object_if_auth(request, movie)
-        serializer = MovieSerializer(movie)
-        return Response(serializer.data)
+        key, genres = genre_list.get()
+        fields = list(self.get_serializer().fields)
+        etag = make_etag(key, *fields)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
 
+        data = [{name: genre[name] for name in fields} for genre in genres]
+        response = Response(data, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        return response
 
-class GenreList(ListAPIView):
-    serializer_class = GenreSerializer
+
+class MovieFacets(CatalogueCacheMixin, APIView):
+    """Counts per genre, decade and runtime bucket for the MovieFilter params."""
+
+    cache_prefix = "facets"
 
     def get(self, request):
-        genres = Genre.objects.annotate(movie_count=Count("movie"))
-        genres = genres.order_by("-movie_count")
-        serializer = GenreSerializer(genres, many=True)
-        return Response(serializer.data)
+        self.filter_params = MovieFilterParams.from_query(request.query_params)
+        return self.cached_response(request, lambda: facet_counts(self.filter_params))
+
+    def get_canonical_query(self, request):
+        return self.filter_params.key